@@ -0,0 +1,304 @@
+"""Formato binário em colunas dos snapshots de orçamentos (``budgets/AAAA-MM.bin``).
+
+Tempos comparados com o JSON: ``python -m src.core.budget_codec``.
+"""
+import struct
+import sys
+from array import array
+from decimal import Decimal, ROUND_HALF_UP
+from typing import Dict, List, Optional
+
+MAGIC = b"MDBUDG2\n"
+# Primeira versão: valores monetários em centavos (int64); ainda é lida
+MAGIC_CENTS = b"MDBUDG1\n"
+_COUNTS = struct.Struct("<II")
+_SECTION = struct.Struct("<I")
+
+# Separador de campos de texto e marcador de None
+_SEP = "\x1f"
+_NULL = "\x00"
+# Centavos ausentes (ex.: item sem criação de arte) nos arquivos ``MAGIC_CENTS``
+_NULL_CENTS = -(2 ** 63)
+
+BUDGET_TEXT = (
+    "id", "client.name", "client.phone", "client.email", "created_date", "saved_date",
+    "discount.type", "discount.description",
+)
+BUDGET_MONEY = ("art_creation_total", "subtotal", "total", "discount.value")
+ITEM_TEXT = ("product_type", "fabric", "sleeve", "size", "visual_type")
+# Campos de item acrescentados depois do formato inicial, gravados no fim do arquivo
+ITEM_EXTRA_TEXT = ("other_name",)
+# Idem para campos de orçamento
+BUDGET_EXTRA_TEXT = ("price_version", "client_type")
+
+
+def to_cents(value) -> Optional[int]:
+    """Valor monetário (float/Decimal/str) em centavos inteiros, arredondando meio para cima"""
+    if value is None:
+        return None
+    if isinstance(value, float):
+        # Caminho rápido: o valor já está em centavos exatos
+        scaled = value * 100
+        cents = round(scaled)
+        if abs(scaled - cents) < 1e-6:
+            return cents
+    return int(Decimal(str(value)).scaleb(2).quantize(Decimal(1), rounding=ROUND_HALF_UP))
+
+
+def from_cents(cents: Optional[int]) -> Optional[float]:
+    """Centavos para o float usado nos dicionários (``Decimal(str(x))`` volta exato)"""
+    if cents is None or cents == _NULL_CENTS:
+        return None
+    return cents / 100
+
+
+def is_binary_snapshot(data: bytes) -> bool:
+    return data.startswith(MAGIC) or data.startswith(MAGIC_CENTS)
+
+
+def _pack_text(values: List[Optional[str]]) -> bytes:
+    texts = [_NULL if v is None else str(v) for v in values]
+    joined = _SEP.join(texts)
+    if joined.count(_SEP) != max(len(texts) - 1, 0):
+        # Separadores não podem aparecer dentro de um campo
+        joined = _SEP.join(t.replace(_SEP, " ") for t in texts)
+    return joined.encode("utf-8")
+
+
+def _pack_array(values: array) -> bytes:
+    if sys.byteorder != "little":
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def _unpack_array(typecode: str, data) -> array:
+    values = array(typecode)
+    values.frombytes(data)
+    if sys.byteorder != "little":
+        values.byteswap()
+    return values
+
+
+def _float_array(values) -> array:
+    return array("d", (float("nan") if v is None else float(v) for v in values))
+
+
+def encode_snapshot(budget_dicts: List[Dict]) -> bytes:
+    """Serializa os orçamentos (dicionários persistidos) no formato binário"""
+    items = [item for b in budget_dicts for item in b.get("items", [])]
+    discounts = [b.get("discount") or {} for b in budget_dicts]
+
+    budget_text = [
+        [b["id"] for b in budget_dicts],
+        [b["client"]["name"] for b in budget_dicts],
+        [b["client"].get("phone") for b in budget_dicts],
+        [b["client"].get("email") for b in budget_dicts],
+        [b["created_date"] for b in budget_dicts],
+        [b["saved_date"] for b in budget_dicts],
+        [d.get("type") for d in discounts],
+        [d.get("description") for d in discounts],
+    ]
+    budget_money = [
+        [b.get("art_creation_total", 0.0) for b in budget_dicts],
+        [b.get("subtotal", 0.0) for b in budget_dicts],
+        [b.get("total", 0.0) for b in budget_dicts],
+        [d.get("value") for d in discounts],
+    ]
+
+    sections = [_pack_text(column) for column in budget_text]
+    sections += [_pack_array(_float_array(column)) for column in budget_money]
+    sections.append(_pack_array(array("I", (len(b.get("items", [])) for b in budget_dicts))))
+    sections += [_pack_text([item.get(key) for item in items]) for key in ITEM_TEXT]
+    sections.append(_pack_array(array("i", (int(item["quantity"]) for item in items))))
+    sections.append(_pack_array(_float_array(item.get("width_cm") for item in items)))
+    sections.append(_pack_array(_float_array(item.get("height_cm") for item in items)))
+    sections.append(_pack_array(_float_array(item.get("art_creation_price") for item in items)))
+    sections += [_pack_text([item.get(key) for item in items]) for key in ITEM_EXTRA_TEXT]
+    sections += [_pack_text([b.get(key) for b in budget_dicts]) for key in BUDGET_EXTRA_TEXT]
+
+    out = [MAGIC, _COUNTS.pack(len(budget_dicts), len(items))]
+    for section in sections:
+        out.append(_SECTION.pack(len(section)))
+        out.append(section)
+    return b"".join(out)
+
+
+class SnapshotColumns:
+    """Snapshot binário aberto, decodificado sob demanda por faixa de registros"""
+
+    def __init__(self, data: bytes) -> None:
+        if not is_binary_snapshot(data):
+            raise ValueError("Arquivo não está no formato binário de orçamentos")
+        self.n_budgets, self.n_items = _COUNTS.unpack_from(data, len(MAGIC))
+        self._cents = data.startswith(MAGIC_CENTS)
+        view = memoryview(data)
+        pos = len(MAGIC) + _COUNTS.size
+        sections = []
+        for _ in range(len(BUDGET_TEXT) + len(BUDGET_MONEY) + 1 + len(ITEM_TEXT) + 4):
+            (size,) = _SECTION.unpack_from(data, pos)
+            pos += _SECTION.size
+            sections.append(view[pos:pos + size])
+            pos += size
+        # Seções opcionais (ausentes em arquivos gravados antes delas)
+        extra = []
+        for _ in ITEM_EXTRA_TEXT + BUDGET_EXTRA_TEXT:
+            if pos >= len(data):
+                extra.append(None)
+                continue
+            (size,) = _SECTION.unpack_from(data, pos)
+            pos += _SECTION.size
+            extra.append(view[pos:pos + size])
+            pos += size
+        self._item_extra = extra[:len(ITEM_EXTRA_TEXT)]
+        self._budget_extra = extra[len(ITEM_EXTRA_TEXT):]
+        self._budget_text = sections[:8]
+        self._budget_money = sections[8:12]
+        self._item_text = sections[13:18]
+        self._quantities, self._widths, self._heights, self._art_prices = sections[18:22]
+        # Posição do primeiro item de cada orçamento
+        self._item_starts = [0]
+        for count in _unpack_array("I", sections[12]):
+            self._item_starts.append(self._item_starts[-1] + count)
+
+    def __len__(self) -> int:
+        return self.n_budgets
+
+    @staticmethod
+    def _text(raw, count: int, start: int, stop: int, nullable: bool) -> List[Optional[str]]:
+        wanted = stop - start
+        if wanted <= 0:
+            return []
+        text = str(raw, "utf-8")
+        if stop == count and start > 0:
+            values = text.rsplit(_SEP, wanted)[-wanted:]
+        elif start == 0 and stop < count:
+            values = text.split(_SEP, wanted)[:wanted]
+        else:
+            values = text.split(_SEP)[start:stop]
+        if nullable:
+            return [None if v == _NULL else v for v in values]
+        return values
+
+    @staticmethod
+    def _numbers(typecode: str, raw, start: int, stop: int) -> array:
+        size = array(typecode).itemsize
+        return _unpack_array(typecode, raw[start * size:stop * size])
+
+    def _money(self, raw, start: int, stop: int) -> List[Optional[float]]:
+        if self._cents:
+            return [from_cents(c) for c in self._numbers("q", raw, start, stop)]
+        return [None if v != v else v for v in self._numbers("d", raw, start, stop)]
+
+    def records(self, start: int = 0, stop: Optional[int] = None) -> List[Dict]:
+        """Dicionários persistidos dos orçamentos ``start <= i < stop``"""
+        n = self.n_budgets
+        stop = n if stop is None else min(stop, n)
+        if start >= stop:
+            return []
+        (ids, names, phones, emails, created, saved, d_types, d_descs) = [
+            self._text(raw, n, start, stop, nullable=key not in ("id", "client.name", "created_date", "saved_date"))
+            for key, raw in zip(BUDGET_TEXT, self._budget_text)
+        ]
+        price_versions, client_types = [
+            [None] * (stop - start) if raw is None else self._text(raw, n, start, stop, nullable=True)
+            for raw in self._budget_extra
+        ]
+        art_totals, subtotals, totals, d_values = [
+            self._money(raw, start, stop) for raw in self._budget_money
+        ]
+
+        first, last = self._item_starts[start], self._item_starts[stop]
+        (i_types, i_fabrics, i_sleeves, i_sizes, i_visuals) = [
+            self._text(raw, self.n_items, first, last, nullable=key != "product_type")
+            for key, raw in zip(ITEM_TEXT, self._item_text)
+        ]
+        quantities = self._numbers("i", self._quantities, first, last)
+        widths = [None if w != w else w for w in self._numbers("d", self._widths, first, last)]
+        heights = [None if h != h else h for h in self._numbers("d", self._heights, first, last)]
+        art_prices = self._money(self._art_prices, first, last)
+        (other_names,) = [
+            [None] * (last - first) if raw is None else self._text(raw, self.n_items, first, last, nullable=True)
+            for raw in self._item_extra
+        ]
+        items = [
+            {
+                "product_type": product_type,
+                "fabric": fabric,
+                "sleeve": sleeve,
+                "size": size,
+                "visual_type": visual_type,
+                "other_name": other_name,
+                "quantity": quantity,
+                "width_cm": width,
+                "height_cm": height,
+                "art_creation_price": art_price,
+            }
+            for product_type, fabric, sleeve, size, visual_type, quantity, width, height, art_price, other_name in zip(
+                i_types, i_fabrics, i_sleeves, i_sizes, i_visuals, quantities, widths, heights, art_prices, other_names
+            )
+        ]
+
+        budgets = []
+        starts = self._item_starts
+        for i in range(stop - start):
+            d_type = d_types[i]
+            budgets.append({
+                "id": ids[i],
+                "client": {"name": names[i], "phone": phones[i], "email": emails[i]},
+                "items": items[starts[start + i] - first:starts[start + i + 1] - first],
+                "discount": {
+                    "type": d_type,
+                    "value": d_values[i],
+                    "description": d_descs[i],
+                } if d_type is not None else None,
+                "art_creation_total": art_totals[i],
+                "subtotal": subtotals[i],
+                "total": totals[i],
+                "created_date": created[i],
+                "saved_date": saved[i],
+                "price_version": price_versions[i],
+                "client_type": client_types[i],
+            })
+        return budgets
+
+
+def decode_snapshot(data: bytes) -> List[Dict]:
+    """Lê um snapshot binário de volta para a lista de dicionários persistidos"""
+    return SnapshotColumns(data).records()
+
+
+def benchmark(budgets: int = 5000, repeat: int = 5) -> Dict[str, float]:
+    """Tempo (s, melhor de ``repeat``) para gravar e ler um snapshot de ``budgets``
+    orçamentos de 3 itens em JSON (``dump_snapshot``) e no formato binário."""
+    import json
+    import timeit
+    from .budget_storage import dump_snapshot
+
+    item = {"product_type": "camiseta", "fabric": "dryfit", "sleeve": "curta", "size": "M",
+            "visual_type": None, "other_name": None, "quantity": 30, "width_cm": None,
+            "height_cm": None, "art_creation_price": None}
+    visual = dict(item, product_type="comunicacao_visual", fabric=None, sleeve=None, size=None,
+                  visual_type="lona", quantity=1, width_cm=120.5, height_cm=80.0, art_creation_price=45.0)
+    records = [
+        {"id": f"ORC_{i:08d}", "client": {"name": f"Cliente {i}", "phone": "(92) 9 1234-5678", "email": None},
+         "items": [item, visual, item], "discount": {"type": "percentage", "value": 12.345, "description": ""},
+         "art_creation_total": 45.0, "subtotal": 1850.123, "total": 1622.73, "created_date": "2025-10-16",
+         "saved_date": f"2025-10-16T17:23:03.{i:06d}", "price_version": "0123456789abcdef", "client_type": "normal"}
+        for i in range(budgets)
+    ]
+    as_json = dump_snapshot(records)
+    as_binary = encode_snapshot(records)
+    cases = {
+        "JSON: gravar": lambda: dump_snapshot(records),
+        "JSON: ler": lambda: json.loads(as_json),
+        "binário: gravar": lambda: encode_snapshot(records),
+        "binário: ler": lambda: decode_snapshot(as_binary),
+    }
+    return {name: min(timeit.repeat(fn, number=1, repeat=repeat)) for name, fn in cases.items()}
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    for name, seconds in benchmark(count).items():
+        print(f"{name:16s} {seconds * 1000:8.1f} ms")
@@ -0,0 +1,290 @@
+import os
+import sqlite3
+import sys
+from typing import List, Dict, Optional
+
+from .simulator_models import Budget
+from .budget_storage import BudgetStorage, BudgetSummary, budget_to_dict, dict_to_budget
+from .search_index import fold_text
+from .ids import new_id
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS budgets (
+    id TEXT PRIMARY KEY,
+    client_name TEXT NOT NULL,
+    client_name_norm TEXT NOT NULL,
+    client_phone TEXT,
+    client_email TEXT,
+    discount_type TEXT,
+    discount_value REAL,
+    discount_description TEXT,
+    art_creation_total REAL NOT NULL DEFAULT 0,
+    subtotal REAL NOT NULL DEFAULT 0,
+    total REAL NOT NULL DEFAULT 0,
+    created_date TEXT NOT NULL,
+    saved_date TEXT NOT NULL,
+    price_version TEXT,
+    client_type TEXT NOT NULL DEFAULT 'normal'
+);
+CREATE INDEX IF NOT EXISTS idx_budgets_created_date ON budgets(created_date);
+CREATE INDEX IF NOT EXISTS idx_budgets_saved_date ON budgets(saved_date);
+
+CREATE TABLE IF NOT EXISTS budget_items (
+    budget_id TEXT NOT NULL REFERENCES budgets(id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    product_type TEXT NOT NULL,
+    fabric TEXT,
+    sleeve TEXT,
+    size TEXT,
+    visual_type TEXT,
+    other_name TEXT,
+    quantity INTEGER NOT NULL,
+    width_cm REAL,
+    height_cm REAL,
+    art_creation_price REAL,
+    PRIMARY KEY (budget_id, position)
+);
+
+-- Estruturas da busca por prefixo de palavra, substituída pela busca por trecho
+DROP INDEX IF EXISTS idx_budgets_client_name_norm;
+DROP TABLE IF EXISTS budget_name_tokens;
+"""
+
+# Colunas acrescentadas depois da criação do esquema: bancos antigos ganham via ALTER TABLE
+ADDED_COLUMNS = {
+    "budgets": [("price_version", "TEXT"), ("client_type", "TEXT NOT NULL DEFAULT 'normal'")],
+    "budget_items": [("other_name", "TEXT")],
+}
+
+ITEM_COLUMNS = (
+    "product_type, fabric, sleeve, size, visual_type, other_name, quantity, width_cm, height_cm, art_creation_price"
+)
+
+BUDGET_COLUMNS = (
+    "id, client_name, client_phone, client_email, discount_type, discount_value, "
+    "discount_description, art_creation_total, subtotal, total, created_date, saved_date, "
+    "price_version, client_type"
+)
+
+
+def normalize_name(name: str) -> str:
+    """Normaliza nome de cliente para indexação (sem acento, minúsculas, espaços simples)"""
+    return fold_text(name)
+
+
+class SqliteBudgetStorage:
+    """Motor de armazenamento de orçamentos em SQLite, com a mesma API pública de ``BudgetStorage``"""
+
+    def __init__(self, storage_dir: str = "data", db_name: str = "budgets.sqlite3"):
+        self.storage_dir = storage_dir
+        self.db_file = os.path.join(storage_dir, db_name)
+        self._ensure_storage_dir()
+        self.conn = sqlite3.connect(self.db_file)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA foreign_keys = ON")
+        self.conn.execute("PRAGMA journal_mode = WAL")
+        self.conn.executescript(SCHEMA)
+        self._add_missing_columns()
+        self.conn.commit()
+
+    def _add_missing_columns(self):
+        """Acrescenta a bancos criados por versões anteriores as colunas de ``ADDED_COLUMNS``"""
+        for table, columns in ADDED_COLUMNS.items():
+            existing = {row["name"] for row in self.conn.execute(f"PRAGMA table_info({table})")}
+            for name, decl in columns:
+                if name not in existing:
+                    self.conn.execute(f"ALTER TABLE {table} ADD COLUMN {name} {decl}")
+
+    def _ensure_storage_dir(self):
+        """Cria diretório de armazenamento se não existir"""
+        if not os.path.exists(self.storage_dir):
+            os.makedirs(self.storage_dir)
+
+    def close(self):
+        self.conn.close()
+
+    def _insert_dict(self, budget_dict: Dict):
+        """Insere (ou substitui) um orçamento no formato de dicionário persistido"""
+        client = budget_dict["client"]
+        discount = budget_dict.get("discount") or {}
+        name_norm = normalize_name(client["name"])
+        self.conn.execute("DELETE FROM budgets WHERE id = ?", (budget_dict["id"],))
+        self.conn.execute(
+            f"INSERT INTO budgets ({BUDGET_COLUMNS}, client_name_norm) VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?,?,?)",
+            (
+                budget_dict["id"], client["name"], client.get("phone"), client.get("email"),
+                discount.get("type"), discount.get("value"), discount.get("description"),
+                budget_dict.get("art_creation_total", 0.0), budget_dict.get("subtotal", 0.0),
+                budget_dict.get("total", 0.0), budget_dict["created_date"], budget_dict["saved_date"],
+                budget_dict.get("price_version"), budget_dict.get("client_type") or "normal", name_norm,
+            ),
+        )
+        self.conn.executemany(
+            f"INSERT INTO budget_items (budget_id, position, {ITEM_COLUMNS}) VALUES (?,?,?,?,?,?,?,?,?,?,?,?)",
+            [
+                (
+                    budget_dict["id"], pos, it["product_type"], it.get("fabric"), it.get("sleeve"),
+                    it.get("size"), it.get("visual_type"), it.get("other_name"), it["quantity"],
+                    it.get("width_cm"), it.get("height_cm"), it.get("art_creation_price"),
+                )
+                for pos, it in enumerate(budget_dict.get("items", []))
+            ],
+        )
+
+    def _row_to_dict(self, row: sqlite3.Row, with_items: bool = True) -> Dict:
+        """Converte linha da tabela para o dicionário usado pela interface"""
+        budget_dict = {
+            "id": row["id"],
+            "client": {
+                "name": row["client_name"],
+                "phone": row["client_phone"],
+                "email": row["client_email"]
+            },
+            "items": [],
+            "discount": None,
+            "art_creation_total": row["art_creation_total"],
+            "subtotal": row["subtotal"],
+            "total": row["total"],
+            "created_date": row["created_date"],
+            "saved_date": row["saved_date"],
+            "price_version": row["price_version"],
+            "client_type": row["client_type"]
+        }
+        if row["discount_type"]:
+            budget_dict["discount"] = {
+                "type": row["discount_type"],
+                "value": row["discount_value"],
+                "description": row["discount_description"]
+            }
+        if with_items:
+            cur = self.conn.execute(
+                f"SELECT {ITEM_COLUMNS} FROM budget_items WHERE budget_id = ? ORDER BY position",
+                (row["id"],),
+            )
+            budget_dict["items"] = [dict(item_row) for item_row in cur]
+        return budget_dict
+
+    def save_budget(self, budget: Budget) -> str:
+        """Salva um orçamento e retorna ID único"""
+        budget_id = new_id("ORC")
+        with self.conn:
+            self._insert_dict(budget_to_dict(budget, budget_id))
+        return budget_id
+
+    def load_budget(self, budget_id: str) -> Optional[Budget]:
+        """Carrega um orçamento pelo ID"""
+        row = self.conn.execute(f"SELECT {BUDGET_COLUMNS} FROM budgets WHERE id = ?", (budget_id,)).fetchone()
+        if row is None:
+            return None
+        return dict_to_budget(self._row_to_dict(row))
+
+    def search_budgets(self, client_name: str = "", date_from: str = "", date_to: str = "",
+                       limit: Optional[int] = None, offset: int = 0) -> List[Dict]:
+        """Busca orçamentos por critérios, do mais recente para o mais antigo"""
+        rows = self._query(client_name, date_from, date_to, limit, offset)
+        return [self._row_to_dict(row) for row in rows]
+
+    def search_summaries(self, client_name: str = "", date_from: str = "", date_to: str = "",
+                         limit: int = 50, offset: int = 0) -> List[BudgetSummary]:
+        """Página de resultados resumidos, sem ler a tabela de itens além da contagem"""
+        rows = self._query(client_name, date_from, date_to, limit, offset, with_items_count=True)
+        return [
+            BudgetSummary(
+                id=row["id"],
+                client_name=row["client_name"],
+                created_date=row["created_date"],
+                saved_date=row["saved_date"],
+                total=float(row["total"]),
+                items_count=row["items_count"],
+            )
+            for row in rows
+        ]
+
+    def _query(self, client_name: str, date_from: str, date_to: str, limit: Optional[int], offset: int,
+               with_items_count: bool = False) -> List[sqlite3.Row]:
+        """Monta e executa a consulta paginada de orçamentos"""
+        where: List[str] = []
+        params: List = []
+
+        # Filtro por nome: trecho do nome normalizado (curingas do LIKE escapados)
+        term = normalize_name(client_name)
+        if term:
+            where.append("b.client_name_norm LIKE ? ESCAPE '\\'")
+            params.append("%" + term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%")
+
+        # Filtro por data
+        if date_from:
+            where.append("b.created_date >= ?")
+            params.append(date_from)
+        if date_to:
+            where.append("b.created_date <= ?")
+            params.append(date_to)
+
+        columns = ", ".join("b." + c.strip() for c in BUDGET_COLUMNS.split(","))
+        if with_items_count:
+            columns += ", (SELECT COUNT(*) FROM budget_items i WHERE i.budget_id = b.id) AS items_count"
+        sql = f"SELECT {columns} FROM budgets b"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY b.saved_date DESC"
+        if limit is not None:
+            sql += " LIMIT ? OFFSET ?"
+            params.extend([int(limit), int(offset)])
+        elif offset:
+            sql += " LIMIT -1 OFFSET ?"
+            params.append(int(offset))
+
+        return self.conn.execute(sql, params).fetchall()
+
+    def get_recent_budgets(self, limit: int = 10) -> List[Dict]:
+        """Retorna orçamentos mais recentes"""
+        return self.search_budgets(limit=limit)
+
+    def delete_budget(self, budget_id: str) -> bool:
+        """Remove um orçamento"""
+        with self.conn:
+            cur = self.conn.execute("DELETE FROM budgets WHERE id = ?", (budget_id,))
+        return cur.rowcount > 0
+
+    def reassign_client(self, budget_ids: List[str], client: Dict) -> bool:
+        """Troca os dados do cliente (nome, telefone, email) dos orçamentos"""
+        name_norm = normalize_name(client["name"])
+        ids = [bid for bid in budget_ids
+               if self.conn.execute("SELECT 1 FROM budgets WHERE id = ?", (bid,)).fetchone() is not None]
+        with self.conn:
+            self.conn.executemany(
+                "UPDATE budgets SET client_name = ?, client_name_norm = ?, client_phone = ?, client_email = ? "
+                "WHERE id = ?",
+                [(client["name"], name_norm, client.get("phone"), client.get("email"), bid) for bid in ids],
+            )
+        return bool(ids)
+
+    def import_budget_dicts(self, budget_dicts: List[Dict]) -> int:
+        """Importa orçamentos no formato de dicionário em uma única transação"""
+        count = 0
+        with self.conn:
+            for budget_dict in budget_dicts:
+                self._insert_dict(budget_dict)
+                count += 1
+        return count
+
+
+def migrate_json_to_sqlite(storage_dir: str = "data") -> int:
+    """Migra ``budgets.json`` (snapshot + journal) para ``budgets.sqlite3``.
+
+    Pode ser executado mais de uma vez: orçamentos já migrados são substituídos.
+    Retorna a quantidade de orçamentos importados.
+    """
+    source = BudgetStorage(storage_dir)
+    target = SqliteBudgetStorage(storage_dir)
+    try:
+        return target.import_budget_dicts(source.live_budgets())
+    finally:
+        target.close()
+
+
+if __name__ == "__main__":
+    directory = sys.argv[1] if len(sys.argv) > 1 else "data"
+    total = migrate_json_to_sqlite(directory)
+    print(f"{total} orçamento(s) migrado(s) para {os.path.join(directory, 'budgets.sqlite3')}")
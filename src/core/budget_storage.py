@@ -1,20 +1,111 @@
+"""Armazenamento de orçamentos em JSON: snapshot particionado por mês mais journal de alterações."""
+import heapq
 import json
 import os
+import sys
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
 from datetime import date, datetime
-from typing import List, Dict, Optional
+from itertools import islice
+from typing import Callable, Iterable, List, Dict, Optional, Set
 from decimal import Decimal
 
 from .simulator_models import Budget, ClientInfo, ProductItem, Discount
+from .search_index import SortedIndex, TrigramIndex
+from .file_store import atomic_write_bytes, atomic_write_json, file_lock, file_signature, read_json
+from .ids import new_id
+from .events import ChangeNotifier
+from .budget_codec import SnapshotColumns, decode_snapshot, encode_snapshot, is_binary_snapshot
+from .settings import budget_storage_format
 
 
-class BudgetStorage:
+@dataclass
+class BudgetSummary:
+    """Linha resumida de orçamento para listagens (sem itens materializados)"""
+    id: str
+    client_name: str
+    created_date: str
+    saved_date: str
+    total: float
+    items_count: int
+
+
+def summarize_budget(budget_dict: Dict) -> BudgetSummary:
+    """Extrai o resumo de um orçamento no formato de dicionário persistido"""
+    return BudgetSummary(
+        id=budget_dict["id"],
+        client_name=budget_dict["client"]["name"],
+        created_date=budget_dict["created_date"],
+        saved_date=budget_dict["saved_date"],
+        total=float(budget_dict["total"]),
+        items_count=len(budget_dict.get("items", [])),
+    )
+
+
+class BudgetStorage(ChangeNotifier):
     """Sistema de armazenamento e busca de orçamentos"""
+
+    # Quantidade de entradas no journal que dispara a compactação
+    COMPACT_THRESHOLD = 500
+    # Fração de lápides na lista que dispara a remoção delas
+    TOMBSTONE_RATIO = 0.5
+    # Quantidade de orçamentos montados mantidos no cache LRU
+    CACHE_SIZE = 64
+    # Orçamentos mais recentes interpretados já na abertura, no modo preguiçoso
+    EAGER_RECORDS = 500
+    # Meses (incluindo o corrente) cujas partições são lidas já na abertura
+    RECENT_MONTHS = 3
+    # Extensão dos arquivos de partição por formato
+    PARTITION_EXTENSIONS = {"json": ".json", "binario": ".bin"}
+    # Snapshots de arquivo único (formato anterior às partições)
+    LEGACY_FILES = ("budgets.json", "budgets.bin")
     
-    def __init__(self, storage_dir: str = "data"):
+    def __init__(self, storage_dir: str = "data", journal: bool = True, compact_threshold: Optional[int] = None,
+                 lazy: bool = True, snapshot_format: Optional[str] = None):
+        super().__init__()
         self.storage_dir = storage_dir
-        self.budgets_file = os.path.join(storage_dir, "budgets.json")
+        self.lazy = lazy
+        self.snapshot_format = snapshot_format or budget_storage_format()
+        if self.snapshot_format not in self.PARTITION_EXTENSIONS:
+            raise ValueError(f"Formato de armazenamento desconhecido: {self.snapshot_format}")
+        self.partitions_dir = os.path.join(storage_dir, "budgets")
+        self.manifest_file = os.path.join(self.partitions_dir, "manifest.json")
+        self.legacy_files = [os.path.join(storage_dir, name) for name in self.LEGACY_FILES]
+        self.lock_file = os.path.join(storage_dir, "budgets")
+        self.journal_file = os.path.join(storage_dir, "budgets.journal.jsonl")
+        self.journal = journal
+        self.compact_threshold = compact_threshold or self.COMPACT_THRESHOLD
+        self._lock = threading.RLock()
+        self._journal_entries = 0
+        self._journal_offset = 0
+        self._journal_clean = True
+        self._snapshot_sig = None
+        # Partições gravadas (mês -> arquivo, quantidade, maior saved_date)
+        self._manifest: Dict[str, Dict] = {}
+        # Partições ainda não lidas
+        self._cold: Dict[str, Dict] = {}
+        # Meses alterados em memória desde a última gravação das partições
+        self._dirty: Set[str] = set()
+        # IDs excluídos que ainda podem constar numa partição fria
+        self._deleted: Set[str] = set()
+        # Snapshot de arquivo único: orçamentos mais antigos ainda não interpretados
+        self._pending: Optional[Callable[[], List[Dict]]] = None
+        self._legacy = False
+        # Incrementado sempre que dados vindos do disco são incorporados
+        self._generation = 0
+        self._compaction_thread: Optional[threading.Thread] = None
+        self._id_index: Dict[str, int] = {}
+        self._tombstones = 0
+        self._name_index = TrigramIndex()
+        self._created_index = SortedIndex()
+        self._saved_index = SortedIndex()
+        self._budget_cache: "OrderedDict[str, Budget]" = OrderedDict()
+        self.cache_hits = 0
+        self.cache_misses = 0
         self._ensure_storage_dir()
-        self._load_budgets()
+        with self._lock, file_lock(self.lock_file):
+            self._load_budgets()
     
     def _ensure_storage_dir(self):
         """Cria diretório de armazenamento se não existir"""
@@ -22,152 +113,782 @@ class BudgetStorage:
             os.makedirs(self.storage_dir)
     
     def _load_budgets(self):
-        """Carrega orçamentos do arquivo"""
-        self.budgets: List[Dict] = []
-        if os.path.exists(self.budgets_file):
-            try:
-                with open(self.budgets_file, 'r', encoding='utf-8') as f:
-                    self.budgets = json.load(f)
-            except Exception:
-                self.budgets = []
+        """Carrega orçamentos do disco (chamar com a trava de arquivo)"""
+        self.budgets: List[Optional[Dict]] = []
+        self._pending = None
+        self._legacy = False
+        self._cold = {}
+        self._dirty = set()
+        self._deleted = set()
+        self._snapshot_sig = self._snapshot_signature()
+        manifest = read_json(self.manifest_file)
+        if manifest is None and os.path.exists(self.manifest_file):
+            # Manifesto ilegível: reconstrói a partir dos arquivos e regrava na compactação
+            manifest = {"partitions": self._scan_partitions()}
+            self._dirty.update(manifest["partitions"])
+        if manifest is not None:
+            self._manifest = dict(manifest.get("partitions", {}))
+            hot = self._hot_months()
+            for month, entry in self._manifest.items():
+                if month in hot:
+                    self.budgets.extend(self._read_partition(entry))
+                else:
+                    self._cold[month] = entry
+                if not entry["file"].endswith(self.PARTITION_EXTENSIONS[self.snapshot_format]):
+                    self._dirty.add(month)
+        else:
+            self._manifest = {}
+            self._load_legacy()
+        self._rebuild_index()
+        self._journal_entries = 0
+        self._journal_offset = 0
+        self._journal_clean = True
+        self._generation += 1
+        if self.journal:
+            self._replay_journal()
+
+    def _load_legacy(self):
+        """Lê um snapshot de arquivo único, se existir (será particionado ao gravar)"""
+        preferred = "budgets.bin" if self.snapshot_format == "binario" else "budgets.json"
+        sources = sorted(self.legacy_files, key=lambda path: os.path.basename(path) != preferred)
+        source = next((path for path in sources if os.path.exists(path)), None)
+        if source is None:
+            return
+        self._legacy = True
+        try:
+            with open(source, 'rb') as f:
+                data = f.read()
+            self.budgets, self._pending = self._parse_snapshot(data)
+        except Exception:
+            self.budgets = []
+
+    def _scan_partitions(self) -> Dict[str, Dict]:
+        """Entradas de manifesto a partir dos arquivos ``AAAA-MM.*`` da pasta de partições"""
+        ext = self.PARTITION_EXTENSIONS[self.snapshot_format]
+        entries: Dict[str, Dict] = {}
+        for name in sorted(os.listdir(self.partitions_dir)):
+            month, dot, suffix = name.partition(".")
+            if dot and "." + suffix in self.PARTITION_EXTENSIONS.values() and len(month) == 7:
+                if month not in entries or name.endswith(ext):
+                    # Sem estatísticas: todas são lidas na abertura
+                    entries[month] = {"file": name, "count": 0, "max_saved": "9999"}
+        return entries
+
+    def _hot_months(self) -> Set[str]:
+        """Partições lidas na abertura: meses recentes e, se preciso, anteriores até EAGER_RECORDS"""
+        months = sorted(self._manifest, reverse=True)
+        if not self.lazy:
+            return set(months)
+        today = date.today()
+        first = today.year * 12 + today.month - self.RECENT_MONTHS
+        cutoff = f"{first // 12:04d}-{first % 12 + 1:02d}"
+        hot: Set[str] = set()
+        loaded = 0
+        for month in months:
+            if month < cutoff and loaded >= self.EAGER_RECORDS:
+                break
+            hot.add(month)
+            loaded += self._manifest[month].get("count", 0)
+        return hot
+
+    def _read_partition(self, entry: Dict) -> List[Dict]:
+        """Lê o arquivo de uma partição (JSON ou binário)"""
+        path = os.path.join(self.partitions_dir, entry["file"])
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+            if is_binary_snapshot(data):
+                return decode_snapshot(data)
+            return json.loads(data)
+        except Exception as e:
+            print(f"Erro ao ler partição de orçamentos {entry['file']}: {e}")
+            return []
     
+    def _parse_snapshot(self, data: bytes):
+        """Interpreta o snapshot, retornando (orçamentos carregados, pendentes).
+
+        No formato binário e no JSON de um orçamento por linha, apenas a
+        cauda é interpretada agora; snapshots antigos (indentados) são lidos
+        por inteiro. ``pendentes`` é None ou uma função que interpreta o resto.
+        """
+        if is_binary_snapshot(data):
+            columns = SnapshotColumns(data)
+            cut = max(0, len(columns) - self.EAGER_RECORDS) if self.lazy else 0
+            return columns.records(cut), (lambda: columns.records(0, cut)) if cut else None
+        lines = data.split(b"\n")
+        if self.lazy and len(lines) > 2 and lines[0].strip() == b"[" and lines[1].startswith(b"{"):
+            body = [line for line in lines[1:] if line.strip() not in (b"", b"]")]
+            cut = max(0, len(body) - self.EAGER_RECORDS)
+            try:
+                recent = [json.loads(line.rstrip(b",")) for line in body[cut:]]
+                older = body[:cut]
+                return recent, (lambda: [json.loads(line.rstrip(b",")) for line in older]) if older else None
+            except ValueError:
+                pass
+        return json.loads(data), None
+
+    def _ensure_loaded(self, months: Optional[Iterable[str]] = None):
+        """Lê partições frias (todas ou só as de ``months``) e o resto de um snapshot único.
+
+        Registros já presentes em memória (regravados pelo journal) prevalecem
+        sobre a versão em disco, e excluídos não voltam.
+        """
+        if not self._pending and not self._cold:
+            return
+        with self._lock:
+            pending, self._pending = self._pending, None
+            if pending:
+                older = []
+                for budget_dict in pending():
+                    if budget_dict["id"] not in self._id_index:
+                        older.append(budget_dict)
+                self.budgets = older + self._live()
+                self._rebuild_index()
+            wanted = list(self._cold) if months is None else [m for m in months if m in self._cold]
+            if not wanted:
+                return
+            added = 0
+            for month in wanted:
+                for budget_dict in self._read_partition(self._cold.pop(month)):
+                    budget_id = budget_dict["id"]
+                    if budget_id in self._id_index or budget_id in self._deleted:
+                        continue
+                    self._id_index[budget_id] = len(self.budgets)
+                    self.budgets.append(budget_dict)
+                    self._name_index.add(budget_id, budget_dict["client"]["name"])
+                    added += 1
+            if added:
+                live = self._live()
+                self._created_index.build((b["created_date"], b["id"]) for b in live)
+                self._saved_index.build((b["saved_date"], b["id"]) for b in live)
+
+    def _ensure_date_range(self, date_from: str, date_to: str):
+        """Lê as partições frias cujos meses cruzam o intervalo de ``created_date``"""
+        if self._pending:
+            self._ensure_loaded()
+        low, high = (date_from or "")[:7], (date_to or "")[:7]
+        self._ensure_loaded([m for m in list(self._cold) if (not low or m >= low) and (not high or m <= high)])
+
+    def _ensure_recent(self, count: int):
+        """Garante em memória os ``count`` orçamentos salvos mais recentemente"""
+        if count <= 0:
+            return
+        if self._pending and count > len(self._id_index):
+            self._ensure_loaded()
+        while self._cold:
+            kth = next(islice(self._saved_index.iter_desc(), count - 1, None), None)
+            threshold = self._get(kth)["saved_date"] if kth is not None else ""
+            candidates = [m for m, entry in self._cold.items() if entry.get("max_saved", "") >= threshold]
+            if not candidates:
+                return
+            self._ensure_loaded([max(candidates, key=lambda m: self._cold[m].get("max_saved", ""))])
+
     def _save_budgets(self):
-        """Salva orçamentos no arquivo"""
+        """Grava as partições alteradas (chamar com a trava)"""
+        parts = self._changed_partitions()
+        self._write_partitions({month: self._encode_snapshot(records) for month, records in parts.items()}, parts)
+
+    def _changed_partitions(self) -> Dict[str, List[Dict]]:
+        """Orçamentos dos meses a regravar, lendo antes as partições frias envolvidas"""
+        if self._legacy:
+            self._ensure_loaded()
+            months = set(self._manifest) | {partition_key(b) for b in self._live()}
+        else:
+            months = set(self._dirty)
+            self._ensure_loaded(months)
+        self._dirty -= months
+        parts: Dict[str, List[Dict]] = {month: [] for month in months}
+        for budget_dict in self.budgets:
+            if budget_dict is not None:
+                records = parts.get(partition_key(budget_dict))
+                if records is not None:
+                    records.append(budget_dict)
+        return parts
+
+    def _encode_snapshot(self, budget_dicts: List[Dict]) -> bytes:
+        if self.snapshot_format == "binario":
+            return encode_snapshot(budget_dicts)
+        return dump_snapshot(budget_dicts)
+
+    def _write_partitions(self, encoded: Dict[str, bytes], parts: Dict[str, List[Dict]]):
+        """Grava as partições e depois o manifesto (chamar com a trava).
+
+        Cada arquivo é trocado de forma atômica; uma queda antes do manifesto
+        é coberta pelo journal, que só é truncado depois.
+        """
+        os.makedirs(self.partitions_dir, exist_ok=True)
+        manifest = dict(self._manifest)
+        ext = self.PARTITION_EXTENSIONS[self.snapshot_format]
+        for month, records in parts.items():
+            old = manifest.pop(month, None)
+            name = month + ext
+            if records:
+                atomic_write_bytes(os.path.join(self.partitions_dir, name), encoded[month])
+                manifest[month] = {
+                    "file": name,
+                    "count": len(records),
+                    "max_saved": max(b["saved_date"] for b in records),
+                }
+            if old is not None and (not records or old["file"] != name):
+                old_path = os.path.join(self.partitions_dir, old["file"])
+                if os.path.exists(old_path):
+                    os.remove(old_path)
+        atomic_write_json(self.manifest_file, {"version": 1, "partitions": dict(sorted(manifest.items()))}, indent=2)
+        self._manifest = manifest
+        if self._legacy:
+            # O snapshot antigo fica guardado como .bak em vez de ser apagado
+            for path in self.legacy_files:
+                if os.path.exists(path):
+                    os.replace(path, path + ".bak")
+            self._legacy = False
+        self._snapshot_sig = self._snapshot_signature()
+
+    def _snapshot_signature(self):
+        """Assinatura do snapshot no disco: a do manifesto ou, sem ele, a dos arquivos únicos"""
+        sig = file_signature(self.manifest_file)
+        if sig is not None:
+            return sig
+        return tuple(file_signature(path) for path in self.legacy_files)
+
+    def _journal_size(self) -> int:
+        try:
+            return os.path.getsize(self.journal_file)
+        except OSError:
+            return 0
+
+    def _is_stale(self) -> bool:
+        """Indica se outro processo alterou snapshot ou journal desde a última leitura"""
+        if self._snapshot_signature() != self._snapshot_sig:
+            return True
+        return self.journal and self._journal_size() != self._journal_offset
+
+    def _refresh(self):
+        """Incorpora alterações feitas por outros processos (chamar com a trava)"""
+        if self._snapshot_signature() != self._snapshot_sig:
+            self._load_budgets()
+        elif self.journal:
+            size = self._journal_size()
+            if size < self._journal_offset:
+                # Journal foi compactado por outro processo
+                self._load_budgets()
+            elif size > self._journal_offset:
+                self._replay_journal()
+
+    def _sync(self):
+        """Recarrega antes de uma leitura, apenas se os arquivos mudaram"""
+        if self._is_stale():
+            generation = self._generation
+            with self._lock, file_lock(self.lock_file):
+                self._refresh()
+            if self._generation != generation:
+                self._notify("reloaded")
+
+    def _rebuild_index(self):
+        """Reconstrói o índice ID -> posição a partir da lista"""
+        self._id_index = {}
+        self._tombstones = 0
+        self._budget_cache.clear()
+        self._name_index.clear()
+        for i, budget_dict in enumerate(self.budgets):
+            if budget_dict is None:
+                self._tombstones += 1
+            else:
+                self._id_index[budget_dict["id"]] = i
+                self._name_index.add(budget_dict["id"], budget_dict["client"]["name"])
+        live = self._live()
+        self._created_index.build((b["created_date"], b["id"]) for b in live)
+        self._saved_index.build((b["saved_date"], b["id"]) for b in live)
+
+    def _insert_record(self, budget_dict: Dict):
+        """Insere um orçamento, substituindo o existente com o mesmo ID"""
+        budget_id = budget_dict["id"]
+        pos = self._id_index.get(budget_id)
+        if pos is not None:
+            self._unindex_dates(self.budgets[pos])
+            self._budget_cache.pop(budget_id, None)
+            self.budgets[pos] = budget_dict
+        else:
+            self._id_index[budget_id] = len(self.budgets)
+            self.budgets.append(budget_dict)
+        self._name_index.add(budget_id, budget_dict["client"]["name"])
+        self._created_index.add(budget_dict["created_date"], budget_id)
+        self._saved_index.add(budget_dict["saved_date"], budget_id)
+
+    def _unindex_dates(self, budget_dict: Dict):
+        self._created_index.remove(budget_dict["created_date"], budget_dict["id"])
+        self._saved_index.remove(budget_dict["saved_date"], budget_dict["id"])
+
+    def _remove_record(self, budget_id: str) -> bool:
+        """Remove um orçamento deixando uma lápide na sua posição"""
+        pos = self._id_index.pop(budget_id, None)
+        if pos is None:
+            return False
+        if self._cold:
+            self._deleted.add(budget_id)
+        self._unindex_dates(self.budgets[pos])
+        self.budgets[pos] = None
+        self._budget_cache.pop(budget_id, None)
+        self._name_index.remove(budget_id)
+        self._tombstones += 1
+        if self._tombstones > len(self.budgets) * self.TOMBSTONE_RATIO:
+            self._purge_tombstones()
+        return True
+
+    def _purge_tombstones(self):
+        """Remove as lápides da lista e reindexa (custo amortizado)"""
+        self.budgets = self._live()
+        self._rebuild_index()
+
+    def _live(self) -> List[Dict]:
+        return [budget_dict for budget_dict in self.budgets if budget_dict is not None]
+
+    def live_budgets(self) -> List[Dict]:
+        """Retorna os orçamentos ativos, na ordem em que foram salvos"""
+        with self._lock:
+            self._ensure_loaded()
+            return self._live()
+
+    def _replay_journal(self):
+        """Reaplica as entradas do journal a partir da última posição lida"""
+        if not os.path.exists(self.journal_file):
+            return
         try:
-            with open(self.budgets_file, 'w', encoding='utf-8') as f:
-                json.dump(self.budgets, f, ensure_ascii=False, indent=2, default=str)
+            with open(self.journal_file, 'rb') as f:
+                f.seek(self._journal_offset)
+                data = f.read()
         except Exception as e:
-            print(f"Erro ao salvar orçamentos: {e}")
+            print(f"Erro ao ler journal de orçamentos: {e}")
+            return
+        self._journal_offset += len(data)
+        if data:
+            self._journal_clean = data.endswith(b"\n")
+        for line in data.splitlines():
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                # Linha truncada (ex.: queda durante a gravação)
+                continue
+            self._apply_entry(entry)
+            self._journal_entries += 1
+            self._generation += 1
+
+    def _apply_entry(self, entry: Dict) -> bool:
+        """Aplica uma entrada do journal. Idempotente por ID, para que um
+        journal já incorporado ao snapshot possa ser reaplicado sem duplicar."""
+        op = entry.get("op")
+        if op == "save":
+            budget_dict = entry["budget"]
+            pos = self._id_index.get(budget_dict["id"])
+            if pos is not None:
+                self._dirty.add(partition_key(self.budgets[pos]))
+            self._dirty.add(partition_key(budget_dict))
+            self._insert_record(budget_dict)
+            return True
+        elif op == "delete":
+            record = self._find_record(entry["id"], entry.get("month"))
+            if record is not None:
+                self._dirty.add(partition_key(record))
+            return self._remove_record(entry["id"])
+        elif op == "client":
+            # Orçamentos passados para outro cadastro (mescla de clientes duplicados)
+            if any(budget_id not in self._id_index for budget_id in entry["ids"]):
+                self._ensure_loaded(entry.get("months"))
+            changed = False
+            for budget_id in entry["ids"]:
+                pos = self._id_index.get(budget_id)
+                if pos is None:
+                    continue
+                budget_dict = dict(self.budgets[pos], client=dict(entry["client"]))
+                self._dirty.add(partition_key(budget_dict))
+                self._insert_record(budget_dict)
+                changed = True
+            return changed
+        return False
+
+    def _find_record(self, budget_id: str, month: Optional[str] = None) -> Optional[Dict]:
+        """Registro vivo pelo ID, lendo a partição do mês (ou todas, sem o mês) se preciso"""
+        if budget_id not in self._id_index:
+            self._ensure_loaded([month] if month else None)
+        pos = self._id_index.get(budget_id)
+        return self.budgets[pos] if pos is not None else None
+
+    def _append_journal(self, entry: Dict):
+        """Anexa uma entrada ao journal (custo independente do histórico)"""
+        line = json.dumps(entry, ensure_ascii=False, default=str) + "\n"
+        if not self._journal_clean:
+            # Isola uma linha truncada deixada por uma queda anterior
+            line = "\n" + line
+        data = line.encode("utf-8")
+        with open(self.journal_file, 'ab') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        self._journal_offset += len(data)
+        self._journal_clean = True
+        self._journal_entries += 1
+
+    def _commit(self, entry: Dict) -> bool:
+        """Aplica e persiste uma alteração numa única seção crítica entre processos.
+
+        Antes de aplicar, incorpora o que outros processos gravaram, para que
+        nenhuma gravação concorrente seja perdida. Os ouvintes são avisados
+        depois de liberadas as travas.
+        """
+        with self._lock, file_lock(self.lock_file):
+            generation = self._generation
+            self._refresh()
+            reloaded = self._generation != generation
+            removed = None
+            if entry["op"] == "delete":
+                removed = self._find_record(entry["id"], entry.get("month"))
+            applied = self._apply_entry(entry)
+            if applied:
+                try:
+                    if self.journal:
+                        self._append_journal(entry)
+                    else:
+                        self._save_budgets()
+                except Exception as e:
+                    print(f"Erro ao salvar orçamentos: {e}")
+        if reloaded:
+            self._notify("reloaded")
+        if not applied:
+            return False
+        if entry["op"] == "save":
+            self._notify("saved", entry["budget"]["id"], entry["budget"])
+        elif entry["op"] == "delete":
+            self._notify("deleted", entry["id"], removed)
+        else:
+            self._notify("updated")
+        if self.journal and self._journal_entries >= self.compact_threshold:
+            self._start_compaction()
+        return True
+
+    def _start_compaction(self):
+        """Dispara a compactação em segundo plano, se ainda não estiver rodando"""
+        if self._compaction_thread is not None and self._compaction_thread.is_alive():
+            return
+        self._compaction_thread = threading.Thread(target=self.compact, name="budget-compaction", daemon=True)
+        self._compaction_thread.start()
+
+    def compact(self):
+        """Incorpora o journal às partições e mantém apenas a cauda não incorporada.
+
+        Só os meses alterados são regravados. A serialização acontece fora das
+        travas; entradas anexadas nesse intervalo (por este ou outro processo)
+        são preservadas no novo journal. Se outro processo compactar antes,
+        esta compactação é descartada.
+        """
+        if not self.journal:
+            return
+        with self._lock, file_lock(self.lock_file):
+            self._refresh()
+            parts = self._changed_partitions()
+            legacy = self._legacy
+            base_sig = self._snapshot_sig
+            offset = self._journal_offset
+            entries = self._journal_entries
+        written = False
+        try:
+            encoded = {month: self._encode_snapshot(records) for month, records in parts.items()}
+            with self._lock, file_lock(self.lock_file):
+                if self._snapshot_signature() != base_sig or self._journal_size() < offset:
+                    return
+                self._write_partitions(encoded, parts)
+                written = True
+                tail = b""
+                if os.path.exists(self.journal_file):
+                    with open(self.journal_file, 'rb') as f:
+                        f.seek(offset)
+                        tail = f.read()
+                atomic_write_bytes(self.journal_file, tail)
+                self._journal_offset -= offset
+                self._journal_entries -= entries
+        except Exception as e:
+            print(f"Erro ao compactar orçamentos: {e}")
+        finally:
+            if not written:
+                # Os meses continuam pendentes para a próxima compactação
+                with self._lock:
+                    self._dirty |= set(parts)
+                    self._legacy = self._legacy or legacy
     
     def save_budget(self, budget: Budget) -> str:
         """Salva um orçamento e retorna ID único"""
-        budget_id = f"ORC_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{len(self.budgets)}"
-        
-        budget_dict = {
-            "id": budget_id,
-            "client": {
-                "name": budget.client.name,
-                "phone": budget.client.phone,
-                "email": budget.client.email
-            },
-            "items": [],
-            "discount": None,
-            "art_creation_total": float(budget.art_creation_total),
-            "subtotal": float(budget.subtotal),
-            "total": float(budget.total),
-            "created_date": budget.created_date,
-            "saved_date": datetime.now().isoformat()
-        }
-        
-        # Converter itens
-        for item in budget.items:
-            item_dict = {
-                "product_type": item.product_type,
-                "fabric": item.fabric,
-                "sleeve": item.sleeve,
-                "size": item.size,
-                "visual_type": item.visual_type,
-                "quantity": item.quantity,
-                "width_cm": item.width_cm,
-                "height_cm": item.height_cm,
-                "art_creation_price": float(item.art_creation_price) if item.art_creation_price else None
-            }
-            budget_dict["items"].append(item_dict)
-        
-        # Converter desconto
-        if budget.discount:
-            budget_dict["discount"] = {
-                "type": budget.discount.type,
-                "value": float(budget.discount.value),
-                "description": budget.discount.description
-            }
-        
-        self.budgets.append(budget_dict)
-        self._save_budgets()
+        budget_id = new_id("ORC")
+        budget_dict = budget_to_dict(budget, budget_id)
+        self._commit({"op": "save", "budget": budget_dict})
         return budget_id
     
     def load_budget(self, budget_id: str) -> Optional[Budget]:
         """Carrega um orçamento pelo ID"""
-        for budget_dict in self.budgets:
-            if budget_dict["id"] == budget_id:
-                return self._dict_to_budget(budget_dict)
-        return None
-    
-    def search_budgets(self, client_name: str = "", date_from: str = "", date_to: str = "") -> List[Dict]:
-        """Busca orçamentos por critérios"""
-        results = []
-        
-        for budget_dict in self.budgets:
-            # Filtro por nome do cliente
-            if client_name and client_name.lower() not in budget_dict["client"]["name"].lower():
-                continue
-            
-            # Filtro por data
+        self._sync()
+        with self._lock:
+            if budget_id not in self._id_index:
+                self._ensure_loaded()
+            budget = self._budget_cache.get(budget_id)
+            if budget is not None:
+                self._budget_cache.move_to_end(budget_id)
+                self.cache_hits += 1
+                return clone_budget(budget)
+            pos = self._id_index.get(budget_id)
+            if pos is None:
+                return None
+            self.cache_misses += 1
+            budget = self._dict_to_budget(self.budgets[pos])
+            self._budget_cache[budget_id] = budget
+            if len(self._budget_cache) > self.CACHE_SIZE:
+                self._budget_cache.popitem(last=False)
+            return clone_budget(budget)
+
+    def cache_stats(self) -> Dict[str, int]:
+        """Contadores do cache de orçamentos montados (para ajuste de CACHE_SIZE)"""
+        return {
+            "hits": self.cache_hits,
+            "misses": self.cache_misses,
+            "size": len(self._budget_cache),
+            "capacity": self.CACHE_SIZE,
+        }
+    
+    def _get(self, budget_id: str) -> Dict:
+        return self.budgets[self._id_index[budget_id]]
+
+    def search_budgets(self, client_name: str = "", date_from: str = "", date_to: str = "",
+                       limit: Optional[int] = None, offset: int = 0) -> List[Dict]:
+        """Busca orçamentos por critérios, do mais recente para o mais antigo.
+
+        Sem filtros, percorre o índice de ``saved_date`` de trás para frente e
+        para ao completar a página. Com filtros, os candidatos vêm do índice
+        de trigramas e/ou de uma fatia do índice de ``created_date``, e só eles
+        são ordenados.
+
+        Partições frias só são lidas se a consulta chegar a elas: as do
+        intervalo de datas, as necessárias para completar a página ou todas,
+        numa busca por nome sem datas.
+        """
+        self._sync()
+        stop = None if limit is None else offset + limit
+        # Sob a trava: a compactação em segundo plano pode recarregar a lista e os índices
+        with self._lock:
             if date_from or date_to:
-                budget_date = budget_dict["created_date"]
-                if date_from and budget_date < date_from:
-                    continue
-                if date_to and budget_date > date_to:
-                    continue
+                self._ensure_date_range(date_from, date_to)
+            elif client_name or stop is None:
+                self._ensure_loaded()
+            else:
+                self._ensure_recent(stop)
+            
+            if not client_name and not (date_from or date_to):
+                return [self._get(bid) for bid in islice(self._saved_index.iter_desc(), offset, stop)]
             
-            results.append(budget_dict)
-        
-        # Ordenar por data mais recente
-        results.sort(key=lambda x: x["saved_date"], reverse=True)
-        return results
+            ids = None
+            if client_name:
+                # Filtro por nome do cliente (sem acento/caixa) via índice de trigramas
+                ids = self._name_index.contains(client_name)
+            if date_from or date_to:
+                # Filtro por data via índice ordenado
+                in_range = self._created_index.range(date_from, date_to)
+                ids = set(in_range) if ids is None else ids.intersection(in_range)
+            matches = (self._get(bid) for bid in ids)
+            if stop is None:
+                # Ordenar por data mais recente
+                results = sorted(matches, key=lambda x: x["saved_date"], reverse=True)
+            else:
+                results = heapq.nlargest(stop, matches, key=lambda x: x["saved_date"])
+        return results[offset:]
+    
+    def latest_saved(self, match: Callable[[Dict], bool]) -> Optional[Dict]:
+        """Orçamento salvo mais recentemente que satisfaz ``match``.
+
+        Percorre o índice de ``saved_date`` de trás para frente; partições frias
+        são lidas uma a uma (maior ``max_saved`` primeiro) só enquanto puderem
+        ter um orçamento mais recente que o encontrado.
+        """
+        self._sync()
+        if self._pending:
+            self._ensure_loaded()
+        with self._lock:
+            while True:
+                found = next((b for b in map(self._get, self._saved_index.iter_desc()) if match(b)), None)
+                threshold = found["saved_date"] if found is not None else ""
+                candidates = [m for m, entry in self._cold.items() if entry.get("max_saved", "") > threshold]
+                if not candidates:
+                    return found
+                self._ensure_loaded([max(candidates, key=lambda m: self._cold[m].get("max_saved", ""))])
+
+    def search_summaries(self, client_name: str = "", date_from: str = "", date_to: str = "",
+                         limit: int = 50, offset: int = 0) -> List[BudgetSummary]:
+        """Página de resultados resumidos; os itens só são materializados em ``load_budget``"""
+        return [summarize_budget(b) for b in self.search_budgets(client_name, date_from, date_to, limit, offset)]
     
     def get_recent_budgets(self, limit: int = 10) -> List[Dict]:
         """Retorna orçamentos mais recentes"""
-        return sorted(self.budgets, key=lambda x: x["saved_date"], reverse=True)[:limit]
+        return self.search_budgets(limit=limit)
     
     def delete_budget(self, budget_id: str) -> bool:
         """Remove um orçamento"""
-        for i, budget_dict in enumerate(self.budgets):
-            if budget_dict["id"] == budget_id:
-                del self.budgets[i]
-                self._save_budgets()
-                return True
-        return False
+        entry = {"op": "delete", "id": budget_id}
+        with self._lock:
+            pos = self._id_index.get(budget_id)
+            if pos is not None:
+                entry["month"] = partition_key(self.budgets[pos])
+        return self._commit(entry)
     
+    def reassign_client(self, budget_ids: List[str], client: Dict) -> bool:
+        """Troca os dados do cliente (nome, telefone, email) dos orçamentos, numa única entrada do journal"""
+        with self._lock:
+            months = sorted({partition_key(self._get(bid)) for bid in budget_ids if bid in self._id_index})
+        entry = {"op": "client", "ids": list(budget_ids), "client": dict(client)}
+        if months:
+            entry["months"] = months
+        return self._commit(entry)
+
     def _dict_to_budget(self, budget_dict: Dict) -> Budget:
         """Converte dicionário para objeto Budget"""
-        client = ClientInfo(
-            name=budget_dict["client"]["name"],
-            phone=budget_dict["client"]["phone"],
-            email=budget_dict["client"]["email"]
+        return dict_to_budget(budget_dict)
+
+
+def dump_snapshot(budget_dicts: List[Dict]) -> bytes:
+    """Serializa o snapshot como array JSON com um orçamento por linha"""
+    lines = [json.dumps(b, ensure_ascii=False, default=str) for b in budget_dicts]
+    return ("[\n" + ",\n".join(lines) + "\n]\n").encode("utf-8")
+
+
+def budget_to_dict(budget: Budget, budget_id: str) -> Dict:
+    """Converte um objeto Budget para o dicionário persistido"""
+    budget_dict = {
+        "id": budget_id,
+        "client": {
+            "name": budget.client.name,
+            "phone": budget.client.phone,
+            "email": budget.client.email
+        },
+        "items": [],
+        "discount": None,
+        "art_creation_total": float(budget.art_creation_total),
+        "subtotal": float(budget.subtotal),
+        "total": float(budget.total),
+        "created_date": budget.created_date,
+        "saved_date": datetime.now().isoformat(),
+        "price_version": budget.price_version,
+        "client_type": budget.client_type,
+    }
+    
+    # Converter itens
+    for item in budget.items:
+        item_dict = {
+            "product_type": item.product_type,
+            "fabric": item.fabric,
+            "sleeve": item.sleeve,
+            "size": item.size,
+            "visual_type": item.visual_type,
+            "other_name": item.other_name,
+            "quantity": item.quantity,
+            "width_cm": item.width_cm,
+            "height_cm": item.height_cm,
+            "art_creation_price": float(item.art_creation_price) if item.art_creation_price else None
+        }
+        budget_dict["items"].append(item_dict)
+    
+    # Converter desconto
+    if budget.discount:
+        budget_dict["discount"] = {
+            "type": budget.discount.type,
+            "value": float(budget.discount.value),
+            "description": budget.discount.description
+        }
+    
+    return budget_dict
+
+
+def partition_key(budget_dict: Dict) -> str:
+    """Partição (mês ``AAAA-MM`` de ``created_date``) de um orçamento"""
+    return (budget_dict.get("created_date") or "")[:7] or "0000-00"
+
+
+def _shallow_copy(obj):
+    """Cópia rasa de uma dataclass sem passar pelo ``__init__``"""
+    new = object.__new__(type(obj))
+    new.__dict__.update(obj.__dict__)
+    return new
+
+
+def clone_budget(budget: Budget) -> Budget:
+    """Cópia de um Budget com cliente, itens e desconto próprios (os valores são imutáveis)"""
+    new = _shallow_copy(budget)
+    new.client = _shallow_copy(budget.client)
+    new.items = [_shallow_copy(item) for item in budget.items]
+    new.discount = _shallow_copy(budget.discount) if budget.discount else None
+    return new
+
+
+def dict_to_budget(budget_dict: Dict) -> Budget:
+    """Converte dicionário para objeto Budget"""
+    client = ClientInfo(
+        name=budget_dict["client"]["name"],
+        phone=budget_dict["client"]["phone"],
+        email=budget_dict["client"]["email"]
+    )
+    
+    budget = Budget(
+        client=client,
+        created_date=budget_dict["created_date"],
+        price_version=budget_dict.get("price_version"),
+        client_type=budget_dict.get("client_type") or "normal",
+    )
+    
+    # Converter itens
+    for item_dict in budget_dict["items"]:
+        item = ProductItem(
+            product_type=item_dict["product_type"],
+            fabric=item_dict.get("fabric"),
+            sleeve=item_dict.get("sleeve"),
+            size=item_dict.get("size"),
+            visual_type=item_dict.get("visual_type"),
+            other_name=item_dict.get("other_name"),
+            quantity=item_dict["quantity"],
+            width_cm=item_dict.get("width_cm"),
+            height_cm=item_dict.get("height_cm"),
+            art_creation_price=Decimal(str(item_dict["art_creation_price"])) if item_dict.get("art_creation_price") else None
         )
-        
-        budget = Budget(
-            client=client,
-            created_date=budget_dict["created_date"]
+        budget.items.append(item)
+    
+    # Converter desconto
+    if budget_dict.get("discount"):
+        discount_dict = budget_dict["discount"]
+        budget.discount = Discount(
+            type=discount_dict["type"],
+            value=Decimal(str(discount_dict["value"])),
+            description=discount_dict["description"]
         )
-        
-        # Converter itens
-        for item_dict in budget_dict["items"]:
-            item = ProductItem(
-                product_type=item_dict["product_type"],
-                fabric=item_dict.get("fabric"),
-                sleeve=item_dict.get("sleeve"),
-                size=item_dict.get("size"),
-                visual_type=item_dict.get("visual_type"),
-                quantity=item_dict["quantity"],
-                width_cm=item_dict.get("width_cm"),
-                height_cm=item_dict.get("height_cm"),
-                art_creation_price=Decimal(str(item_dict["art_creation_price"])) if item_dict.get("art_creation_price") else None
-            )
-            budget.items.append(item)
-        
-        # Converter desconto
-        if budget_dict.get("discount"):
-            discount_dict = budget_dict["discount"]
-            budget.discount = Discount(
-                type=discount_dict["type"],
-                value=Decimal(str(discount_dict["value"])),
-                description=discount_dict["description"]
-            )
-        
-        budget.art_creation_total = Decimal(str(budget_dict["art_creation_total"]))
-        budget.subtotal = Decimal(str(budget_dict["subtotal"]))
-        budget.total = Decimal(str(budget_dict["total"]))
-        
-        return budget
+    
+    budget.art_creation_total = Decimal(str(budget_dict["art_creation_total"]))
+    budget.subtotal = Decimal(str(budget_dict["subtotal"]))
+    budget.total = Decimal(str(budget_dict["total"]))
+    
+    return budget
+
+
+def convert_snapshot_format(storage_dir: str = "data", snapshot_format: str = "binario") -> int:
+    """Regrava as partições de orçamentos no formato indicado, já incorporando o journal.
+
+    Converte nos dois sentidos ("json" <-> "binario") e também divide um
+    snapshot de arquivo único em partições; os arquivos no formato anterior
+    são removidos. Retorna a quantidade de orçamentos convertidos.
+    """
+    storage = BudgetStorage(storage_dir, snapshot_format=snapshot_format)
+    if storage.journal:
+        storage.compact()
+    else:
+        with storage._lock, file_lock(storage.lock_file):
+            storage._save_budgets()
+    return len(storage.live_budgets())
+
+
+if __name__ == "__main__":
+    target = sys.argv[1] if len(sys.argv) > 1 else "binario"
+    directory = sys.argv[2] if len(sys.argv) > 2 else "data"
+    total = convert_snapshot_format(directory, target)
+    print(f"{total} orçamento(s) convertido(s) para o formato {target}")
@@ -0,0 +1,114 @@
+"""Totais de um orçamento em edição, mantidos de forma incremental."""
+from decimal import Decimal
+from typing import List, Optional, Sequence
+
+from .pricing_service import PricingService, discount_amount
+from .price_table import PriceTable
+from .simulator_models import ClientType, Discount, ProductItem
+
+_ZERO = Decimal("0")
+
+
+def _quantity(item: ProductItem) -> int:
+    try:
+        return int(item.quantity)
+    except Exception:
+        return 0
+
+
+class BudgetTotals:
+    """Subtotal, criação de arte e quantidade de um orçamento, com preço por item"""
+
+    def __init__(self, pricing: PricingService, client_type: ClientType = "normal") -> None:
+        self.pricing = pricing
+        self.client_type: ClientType = client_type
+        # None: linha carregada ainda não cotada (ver ``load``)
+        self.unit_prices: List[Optional[Decimal]] = []
+        self.subtotal = _ZERO
+        self.art_creation_total = _ZERO
+        self.quantity = 0
+        self._table: Optional[PriceTable] = None
+        self._stored: Optional[PricingService] = None
+
+    def __len__(self) -> int:
+        return len(self.unit_prices)
+
+    def _price(self, item: ProductItem) -> Decimal:
+        return self.pricing.quote_item(item, self.client_type)
+
+    def _include(self, item: ProductItem, unit_price: Decimal, sign: int) -> None:
+        self.subtotal += sign * unit_price * item.quantity
+        if item.art_creation_price:
+            self.art_creation_total += sign * item.art_creation_price
+        self.quantity += sign * _quantity(item)
+
+    def reprice(self, items: Sequence[ProductItem], client_type: Optional[ClientType] = None,
+                pricing: Optional[PricingService] = None) -> None:
+        """Recalcula tudo (outro orçamento, tipo de cliente ou tabela de preços)"""
+        if client_type is not None:
+            self.client_type = client_type
+        if pricing is not None:
+            self.pricing = pricing
+        self._table = self.pricing.table
+        self._stored = None
+        self.unit_prices = []
+        self.subtotal = _ZERO
+        self.art_creation_total = _ZERO
+        self.quantity = 0
+        for item in items:
+            self.add(item)
+
+    def load(self, items: Sequence[ProductItem], subtotal: Decimal, art_creation_total: Decimal,
+             client_type: ClientType, stored: PricingService) -> None:
+        """Totais gravados de um orçamento carregado, sem reprecificar os itens.
+
+        O unitário de uma linha carregada só é cotado, com ``stored`` (serviço
+        da versão em que o orçamento foi salvo), quando ela é trocada,
+        removida ou impressa; itens novos usam ``pricing`` (tabela atual).
+        """
+        self.client_type = client_type
+        self._table = self.pricing.table
+        self._stored = stored
+        self.unit_prices = [None] * len(items)
+        self.subtotal = Decimal(subtotal)
+        self.art_creation_total = Decimal(art_creation_total)
+        self.quantity = sum(_quantity(item) for item in items)
+
+    def unit_price(self, index: int, item: ProductItem) -> Decimal:
+        """Preço unitário da linha (cota as linhas carregadas na primeira consulta)"""
+        unit_price = self.unit_prices[index]
+        if unit_price is None:
+            unit_price = self._stored.quote_item(item, self.client_type)
+            self.unit_prices[index] = unit_price
+        return unit_price
+
+    def line_prices(self, items: Sequence[ProductItem]) -> List[Decimal]:
+        return [self.unit_price(i, item) for i, item in enumerate(items)]
+
+    def refresh(self, items: Sequence[ProductItem]) -> bool:
+        """Reprecifica se a tabela de preços mudou desde a última reprecificação"""
+        if self.pricing.table is self._table:
+            return False
+        self.reprice(items)
+        return True
+
+    def add(self, item: ProductItem) -> None:
+        unit_price = self._price(item)
+        self.unit_prices.append(unit_price)
+        self._include(item, unit_price, 1)
+
+    def replace(self, index: int, old: ProductItem, new: ProductItem) -> None:
+        self._include(old, self.unit_price(index, old), -1)
+        unit_price = self._price(new)
+        self.unit_prices[index] = unit_price
+        self._include(new, unit_price, 1)
+
+    def remove(self, index: int, item: ProductItem) -> None:
+        self._include(item, self.unit_price(index, item), -1)
+        del self.unit_prices[index]
+
+    def discount(self, discount: Optional[Discount]) -> Decimal:
+        return discount_amount(self.subtotal, discount)
+
+    def total(self, discount: Optional[Discount]) -> Decimal:
+        return self.subtotal + self.art_creation_total - self.discount(discount)
@@ -0,0 +1,251 @@
+"""Detecção e mescla de clientes duplicados em ``clients.json``."""
+import re
+import sys
+from functools import lru_cache
+from dataclasses import dataclass, field
+from difflib import SequenceMatcher
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .budget_storage import BudgetStorage
+from .client_metrics import budget_client_key, client_key
+from .clients import Client, ClientStorage, normalize_phone
+from .search_index import fold_text
+
+# Palavras ignoradas na chave fonética ("João da Silva" == "João Silva")
+_PARTICLES = {"da", "das", "de", "do", "dos", "e"}
+# Regras fonéticas simplificadas para nomes em português (aplicadas em ordem)
+_PHONETIC_RULES = [
+    (re.compile(r"[^a-z]"), ""),
+    (re.compile(r"ph"), "f"),
+    (re.compile(r"lh"), "l"),
+    (re.compile(r"nh"), "n"),
+    (re.compile(r"ch|sh|x"), "s"),
+    (re.compile(r"qu|ck|q"), "k"),
+    (re.compile(r"c(?=[eiy])"), "s"),
+    (re.compile(r"c"), "k"),
+    (re.compile(r"g(?=[eiy])"), "j"),
+    (re.compile(r"th"), "t"),
+    (re.compile(r"h"), ""),
+    (re.compile(r"w"), "v"),
+    (re.compile(r"z"), "s"),
+    (re.compile(r"[ey]"), "i"),
+    (re.compile(r"(.)\1+"), r"\1"),
+]
+# Sufixo do telefone usado no bloqueio por nome (número sem DDD)
+PHONE_SUFFIX = 8
+# Blocos maiores que isto são comparados só numa janela deslizante
+MAX_BLOCK = 50
+WINDOW = 10
+# Semelhança mínima da grafia dos nomes (``SequenceMatcher``)
+NAME_SIMILARITY = 0.92
+
+
+@lru_cache(maxsize=65536)
+def _phonetic_word(word: str) -> str:
+    # Nomes se repetem muito; o cache evita reaplicar as regras
+    for pattern, replacement in _PHONETIC_RULES:
+        word = pattern.sub(replacement, word)
+    return word
+
+
+def _phonetic_folded(words: List[str]) -> str:
+    words = [w for w in words if w not in _PARTICLES]
+    if not words:
+        return ""
+    if len(words) == 1:
+        return _phonetic_word(words[0])
+    return f"{_phonetic_word(words[0])} {_phonetic_word(words[-1])}"
+
+
+def phonetic_key(name: Optional[str]) -> str:
+    """Chave fonética do primeiro e do último nome: "Thiago de Souza" == "Tiago Sousa" """
+    return _phonetic_folded(fold_text(name).split())
+
+
+def blocking_keys(client: Client) -> List[str]:
+    """Chaves de bloqueio do cadastro; só cadastros com uma chave em comum são comparados"""
+    return _Prepared(client).blocking_keys()
+
+
+@dataclass
+class MergeProposal:
+    """Grupo de cadastros do mesmo cliente: ``keep_id`` fica, ``merge_ids`` são incorporados"""
+    keep_id: str
+    merge_ids: List[str]
+    reasons: List[str] = field(default_factory=list)
+
+
+class _Prepared:
+    """Campos normalizados de um cadastro, calculados uma única vez"""
+    __slots__ = ("client", "name", "words", "phonetic", "phone", "email")
+
+    def __init__(self, client: Client) -> None:
+        self.client = client
+        self.name = fold_text(client.name)
+        words = self.name.split()
+        self.words = set(words) - _PARTICLES
+        self.phonetic = _phonetic_folded(words)
+        self.phone = normalize_phone(client.phone)
+        self.email = (client.email or "").strip().casefold()
+
+    def blocking_keys(self) -> List[str]:
+        keys = []
+        if len(self.phone) >= PHONE_SUFFIX:
+            keys.append(f"tel:{self.phone}")
+            if self.phonetic:
+                keys.append(f"nome:{self.phonetic}:{self.phone[-PHONE_SUFFIX:]}")
+        if self.phonetic and self.email:
+            keys.append(f"nome:{self.phonetic}:{self.email}")
+        return keys
+
+
+def _same_person(a: _Prepared, b: _Prepared) -> Optional[str]:
+    """Motivo do par ser duplicado, ou None"""
+    if a.phone and a.phone == b.phone:
+        contact = "telefone"
+    elif len(a.phone) >= PHONE_SUFFIX and a.phone[-PHONE_SUFFIX:] == b.phone[-PHONE_SUFFIX:]:
+        contact = "telefone sem DDD"
+    elif a.email and a.email == b.email:
+        contact = "email"
+    else:
+        return None
+    if a.name == b.name:
+        return f"mesmo nome e {contact}"
+    if a.phonetic and a.phonetic == b.phonetic:
+        return f"nome semelhante e {contact}"
+    if a.words and b.words and (a.words <= b.words or b.words <= a.words):
+        return f"nome abreviado e {contact}"
+    if SequenceMatcher(None, a.name, b.name).ratio() >= NAME_SIMILARITY:
+        return f"grafia parecida e {contact}"
+    return None
+
+
+def _block_pairs(members: List[int], prepared: List[_Prepared]) -> Iterable[Tuple[int, int]]:
+    if len(members) <= MAX_BLOCK:
+        for i, a in enumerate(members):
+            for b in members[i + 1:]:
+                yield a, b
+        return
+    ordered = sorted(members, key=lambda i: prepared[i].name)
+    for i, a in enumerate(ordered):
+        for b in ordered[i + 1:i + 1 + WINDOW]:
+            yield a, b
+
+
+def find_duplicates(clients: List[Client]) -> List[MergeProposal]:
+    """Propostas de mescla, comparando só cadastros do mesmo bloco"""
+    prepared = [_Prepared(c) for c in clients]
+    blocks: Dict[str, List[int]] = {}
+    for i, p in enumerate(prepared):
+        for key in p.blocking_keys():
+            blocks.setdefault(key, []).append(i)
+
+    # União-busca sobre os pares duplicados
+    parent = list(range(len(prepared)))
+
+    def root(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    reasons: Dict[int, List[str]] = {}
+    compared = set()
+    for members in blocks.values():
+        if len(members) < 2:
+            continue
+        for a, b in _block_pairs(members, prepared):
+            pair = (a, b) if a < b else (b, a)
+            if pair in compared:
+                continue
+            compared.add(pair)
+            reason = _same_person(prepared[a], prepared[b])
+            if reason is None:
+                continue
+            ra, rb = root(a), root(b)
+            if ra != rb:
+                parent[rb] = ra
+                reasons.setdefault(ra, []).extend(reasons.pop(rb, []))
+            reasons[ra].append(f"{prepared[a].client.name} / {prepared[b].client.name}: {reason}")
+
+    groups: Dict[int, List[Client]] = {}
+    for i, p in enumerate(prepared):
+        groups.setdefault(root(i), []).append(p.client)
+    proposals = []
+    for r, members in groups.items():
+        if len(members) < 2:
+            continue
+        # Fica o cadastro com mais orçamentos; no empate, o mais antigo
+        keep = min(members, key=lambda c: (-c.budgets_count, c.created_at, c.id))
+        proposals.append(MergeProposal(
+            keep_id=keep.id,
+            merge_ids=sorted(c.id for c in members if c.id != keep.id),
+            reasons=reasons.get(r, []),
+        ))
+    proposals.sort(key=lambda p: p.keep_id)
+    return proposals
+
+
+class ClientDeduplicator:
+    """Encontra e mescla cadastros duplicados, atualizando os orçamentos"""
+
+    def __init__(self, clients: ClientStorage, budgets: BudgetStorage) -> None:
+        self.clients = clients
+        self.budgets = budgets
+
+    def find(self) -> List[MergeProposal]:
+        return find_duplicates(self.clients.list_clients())
+
+    def merge(self, proposals: List[MergeProposal]) -> int:
+        """Aplica as mesclas numa única gravação de ``clients.json`` e repassa os
+        orçamentos dos duplicados ao cadastro mantido. Retorna quantos
+        orçamentos foram alterados."""
+        targets: Dict[str, Client] = {}
+        with self.clients.batch():
+            for proposal in proposals:
+                old_keys = {}
+                for client_id in [proposal.keep_id] + proposal.merge_ids:
+                    client = self.clients.find_by_id(client_id)
+                    if client is not None:
+                        old_keys[client_key(client.name, client.phone)] = client
+                merged = self.clients.merge_clients(proposal.keep_id, proposal.merge_ids)
+                if merged is None:
+                    continue
+                for key in old_keys:
+                    targets[key] = merged
+                # Cadastros mesclados antes podem apontar para um que acabou de ser incorporado
+                for key, target in targets.items():
+                    if target.id in proposal.merge_ids:
+                        targets[key] = merged
+
+        # Uma passada pelos orçamentos; uma entrada do journal por cadastro mantido
+        by_target: Dict[str, List[str]] = {}
+        for budget_dict in self.budgets.live_budgets():
+            target = targets.get(budget_client_key(budget_dict))
+            if target is None:
+                continue
+            current = budget_dict["client"]
+            if (current.get("name"), current.get("phone"), current.get("email")) != (target.name, target.phone, target.email):
+                by_target.setdefault(target.id, []).append(budget_dict["id"])
+        targets_by_id = {t.id: t for t in targets.values()}
+        changed = 0
+        for target_id, budget_ids in by_target.items():
+            target = targets_by_id[target_id]
+            if self.budgets.reassign_client(budget_ids, {"name": target.name, "phone": target.phone, "email": target.email}):
+                changed += len(budget_ids)
+        return changed
+
+
+if __name__ == "__main__":
+    # python -m src.core.client_dedup [pasta] [--aplicar]
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    directory = args[0] if args else "data"
+    dedup = ClientDeduplicator(ClientStorage(directory), BudgetStorage(directory))
+    found = dedup.find()
+    for proposal in found:
+        print(f"{proposal.keep_id} <- {', '.join(proposal.merge_ids)}")
+        for reason in proposal.reasons:
+            print(f"    {reason}")
+    print(f"{len(found)} grupo(s) de clientes duplicados")
+    if found and "--aplicar" in sys.argv:
+        print(f"{dedup.merge(found)} orçamento(s) repassado(s) aos cadastros mantidos")
@@ -0,0 +1,114 @@
+"""Métricas por cliente derivadas dos orçamentos gravados."""
+import sys
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, Optional
+
+from .budget_codec import from_cents, to_cents
+from .budget_storage import BudgetStorage
+from .clients import ClientStorage, normalize_phone
+from .search_index import fold_text
+
+
+def client_key(name: Optional[str], phone: Optional[str]) -> str:
+    """Chave que liga orçamentos ao cliente: telefone normalizado ou ``nome:<nome>``"""
+    phone_key = normalize_phone(phone)
+    if phone_key:
+        return phone_key
+    name_key = fold_text(name)
+    return f"nome:{name_key}" if name_key else ""
+
+
+def budget_client_key(budget_dict: Dict) -> str:
+    client = budget_dict.get("client") or {}
+    return client_key(client.get("name"), client.get("phone"))
+
+
+@dataclass
+class ClientMetrics:
+    total_spent: float = 0.0
+    budgets_count: int = 0
+    last_purchase_at: Optional[str] = None
+
+    @property
+    def average_ticket(self) -> float:
+        return self.total_spent / self.budgets_count if self.budgets_count else 0.0
+
+
+def aggregate_budgets(budget_dicts: Iterable[Dict],
+                      key: Callable[[Dict], Optional[str]] = budget_client_key) -> Dict[str, ClientMetrics]:
+    """Agrupa os orçamentos por ``key`` (padrão ``budget_client_key``) numa única passada (somas em centavos)"""
+    cents: Dict[str, int] = {}
+    counts: Dict[str, int] = {}
+    last: Dict[str, str] = {}
+    for budget_dict in budget_dicts:
+        group = key(budget_dict)
+        if not group:
+            continue
+        cents[group] = cents.get(group, 0) + (to_cents(budget_dict.get("total")) or 0)
+        counts[group] = counts.get(group, 0) + 1
+        saved = budget_dict.get("saved_date")
+        if saved and saved > last.get(group, ""):
+            last[group] = saved
+    return {group: ClientMetrics(from_cents(cents[group]), counts[group], last.get(group)) for group in counts}
+
+
+class ClientMetricsTracker:
+    """Mantém as métricas dos clientes a partir dos eventos do ``BudgetStorage``"""
+
+    def __init__(self, budgets: BudgetStorage, clients: ClientStorage) -> None:
+        self.budgets = budgets
+        self.clients = clients
+        budgets.subscribe(self._on_budget_changed, records=True)
+
+    def metrics_for(self, client_id: str) -> Optional[ClientMetrics]:
+        client = self.clients.find_by_id(client_id)
+        if client is None:
+            return None
+        return ClientMetrics(client.total_spent, client.budgets_count, client.last_purchase_at)
+
+    def _owner(self, cache: Dict[tuple, Optional[str]]) -> Callable[[Dict], Optional[str]]:
+        """ID do cliente de cada orçamento (``ClientStorage.match_client_id``), memorizado por telefone e nome"""
+        def owner(budget_dict: Dict) -> Optional[str]:
+            data = budget_dict.get("client") or {}
+            pair = (normalize_phone(data.get("phone")), fold_text(data.get("name")))
+            if pair not in cache:
+                cache[pair] = self.clients.match_client_id(data.get("name"), data.get("phone"))
+            return cache[pair]
+        return owner
+
+    def _last_purchase(self, client_id: str) -> Optional[str]:
+        """Data do orçamento mais recente que ainda resta para o cliente"""
+        owner = self._owner({})
+        latest = self.budgets.latest_saved(lambda budget_dict: owner(budget_dict) == client_id)
+        return latest["saved_date"] if latest is not None else None
+
+    def _on_budget_changed(self, event: str, budget_id: Optional[str], record: Optional[Dict]) -> None:
+        if record is None or event not in ("saved", "deleted"):
+            return
+        # Ajuste relativo aplicado sob a trava de clients.json (dentro do batch() de quem gravou, se houver)
+        data = record.get("client") or {}
+        self.clients.apply_budget_metrics(
+            data.get("name"), data.get("phone"), from_cents(to_cents(record.get("total")) or 0),
+            record.get("saved_date"), 1 if event == "saved" else -1, self._last_purchase,
+        )
+
+    def rebuild(self) -> int:
+        """Recalcula as métricas de todos os clientes a partir do arquivo de orçamentos.
+
+        Uma passada agrupa os orçamentos pelo cliente de cada um (a mesma
+        correspondência usada nos eventos); as métricas são gravadas numa única
+        escrita de ``clients.json``. Retorna a quantidade de clientes.
+        """
+        with self.clients.batch():
+            aggregates = aggregate_budgets(self.budgets.live_budgets(), key=self._owner({}))
+            clients = self.clients.list_clients()
+            for client in clients:
+                metrics = aggregates.get(client.id) or ClientMetrics()
+                self.clients.set_metrics(client.id, metrics.total_spent, metrics.budgets_count, metrics.last_purchase_at)
+        return len(clients)
+
+
+if __name__ == "__main__":
+    directory = sys.argv[1] if len(sys.argv) > 1 else "data"
+    tracker = ClientMetricsTracker(BudgetStorage(directory), ClientStorage(directory))
+    print(f"Métricas recalculadas para {tracker.rebuild()} cliente(s)")
@@ -1,11 +1,34 @@
 from __future__ import annotations
 
+from contextlib import contextmanager
 from dataclasses import dataclass, field, asdict
-from typing import List, Optional, Dict, Any
+from typing import Callable, List, Optional, Dict, Any, Iterator, Set
 import os
 import json
+import time
 from datetime import datetime
 
+from .search_index import TrigramIndex, fold_text, only_digits
+from .file_store import atomic_write_json, file_lock, file_signature
+from .ids import id_datetime, new_id
+from .events import ChangeNotifier
+
+
+def normalize_phone(phone: Optional[str]) -> str:
+    """Chave de telefone: só dígitos, sem zero de tronco nem DDI 55.
+
+    "(92) 9 1234-5678", "+55 92 91234-5678" e "92912345678" -> "92912345678"
+    """
+    digits = only_digits(phone).lstrip("0")
+    if len(digits) >= 12 and digits.startswith("55"):
+        digits = digits[2:]
+    return digits
+
+
+def _oldest(client_ids) -> str:
+    """ID do cliente cadastrado primeiro (pela data embutida no ID, antigo ou ULID)"""
+    return min(client_ids, key=lambda cid: (id_datetime(cid) or datetime.min, cid))
+
 
 @dataclass
 class Client:
@@ -19,15 +42,34 @@ class Client:
     budgets_count: int = 0
     last_purchase_at: Optional[str] = None
 
+    @property
+    def average_ticket(self) -> float:
+        """Valor médio por orçamento"""
+        return self.total_spent / self.budgets_count if self.budgets_count else 0.0
+
+
+class ClientStorage(ChangeNotifier):
+    """Armazena clientes em JSON com operações CRUD e métricas simples.
 
-class ClientStorage:
-    """Armazena clientes em JSON com operações CRUD e métricas simples."""
+    Ouvintes (``subscribe``) recebem ``(evento, id)``: "created", "updated",
+    "deleted", "metrics" e "reloaded".
+    """
 
     def __init__(self, storage_dir: str = "data") -> None:
+        super().__init__()
         self.storage_dir = storage_dir
         self.clients_file = os.path.join(storage_dir, "clients.json")
+        self._sig = None
+        self._generation = 0
+        # Estado de ``batch()``: profundidade, gravação adiada e avisos em espera
+        self._batch_depth = 0
+        self._unsaved = False
+        self._flush_interval: Optional[float] = None
+        self._last_flush = 0.0
+        self._queued: List[tuple] = []
         self._ensure_storage_dir()
-        self._load()
+        with file_lock(self.clients_file):
+            self._load()
 
     def _ensure_storage_dir(self) -> None:
         if not os.path.exists(self.storage_dir):
@@ -35,64 +77,341 @@ class ClientStorage:
 
     def _load(self) -> None:
         self.clients: List[Dict[str, Any]] = []
+        self._sig = file_signature(self.clients_file)
         if os.path.exists(self.clients_file):
             try:
                 with open(self.clients_file, "r", encoding="utf-8") as f:
                     self.clients = json.load(f)
             except Exception:
                 self.clients = []
+        self._generation += 1
+        self._rebuild_indexes()
+
+    def _rebuild_indexes(self) -> None:
+        self._by_id: Dict[str, Dict[str, Any]] = {}
+        self._by_phone: Dict[str, Set[str]] = {}
+        self._name_index = TrigramIndex()
+        self._phone_index = TrigramIndex()
+        for c in self.clients:
+            self._index(c)
+
+    def _index(self, c: Dict[str, Any]) -> None:
+        phone = normalize_phone(c.get("phone"))
+        self._by_id[c["id"]] = c
+        if phone:
+            self._by_phone.setdefault(phone, set()).add(c["id"])
+        self._name_index.add(c["id"], c.get("name"))
+        self._phone_index.add(c["id"], phone)
+
+    def _unindex(self, client_id: str) -> None:
+        c = self._by_id.pop(client_id, None)
+        if c is not None:
+            phone = normalize_phone(c.get("phone"))
+            ids = self._by_phone.get(phone)
+            if ids is not None:
+                ids.discard(client_id)
+                if not ids:
+                    del self._by_phone[phone]
+        self._name_index.remove(client_id)
+        self._phone_index.remove(client_id)
 
     def _save(self) -> None:
+        if self._batch_depth:
+            # Dentro de batch(): grava no fim do bloco ou, com intervalo, no máximo uma vez por intervalo
+            self._unsaved = True
+            if self._flush_interval is None or time.monotonic() - self._last_flush < self._flush_interval:
+                return
         try:
-            with open(self.clients_file, "w", encoding="utf-8") as f:
-                json.dump(self.clients, f, ensure_ascii=False, indent=2)
+            atomic_write_json(self.clients_file, self.clients, indent=2)
+            self._sig = file_signature(self.clients_file)
+            self._unsaved = False
+            self._last_flush = time.monotonic()
         except Exception as e:
             print(f"Erro ao salvar clientes: {e}")
 
+    def _notify(self, event: str, key: Optional[str] = None, record: Any = None) -> None:
+        if self._batch_depth:
+            self._queued.append((event, key))
+        else:
+            super()._notify(event, key)
+
+    def _sync(self) -> None:
+        """Recarrega se outro processo alterou o arquivo"""
+        if file_signature(self.clients_file) != self._sig:
+            with file_lock(self.clients_file):
+                self._load()
+            self._notify("reloaded")
+
+    @contextmanager
+    def batch(self, flush_interval: Optional[float] = None) -> Iterator["ClientStorage"]:
+        """Agrupa alterações: aplicadas em memória e gravadas uma única vez ao final.
+
+        O bloco inteiro roda sob a trava de arquivo, então nenhuma outra
+        sessão grava no meio. Os ouvintes são avisados depois da gravação.
+        Se o bloco falhar, o que já foi aplicado é gravado mesmo assim.
+        Com ``flush_interval`` (segundos), lotes longos gravam também no
+        meio do bloco, no máximo uma vez por intervalo.
+
+            with storage.batch():
+                client = storage.create_client(...)
+                storage.update_client(...)
+        """
+        if self._batch_depth:
+            self._batch_depth += 1
+            try:
+                yield self
+            finally:
+                self._batch_depth -= 1
+            return
+        with self._locked():
+            self._batch_depth = 1
+            self._flush_interval = flush_interval
+            self._last_flush = time.monotonic()
+            try:
+                yield self
+            finally:
+                self._batch_depth = 0
+                if self._unsaved:
+                    self._save()
+        queued, self._queued = self._queued, []
+        for event, key in queued:
+            self._notify(event, key)
+
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        """Seção crítica entre processos para alterações, sobre a versão atual do disco"""
+        if self._batch_depth:
+            # Trava já obtida pelo batch()
+            yield
+            return
+        generation = self._generation
+        with file_lock(self.clients_file):
+            if file_signature(self.clients_file) != self._sig:
+                self._load()
+            yield
+        if self._generation != generation:
+            self._notify("reloaded")
+
     def list_clients(self) -> List[Client]:
+        self._sync()
         return [Client(**c) for c in self.clients]
 
     def create_client(self, name: str, phone: str, email: Optional[str] = None) -> Client:
-        client_id = f"CLI_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{len(self.clients)}"
-        client = Client(id=client_id, name=name, phone=phone, email=email)
-        self.clients.append(asdict(client))
-        self._save()
+        with self._locked():
+            client_id = new_id("CLI")
+            client = Client(id=client_id, name=name, phone=phone, email=email)
+            record = asdict(client)
+            self.clients.append(record)
+            self._index(record)
+            self._save()
+        self._notify("created", client_id)
         return client
 
     def update_client(self, client: Client) -> None:
-        for i, c in enumerate(self.clients):
-            if c.get("id") == client.id:
-                self.clients[i] = asdict(client)
-                self._save()
+        """Grava nome, telefone e email do cadastro.
+
+        As métricas vêm do registro atual (relido em ``_locked``), não do
+        ``client`` recebido, para não desfazer um ``apply_budget_metrics``
+        de outra sessão.
+        """
+        with self._locked():
+            record = self._by_id.get(client.id)
+            if record is None:
                 return
+            # Atualiza o mesmo dicionário que está na lista (sem procurar a posição)
+            self._unindex(client.id)
+            record.update(name=client.name, phone=client.phone, email=client.email)
+            self._index(record)
+            self._save()
+        self._notify("updated", client.id)
 
     def delete_client(self, client_id: str) -> None:
-        self.clients = [c for c in self.clients if c.get("id") != client_id]
-        self._save()
+        with self._locked():
+            record = self._by_id.get(client_id)
+            if record is None:
+                return
+            self.clients = [c for c in self.clients if c is not record]
+            self._unindex(client_id)
+            self._save()
+        self._notify("deleted", client_id)
+
+    def merge_clients(self, keep_id: str, merge_ids: List[str]) -> Optional[Client]:
+        """Incorpora os cadastros ``merge_ids`` ao cadastro ``keep_id`` e os remove.
+
+        As métricas são somadas (última compra é a mais recente), o email vazio
+        é preenchido com o de um duplicado e a data de cadastro passa a ser a
+        mais antiga. Os orçamentos não são alterados aqui; ver
+        ``core.client_dedup``.
+        """
+        with self._locked():
+            keep = self._by_id.get(keep_id)
+            if keep is None:
+                return None
+            others = [self._by_id[cid] for cid in dict.fromkeys(merge_ids) if cid in self._by_id and cid != keep_id]
+            if not others:
+                return Client(**keep)
+            group = [keep] + others
+            lasts = [c["last_purchase_at"] for c in group if c.get("last_purchase_at")]
+            keep["total_spent"] = round(sum(float(c.get("total_spent", 0.0)) for c in group), 2)
+            keep["budgets_count"] = sum(int(c.get("budgets_count", 0)) for c in group)
+            keep["last_purchase_at"] = max(lasts) if lasts else None
+            keep["created_at"] = min(c.get("created_at") or keep["created_at"] for c in group)
+            if not keep.get("email"):
+                keep["email"] = next((c["email"] for c in others if c.get("email")), None)
+            removed = {c["id"] for c in others}
+            self.clients = [c for c in self.clients if c["id"] not in removed]
+            for client_id in removed:
+                self._unindex(client_id)
+            self._save()
+            merged = Client(**keep)
+        self._notify("metrics", keep_id)
+        for client_id in sorted(removed):
+            self._notify("deleted", client_id)
+        return merged
 
     def find_by_id(self, client_id: str) -> Optional[Client]:
-        for c in self.clients:
-            if c.get("id") == client_id:
-                return Client(**c)
-        return None
+        self._sync()
+        c = self._by_id.get(client_id)
+        return Client(**c) if c is not None else None
+
+    def find_by_phone(self, phone: str) -> List[Client]:
+        """Clientes com o mesmo telefone, ignorando formatação, DDI e zero de tronco"""
+        key = normalize_phone(phone)
+        if not key:
+            return []
+        self._sync()
+        return [Client(**self._by_id[cid]) for cid in sorted(self._by_phone.get(key, ()))]
 
     def find_by_name_or_phone(self, term: str) -> List[Client]:
-        t = term.lower().strip()
-        result: List[Client] = []
-        for c in self.clients:
-            name = (c.get("name") or "").lower()
-            phone = (c.get("phone") or "").lower()
-            if t in name or t in phone:
-                result.append(Client(**c))
-        return result
+        """Clientes cujo nome contém o termo (sem acento/caixa) ou cujo telefone
+        contém os dígitos do termo. Telefone igual ao termo vem primeiro, depois
+        nomes iguais/iniciados pelo termo."""
+        t = term.strip()
+        if not t:
+            return self.list_clients()
+        self._sync()
+        ids = [key for key, _ in self._name_index.search(t, fuzzy=False)]
+        return [Client(**self._by_id[cid]) for cid in self._with_phone_matches(ids, t)]
+
+    def search_clients(self, term: str, limit: Optional[int] = 200, fuzzy: bool = True) -> List[Client]:
+        """Busca ordenada por relevância, tolerante a erros de digitação no nome
+        (``fuzzy``; as aproximações só entram se os trechos exatos não bastarem)."""
+        return [Client(**self._by_id[cid]) for cid in self.search_ids(term, limit, fuzzy)]
+
+    def search_ids(self, term: str, limit: Optional[int] = 200, fuzzy: bool = True) -> List[str]:
+        """Como ``search_clients``, mas só os IDs (sem montar objetos ``Client``)"""
+        t = term.strip()
+        if not t:
+            return self.ids()
+        self._sync()
+        ids = [key for key, _ in self._name_index.search(t, limit=limit, fuzzy=fuzzy)]
+        ids = self._with_phone_matches(ids, t)
+        return ids if limit is None else ids[:limit]
+
+    def ids(self) -> List[str]:
+        """IDs de todos os clientes, na ordem de cadastro"""
+        self._sync()
+        return [c["id"] for c in self.clients]
+
+    def record(self, client_id: str) -> Optional[Dict[str, Any]]:
+        """Registro em memória do cliente, somente leitura (ex.: para modelos de tabela)"""
+        return self._by_id.get(client_id)
+
+    def _with_phone_matches(self, ids: List[str], term: str) -> List[str]:
+        digits = normalize_phone(term)
+        if not digits:
+            return ids
+        exact = sorted(self._by_phone.get(digits, ()))
+        seen = set(exact)
+        ranked = exact + [cid for cid in ids if cid not in seen]
+        seen.update(ranked)
+        extra = sorted(cid for cid in self._phone_index.contains(digits) if cid not in seen)
+        return ranked + extra
+
+    def find_by_name(self, name: str) -> List[Client]:
+        """Clientes com exatamente o nome informado (sem acento/caixa)"""
+        key = fold_text(name)
+        if not key:
+            return []
+        self._sync()
+        ids = sorted(cid for cid in self._name_index.contains(name) if fold_text(self._by_id[cid].get("name")) == key)
+        return [Client(**self._by_id[cid]) for cid in ids]
+
+    def match_client_id(self, name: Optional[str], phone: Optional[str]) -> Optional[str]:
+        """Cliente de um orçamento: mesmo telefone ou, sem correspondência, mesmo
+        nome (sem acento/caixa); entre vários, o cadastrado primeiro."""
+        self._sync()
+        ids = self._by_phone.get(normalize_phone(phone))
+        if ids:
+            return _oldest(ids)
+        key = fold_text(name)
+        if not key:
+            return None
+        matches = [cid for cid in self._name_index.contains(name) if fold_text(self._by_id[cid].get("name")) == key]
+        return _oldest(matches) if matches else None
+
+    def apply_budget_metrics(self, name: Optional[str], phone: Optional[str], budget_total: float,
+                             saved_at: Optional[str], sign: int = 1,
+                             last_purchase: Optional[Callable[[str], Optional[str]]] = None) -> Optional[str]:
+        """Soma (``sign`` 1) ou subtrai (``sign`` -1) um orçamento das métricas do cliente dele.
+
+        O cliente (``match_client_id``) e o ajuste são resolvidos sob a trava,
+        sobre a versão atual do disco, para que sessões simultâneas não percam
+        atualizações. Ao subtrair o orçamento da última compra,
+        ``last_purchase(client_id)`` informa a nova data. Retorna o ID do cliente.
+        """
+        with self._locked():
+            client_id = self.match_client_id(name, phone)
+            c = self._by_id.get(client_id) if client_id else None
+            if c is None:
+                return None
+            count = max(int(c.get("budgets_count", 0)) + sign, 0)
+            spent = max(round(float(c.get("total_spent", 0.0)) + sign * float(budget_total), 2), 0.0)
+            last = c.get("last_purchase_at")
+            if sign > 0:
+                if saved_at and saved_at > (last or ""):
+                    last = saved_at
+            elif not count:
+                spent, last = 0.0, None
+            elif last_purchase is not None and saved_at and saved_at >= (last or ""):
+                last = last_purchase(client_id) or last
+            c.update({"total_spent": spent, "budgets_count": count, "last_purchase_at": last})
+            self._save()
+        self._notify("metrics", client_id)
+        return client_id
 
     def record_budget_metrics(self, client_id: str, budget_total: float) -> None:
-        for i, c in enumerate(self.clients):
-            if c.get("id") == client_id:
-                c["total_spent"] = float(c.get("total_spent", 0.0)) + float(budget_total)
-                c["budgets_count"] = int(c.get("budgets_count", 0)) + 1
-                c["last_purchase_at"] = datetime.now().isoformat()
-                self.clients[i] = c
-                self._save()
+        """Soma um orçamento às métricas do cliente.
+
+        Prefira ``core.client_metrics.ClientMetricsTracker``, que mantém as
+        métricas a partir dos orçamentos gravados e removidos.
+        """
+        with self._locked():
+            c = self._by_id.get(client_id)
+            if c is None:
                 return
+            c["total_spent"] = float(c.get("total_spent", 0.0)) + float(budget_total)
+            c["budgets_count"] = int(c.get("budgets_count", 0)) + 1
+            c["last_purchase_at"] = datetime.now().isoformat()
+            self._save()
+        self._notify("metrics", client_id)
+
+    def set_metrics(self, client_id: str, total_spent: float, budgets_count: int,
+                    last_purchase_at: Optional[str]) -> bool:
+        """Grava as métricas agregadas do cliente (valores absolutos)"""
+        with self._locked():
+            c = self._by_id.get(client_id)
+            if c is None:
+                return False
+            metrics = {
+                "total_spent": round(float(total_spent), 2),
+                "budgets_count": int(budgets_count),
+                "last_purchase_at": last_purchase_at,
+            }
+            if all(c.get(k) == v for k, v in metrics.items()):
+                return True
+            c.update(metrics)
+            self._save()
+        self._notify("metrics", client_id)
+        return True
 
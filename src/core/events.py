@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+import threading
+import weakref
+from typing import Any, Callable, List, Optional
+
+# Assinatura dos ouvintes: callback(evento, chave)
+Listener = Callable[[str, Optional[str]], Any]
+
+
+class ChangeNotifier:
+    """Notificação simples de alterações para armazenamentos compartilhados.
+
+    Métodos ligados são guardados por referência fraca; com ``records=True`` o
+    ouvinte recebe também o registro (``callback(evento, chave, registro)``).
+    """
+
+    def __init__(self) -> None:
+        self._listeners: List[Any] = []
+        self._listeners_lock = threading.Lock()
+
+    def subscribe(self, callback: Callable[..., Any], records: bool = False) -> None:
+        ref = weakref.WeakMethod(callback) if hasattr(callback, "__self__") else (lambda cb=callback: cb)
+        with self._listeners_lock:
+            self._listeners.append((ref, records))
+
+    def unsubscribe(self, callback: Callable[..., Any]) -> None:
+        with self._listeners_lock:
+            self._listeners = [(ref, records) for ref, records in self._listeners if ref() not in (None, callback)]
+
+    def _notify(self, event: str, key: Optional[str] = None, record: Any = None) -> None:
+        with self._listeners_lock:
+            callbacks = [(ref(), records) for ref, records in self._listeners]
+            self._listeners = [entry for entry, (cb, _) in zip(self._listeners, callbacks) if cb is not None]
+        for callback, records in callbacks:
+            if callback is None:
+                continue
+            try:
+                if records:
+                    callback(event, key, record)
+                else:
+                    callback(event, key)
+            except Exception as e:
+                print(f"Erro ao notificar alteração ({event}): {e}")
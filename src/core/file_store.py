@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import json
+import os
+import tempfile
+import time
+from contextlib import contextmanager
+from typing import Any, Iterator, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+# Assinatura de um arquivo no disco: (mtime em ns, tamanho)
+FileSignature = Optional[Tuple[int, int]]
+
+
+def file_signature(path: str) -> FileSignature:
+    """Retorna (mtime_ns, tamanho) do arquivo, ou None se não existir"""
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+@contextmanager
+def file_lock(path: str) -> Iterator[None]:
+    """Trava consultiva exclusiva entre processos para ``path``.
+
+    Usa um arquivo auxiliar ``<path>.lock``; cada entrada abre um novo
+    descritor, então também exclui outras threads do mesmo processo.
+    """
+    lock_path = path + ".lock"
+    directory = os.path.dirname(lock_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(lock_path, "a+") as handle:
+        if fcntl is not None:
+            fcntl.flock(handle.fileno(), fcntl.LOCK_EX)
+        else:
+            handle.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(handle.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    # LK_LOCK desiste após ~10s; continua aguardando
+                    continue
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+            else:
+                handle.seek(0)
+                msvcrt.locking(handle.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def _replace(src: str, dst: str, attempts: int = 20, delay: float = 0.05) -> None:
+    """``os.replace`` com novas tentativas (no Windows falha se o destino estiver aberto)"""
+    for attempt in range(attempts):
+        try:
+            os.replace(src, dst)
+            return
+        except PermissionError:
+            if attempt == attempts - 1:
+                raise
+            time.sleep(delay)
+
+
+def atomic_write_bytes(path: str, data: bytes) -> None:
+    """Grava em arquivo temporário no mesmo diretório e troca com ``os.replace``.
+
+    Uma queda no meio da gravação nunca deixa ``path`` truncado.
+    """
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(prefix=os.path.basename(path) + ".", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        _replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def atomic_write_json(path: str, data: Any, **dump_kwargs: Any) -> None:
+    """Serializa ``data`` em JSON e grava de forma atômica"""
+    dump_kwargs.setdefault("ensure_ascii", False)
+    text = json.dumps(data, **dump_kwargs)
+    atomic_write_bytes(path, text.encode("utf-8"))
+
+
+def read_json(path: str, default: Any = None) -> Any:
+    """Lê JSON de ``path``; retorna ``default`` se não existir ou estiver inválido"""
+    if not os.path.exists(path):
+        return default
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except Exception:
+        return default
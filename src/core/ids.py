@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Optional
+
+# Alfabeto base32 de Crockford (sem I, L, O, U), usado pelo ULID
+_ALPHABET = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+_TIME_LEN = 10
+_RANDOM_LEN = 16
+_RANDOM_BITS = 80
+
+
+def _encode(value: int, length: int) -> str:
+    chars = []
+    for _ in range(length):
+        value, rem = divmod(value, 32)
+        chars.append(_ALPHABET[rem])
+    return "".join(reversed(chars))
+
+
+class IdGenerator:
+    """Gerador de IDs no estilo ULID: monotônico e ordenável por tempo"""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._last_ms = -1
+        self._counter = 0
+
+    def new_ulid(self) -> str:
+        with self._lock:
+            now_ms = int(time.time() * 1000)
+            if now_ms <= self._last_ms:
+                # Mesmo milissegundo (ou relógio voltou): mantém a ordem incrementando
+                now_ms = self._last_ms
+                self._counter += 1
+                if self._counter >> _RANDOM_BITS:
+                    now_ms += 1
+                    self._counter = int.from_bytes(os.urandom(10), "big") >> 1
+            else:
+                # Bit mais alto zerado: sobra espaço para incrementar sem estourar
+                self._counter = int.from_bytes(os.urandom(10), "big") >> 1
+            self._last_ms = now_ms
+            return _encode(now_ms, _TIME_LEN) + _encode(self._counter, _RANDOM_LEN)
+
+
+_generator = IdGenerator()
+
+
+def new_id(prefix: str = "") -> str:
+    """Novo ID único e ordenável por criação, ex.: ``ORC_01JAB3...``"""
+    ulid = _generator.new_ulid()
+    return f"{prefix}_{ulid}" if prefix else ulid
+
+
+def id_datetime(identifier: str) -> Optional[datetime]:
+    """Data/hora de criação embutida num ID de ``new_id`` ou no formato antigo
+    ``<prefixo>_AAAAMMDD_HHMMSS_<n>`` (None se não for nenhum dos dois)"""
+    parts = identifier.split("_")
+    if len(parts) >= 3 and len(parts[-3]) == 8 and len(parts[-2]) == 6:
+        try:
+            return datetime.strptime(parts[-3] + parts[-2], "%Y%m%d%H%M%S")
+        except ValueError:
+            return None
+    ulid = parts[-1]
+    if len(ulid) != _TIME_LEN + _RANDOM_LEN:
+        return None
+    ms = 0
+    for ch in ulid[:_TIME_LEN]:
+        idx = _ALPHABET.find(ch)
+        if idx < 0:
+            return None
+        ms = ms * 32 + idx
+    return datetime.fromtimestamp(ms / 1000)
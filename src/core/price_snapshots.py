@@ -0,0 +1,83 @@
+"""Versões gravadas da tabela de preços (``data/price_snapshots/<versão>.json``)."""
+import os
+import sys
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from .file_store import atomic_write_json, read_json
+from .price_table import PriceTable, snapshot_data, table_from_snapshot
+
+SNAPSHOTS_DIR = os.path.join("data", "price_snapshots")
+
+
+class PriceSnapshotStore:
+    """Tabelas de preços gravadas por versão (hash do conteúdo)"""
+
+    def __init__(self, directory: str = SNAPSHOTS_DIR) -> None:
+        self.directory = directory
+        self._lock = threading.Lock()
+        self._tables: Dict[str, PriceTable] = {}
+
+    def _path(self, version: str) -> str:
+        return os.path.join(self.directory, f"{version}.json")
+
+    def save(self, table: PriceTable) -> str:
+        """Grava a tabela (se a versão ainda não existir) e retorna a versão"""
+        version = table.version
+        with self._lock:
+            if version in self._tables:
+                return version
+            path = self._path(version)
+            if not os.path.exists(path):
+                try:
+                    atomic_write_json(path, {
+                        "version": version,
+                        "created_at": datetime.now().isoformat(),
+                        "table": snapshot_data(table),
+                    }, indent=2)
+                except OSError as e:
+                    print(f"Erro ao gravar versão da tabela de preços: {e}")
+                    return version
+            self._tables[version] = table
+        return version
+
+    def load(self, version: Optional[str]) -> Optional[PriceTable]:
+        """Tabela da versão, ou None se não houver (ou o arquivo não conferir com o hash)"""
+        if not version:
+            return None
+        table = self._tables.get(version)
+        if table is not None:
+            return table
+        with self._lock:
+            table = self._tables.get(version)
+            if table is not None:
+                return table
+            data = read_json(self._path(version))
+            if not isinstance(data, dict) or not isinstance(data.get("table"), dict):
+                return None
+            try:
+                table = table_from_snapshot(data["table"])
+            except Exception as e:
+                print(f"Erro ao carregar versão {version} da tabela de preços: {e}")
+                return None
+            if table.version != version:
+                print(f"Versão {version} da tabela de preços está corrompida")
+                return None
+            self._tables[version] = table
+            return table
+
+    def versions(self) -> List[str]:
+        """Versões gravadas em disco"""
+        if not os.path.isdir(self.directory):
+            return []
+        return sorted(name[:-5] for name in os.listdir(self.directory) if name.endswith(".json"))
+
+
+if __name__ == "__main__":
+    # python -m src.core.price_snapshots [pasta]: lista as versões e confere os hashes
+    store = PriceSnapshotStore(sys.argv[1] if len(sys.argv) > 1 else SNAPSHOTS_DIR)
+    versions = store.versions()
+    for version in versions:
+        print(f"{version}  {'ok' if store.load(version) is not None else 'inválida'}")
+    print(f"{len(versions)} versão(ões) da tabela de preços")
@@ -0,0 +1,188 @@
+"""Tabela de preços imutável compilada a partir de ``config/prices.json``."""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from dataclasses import dataclass, field
+from decimal import Decimal
+from types import MappingProxyType
+from typing import Any, Dict, Mapping, Tuple
+
+from .file_store import FileSignature, file_signature
+from .pricing_rules import EMPTY_PLAN, RulePlan, compile_rules
+
+PRICES_FILE = os.path.join("config", "prices.json")
+
+# Preços padrão das camisetas (cliente normal): (tecido, manga) -> preço por tamanho
+_CAMISETA_SIZES = ("PP", "P", "M", "G", "GG", "XG", "XGG", "XG3")
+DEFAULT_CAMISETA_PRICES: Dict[Tuple[str, str], Tuple[str, ...]] = {
+    ("dryfit", "curta"): ("40.00", "40.00", "40.00", "40.00", "45.00", "45.00", "45.00", "45.00"),
+    ("dryfit", "longa"): ("45.00", "45.00", "45.00", "45.00", "50.00", "53.00", "53.00", "53.00"),
+    ("helanca", "curta"): ("35.00", "35.00", "35.00", "35.00", "40.00", "40.00", "40.00", "40.00"),
+    ("helanca", "longa"): ("40.00", "40.00", "40.00", "40.00", "45.00", "48.00", "48.00", "48.00"),
+}
+
+# Conjuntos (sem seção "conjuntos" no arquivo): (tipo, manga, tipo de cliente) -> preço
+DEFAULT_CONJUNTO_PRICES: Dict[Tuple[str, str, str], str] = {
+    ("helanca_tactel", "curta", "normal"): "58.00",
+    ("helanca_tactel", "longa", "normal"): "63.00",
+    ("helanca_tactel", "curta", "terceiro"): "49.00",
+    ("helanca_tactel", "longa", "terceiro"): "54.00",
+    ("todo_helanca", "curta", "normal"): "68.00",
+    ("todo_helanca", "longa", "normal"): "70.00",
+    ("todo_helanca", "curta", "terceiro"): "59.00",
+    ("todo_helanca", "longa", "terceiro"): "62.00",
+    ("dryfit_helanca", "curta", "normal"): "73.00",
+    ("dryfit_helanca", "longa", "normal"): "75.00",
+    ("dryfit_helanca", "curta", "terceiro"): "64.00",
+    ("dryfit_helanca", "longa", "terceiro"): "67.00",
+}
+
+# Comunicação visual: preço por m²
+DEFAULT_VISUAL_PRICES: Dict[str, str] = {
+    "lona": "60.00",
+    "adesivo": "50.00",
+    "adesivo_perfurado": "70.00",
+    "banner": "50.00",
+}
+
+SHORT_PRICE = Decimal("25.00")
+
+
+@dataclass(frozen=True)
+class PriceTable:
+    """Preços compilados de uma versão de ``prices.json`` (somente leitura)"""
+    camisetas: Mapping[Tuple[str, str, str, str], Decimal]
+    conjuntos: Mapping[Tuple[str, str, str], Decimal]
+    visual: Mapping[str, Decimal]
+    others: Mapping[str, Tuple[Decimal, bool]]
+    short: Decimal = SHORT_PRICE
+    # Assinatura (mtime, tamanho) do arquivo compilado; None se não existia
+    signature: FileSignature = field(default=None, compare=False)
+    # Regras declaradas (multiplicadores, áreas mínimas, faixas de quantidade)
+    rules: RulePlan = field(default=EMPTY_PLAN, compare=False)
+    # Hash do conteúdo (``snapshot_data``); igual para tabelas com os mesmos preços
+    version: str = field(default="", compare=False)
+
+
+def _price_text(price: Decimal) -> str:
+    # Forma canônica: "45.0" e "45.00" viram "45"
+    return format(price.normalize(), "f")
+
+
+def snapshot_data(table: PriceTable) -> Dict[str, Any]:
+    """Conteúdo da tabela em forma canônica (JSON, chaves e linhas ordenadas)"""
+    data = {
+        "camisetas": sorted([*key, _price_text(price)] for key, price in table.camisetas.items()),
+        "conjuntos": sorted([*key, _price_text(price)] for key, price in table.conjuntos.items()),
+        "visual": {name: _price_text(price) for name, price in sorted(table.visual.items())},
+        "outros": {name: [_price_text(price), per_m2] for name, (price, per_m2) in sorted(table.others.items())},
+        "short": _price_text(table.short),
+    }
+    # Sem regras, a chave fica de fora (versões gravadas antes das regras não mudam)
+    if table.rules:
+        data["regras"] = table.rules.to_data()
+    return data
+
+
+def snapshot_version(data: Mapping[str, Any]) -> str:
+    """Versão (hash SHA-256 abreviado) do conteúdo canônico da tabela"""
+    raw = json.dumps(data, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:16]
+
+
+def _build_table(camisetas, conjuntos, visual, others, short: Decimal, signature: FileSignature,
+                 rules: RulePlan = EMPTY_PLAN) -> PriceTable:
+    table = PriceTable(
+        camisetas=MappingProxyType(camisetas),
+        conjuntos=MappingProxyType(conjuntos),
+        visual=MappingProxyType(visual),
+        others=MappingProxyType(others),
+        short=short,
+        signature=signature,
+        rules=rules,
+    )
+    object.__setattr__(table, "version", snapshot_version(snapshot_data(table)))
+    return table
+
+
+def table_from_snapshot(data: Mapping[str, Any]) -> PriceTable:
+    """Remonta a tabela a partir de ``snapshot_data`` (a versão é recalculada)"""
+    return _build_table(
+        {tuple(row[:4]): Decimal(row[4]) for row in data.get("camisetas", [])},
+        {tuple(row[:3]): Decimal(row[3]) for row in data.get("conjuntos", [])},
+        {name: Decimal(price) for name, price in data.get("visual", {}).items()},
+        {name: (Decimal(price), bool(per_m2)) for name, (price, per_m2) in data.get("outros", {}).items()},
+        Decimal(data.get("short", SHORT_PRICE)),
+        None,
+        compile_rules(data.get("regras", [])),
+    )
+
+
+def compile_price_table(data: Mapping[str, Any], signature: FileSignature = None) -> PriceTable:
+    """Monta a tabela a partir do conteúdo já interpretado de ``prices.json``"""
+    camisetas: Dict[Tuple[str, str, str, str], Decimal] = {}
+    for (fabric, sleeve), prices in DEFAULT_CAMISETA_PRICES.items():
+        for size, price in zip(_CAMISETA_SIZES, prices):
+            camisetas[(fabric, sleeve, size, "normal")] = Decimal(price)
+    for c in data.get("camisetas", []):
+        try:
+            key = (
+                str(c["tecido"]).strip().lower(),
+                str(c["manga"]).strip().lower(),
+                str(c["tamanho"]).strip().upper(),
+                str(c.get("cliente", "normal")).strip().lower(),
+            )
+            camisetas[key] = Decimal(str(c.get("preco", 0)))
+        except Exception:
+            continue
+
+    visual = {name: Decimal(price) for name, price in DEFAULT_VISUAL_PRICES.items()}
+    for v in data.get("visual", []):
+        name = str(v.get("nome", "")).strip()
+        if name:
+            visual[name.lower()] = Decimal(str(v.get("preco_m2", 0)))
+
+    others: Dict[str, Tuple[Decimal, bool]] = {}
+    for o in data.get("outros", []):
+        name = str(o.get("nome", "")).strip()
+        if name:
+            others[name] = (Decimal(str(o.get("preco", 0))), bool(o.get("por_m2", False)))
+
+    conjuntos: Dict[Tuple[str, str, str], Decimal] = {}
+    for c in data.get("conjuntos", []):
+        try:
+            key = (
+                str(c["tipo"]).strip().lower(),
+                str(c["manga"]).strip().lower(),
+                str(c.get("cliente", "normal")).strip().lower(),
+            )
+            conjuntos[key] = Decimal(str(c.get("preco", 0)))
+        except Exception:
+            continue
+    if not conjuntos:
+        # Arquivos sem a seção "conjuntos" usam os preços padrão
+        conjuntos = {key: Decimal(price) for key, price in DEFAULT_CONJUNTO_PRICES.items()}
+    return _build_table(camisetas, conjuntos, visual, others, SHORT_PRICE, signature, compile_rules(data.get("regras")))
+
+
+def load_price_table(path: str = PRICES_FILE) -> PriceTable:
+    """Lê e compila ``prices.json`` (uma leitura, uma interpretação).
+
+    Arquivo ausente ou inválido resulta nos preços padrão.
+    """
+    signature = file_signature(path)
+    data: Mapping[str, Any] = {}
+    if signature is not None:
+        try:
+            # Assinatura tomada antes da leitura: se o arquivo for trocado no meio,
+            # a próxima verificação percebe a diferença e recompila
+            with open(path, "rb") as f:
+                raw = f.read()
+            parsed = json.loads(raw.decode("utf-8"))
+            if isinstance(parsed, dict):
+                data = parsed
+        except Exception as e:
+            print(f"Erro ao carregar tabela de preços: {e}")
+    return compile_price_table(data, signature)
@@ -0,0 +1,247 @@
+"""Precificação em lote de orçamentos inteiros, com as regras de ``pricing_service``.
+
+Reprecificar o arquivo contra uma tabela nova: ``python -m src.core.pricing_engine``.
+"""
+import sys
+from dataclasses import dataclass, field
+from decimal import Decimal, ROUND_HALF_UP
+from fractions import Fraction
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .budget_codec import from_cents, to_cents
+from .price_table import PriceTable, load_price_table
+from .pricing_rules import Adjustment, rule_name_of
+from .pricing_service import PRICED_KINDS, base_price, billed_area
+from .simulator_models import Budget
+
+# Área em m² x AREA_DIVISOR (mm²) e fatores das regras com 6 casas decimais
+AREA_DIVISOR = 1_000_000
+FACTOR_SCALE = 1_000_000
+# Valores exatos das linhas: centavos x SCALE
+SCALE = AREA_DIVISOR * FACTOR_SCALE
+
+
+def _scaled(value: Decimal, scale: int) -> int:
+    return int((value * scale).quantize(Decimal(1), rounding=ROUND_HALF_UP))
+
+
+def _round_cents(value: Fraction) -> int:
+    """Arredonda ao centavo, meio para longe do zero (como ``ROUND_HALF_UP``)"""
+    cents = (abs(value.numerator) * 2 + value.denominator) // (2 * value.denominator)
+    return cents if value >= 0 else -cents
+
+
+@dataclass
+class ItemBatch:
+    """Itens de ``n_budgets`` orçamentos em colunas (uma posição por item).
+
+    ``budget`` é o orçamento de cada item (0 a ``n_budgets - 1``); as colunas
+    por orçamento (tipo de cliente e desconto) têm ``n_budgets`` posições.
+    """
+    n_budgets: int = 0
+    budget: List[int] = field(default_factory=list)
+    product_type: List[str] = field(default_factory=list)
+    fabric: List[Optional[str]] = field(default_factory=list)
+    sleeve: List[Optional[str]] = field(default_factory=list)
+    size: List[Optional[str]] = field(default_factory=list)
+    visual_type: List[Optional[str]] = field(default_factory=list)
+    other_name: List[Optional[str]] = field(default_factory=list)
+    quantity: List[int] = field(default_factory=list)
+    width_cm: List[Optional[float]] = field(default_factory=list)
+    height_cm: List[Optional[float]] = field(default_factory=list)
+    art_cents: List[int] = field(default_factory=list)
+    client_type: List[str] = field(default_factory=list)
+    discount_type: List[Optional[str]] = field(default_factory=list)
+    discount_value: List[Optional[Decimal]] = field(default_factory=list)
+
+    def __len__(self) -> int:
+        return len(self.budget)
+
+    def _add_budget(self, client_type: str, discount_type: Optional[str], discount_value) -> int:
+        self.client_type.append(client_type)
+        self.discount_type.append(discount_type)
+        self.discount_value.append(None if discount_value is None else Decimal(str(discount_value)))
+        self.n_budgets += 1
+        return self.n_budgets - 1
+
+    def _add_item(self, index: int, product_type, fabric, sleeve, size, visual_type, other_name,
+                  quantity, width_cm, height_cm, art_price) -> None:
+        self.budget.append(index)
+        self.product_type.append(product_type)
+        self.fabric.append(fabric)
+        self.sleeve.append(sleeve)
+        self.size.append(size)
+        self.visual_type.append(visual_type)
+        self.other_name.append(other_name)
+        self.quantity.append(int(quantity))
+        self.width_cm.append(width_cm)
+        self.height_cm.append(height_cm)
+        self.art_cents.append(to_cents(art_price) or 0)
+
+    @classmethod
+    def from_budgets(cls, budgets: Sequence[Budget]) -> "ItemBatch":
+        batch = cls()
+        for budget in budgets:
+            discount = budget.discount
+            index = batch._add_budget(
+                budget.client_type or "normal",
+                discount.type if discount else None,
+                discount.value if discount else None,
+            )
+            for item in budget.items:
+                batch._add_item(index, item.product_type, item.fabric, item.sleeve, item.size, item.visual_type,
+                                item.other_name, item.quantity, item.width_cm, item.height_cm, item.art_creation_price)
+        return batch
+
+    @classmethod
+    def from_budget_dicts(cls, budget_dicts: Sequence[Dict], client_type: str = "normal") -> "ItemBatch":
+        """Lote a partir dos dicionários persistidos (``client_type`` vale para orçamentos sem tipo gravado)"""
+        batch = cls()
+        for budget_dict in budget_dicts:
+            discount = budget_dict.get("discount") or {}
+            index = batch._add_budget(budget_dict.get("client_type") or client_type,
+                                      discount.get("type"), discount.get("value"))
+            for item in budget_dict.get("items", []):
+                batch._add_item(index, item.get("product_type"), item.get("fabric"), item.get("sleeve"),
+                                item.get("size"), item.get("visual_type"), item.get("other_name"),
+                                item.get("quantity", 0), item.get("width_cm"), item.get("height_cm"),
+                                item.get("art_creation_price"))
+        return batch
+
+
+@dataclass
+class BatchQuote:
+    """Resultado de ``PricingEngine.price``: colunas por item e por orçamento, em centavos"""
+    unit_cents: List[int]
+    line_cents: List[int]
+    subtotal_cents: List[int]
+    art_cents: List[int]
+    discount_cents: List[int]
+    total_cents: List[int]
+
+    def totals(self, index: int) -> Tuple[Decimal, Decimal, Decimal, Decimal]:
+        """(subtotal, criação de arte, desconto, total) do orçamento, em Decimal"""
+        return tuple(
+            Decimal(column[index]).scaleb(-2)
+            for column in (self.subtotal_cents, self.art_cents, self.discount_cents, self.total_cents)
+        )
+
+
+class PricingEngine:
+    """Precificação em lote com os preços de uma ``PriceTable``, em inteiros exatos até o centavo final"""
+
+    def __init__(self, table: PriceTable) -> None:
+        self.table = table
+        self._cache: Dict[tuple, Tuple[int, bool, Adjustment]] = {}
+
+    def _base(self, kind: str, fabric, sleeve, size, visual_type, other_name,
+              client_type) -> Tuple[int, bool, Adjustment]:
+        """(preço base em centavos, preço por área, ajuste das regras) de um item"""
+        key = (kind, fabric, sleeve, size, visual_type, other_name, client_type)
+        cached = self._cache.get(key)
+        if cached is None:
+            price, per_m2 = base_price(self.table, kind, fabric, sleeve, size, visual_type, other_name, client_type)
+            adjustment = self.table.rules.adjustment(kind, rule_name_of(kind, fabric, visual_type, other_name),
+                                                     client_type)
+            cached = (to_cents(price), per_m2, adjustment)
+            self._cache[key] = cached
+        return cached
+
+    def encode(self, batch: ItemBatch) -> List[int]:
+        """Valor unitário exato de cada item (centavos x ``SCALE``)"""
+        units: List[int] = []
+        client_types = batch.client_type
+        for i, kind in enumerate(batch.product_type):
+            if kind not in PRICED_KINDS:
+                units.append(0)
+                continue
+            cents, per_m2, adjustment = self._base(kind, batch.fabric[i], batch.sleeve[i], batch.size[i],
+                                                   batch.visual_type[i], batch.other_name[i],
+                                                   client_types[batch.budget[i]])
+            area = AREA_DIVISOR
+            if per_m2:
+                area = _scaled(billed_area(kind, batch.width_cm[i], batch.height_cm[i], adjustment.min_area),
+                               AREA_DIVISOR)
+            factor = FACTOR_SCALE
+            if not adjustment.identity:
+                factor = _scaled(adjustment.factor(batch.quantity[i]), FACTOR_SCALE)
+            units.append(cents * area * factor)
+        return units
+
+    def price(self, batch: ItemBatch) -> BatchQuote:
+        units = self.encode(batch)
+        lines = [unit * quantity for unit, quantity in zip(units, batch.quantity)]
+        subtotals = [0] * batch.n_budgets
+        art = [0] * batch.n_budgets
+        for owner, value, art_cents in zip(batch.budget, lines, batch.art_cents):
+            subtotals[owner] += value
+            art[owner] += art_cents
+        discounts: List[Fraction] = []
+        totals: List[int] = []
+        for i in range(batch.n_budgets):
+            subtotal = Fraction(subtotals[i], SCALE)
+            discount = self._discount(subtotal, batch.discount_type[i], batch.discount_value[i])
+            discounts.append(discount)
+            totals.append(_round_cents(subtotal + art[i] - discount))
+        return BatchQuote(
+            unit_cents=[_round_cents(Fraction(unit, SCALE)) for unit in units],
+            line_cents=[_round_cents(Fraction(line, SCALE)) for line in lines],
+            subtotal_cents=[_round_cents(Fraction(value, SCALE)) for value in subtotals],
+            art_cents=art,
+            discount_cents=[_round_cents(discount) for discount in discounts],
+            total_cents=totals,
+        )
+
+    @staticmethod
+    def _discount(subtotal: Fraction, discount_type: Optional[str], value: Optional[Decimal]) -> Fraction:
+        """Desconto exato em centavos: percentual sobre o subtotal ou valor fixo"""
+        if not discount_type or value is None:
+            return Fraction(0)
+        if discount_type == "percentage":
+            return subtotal * Fraction(value) / 100
+        return Fraction(value) * 100
+
+
+@dataclass
+class Requote:
+    """Total gravado x total com a tabela nova de um orçamento"""
+    budget_id: str
+    old_total: float
+    new_total: float
+
+    @property
+    def difference(self) -> float:
+        # Comparados em centavos: o total gravado pode ter frações de centavo
+        return from_cents(to_cents(self.new_total) - to_cents(self.old_total))
+
+
+def requote_budget_dicts(budget_dicts: Sequence[Dict], table: PriceTable,
+                         client_type: str = "normal") -> List[Requote]:
+    """Reprecifica os orçamentos (dicionários persistidos) contra ``table`` num único lote"""
+    quote = PricingEngine(table).price(ItemBatch.from_budget_dicts(budget_dicts, client_type))
+    return [
+        Requote(b["id"], float(b.get("total", 0.0)), from_cents(quote.total_cents[i]))
+        for i, b in enumerate(budget_dicts)
+    ]
+
+
+def requote_archive(storage, table: PriceTable, client_type: str = "normal") -> List[Requote]:
+    """Reprecifica todo o arquivo de ``storage`` (``BudgetStorage`` ou ``SqliteBudgetStorage``).
+
+    Orçamentos gravados antes de guardarem o tipo de cliente usam ``client_type``.
+    Nada é gravado: o resultado traz o total antigo e o novo de cada orçamento.
+    """
+    return requote_budget_dicts(storage.search_budgets(), table, client_type)
+
+
+if __name__ == "__main__":
+    # python -m src.core.pricing_engine [pasta de dados] [prices.json]
+    from .budget_storage import BudgetStorage
+
+    directory = sys.argv[1] if len(sys.argv) > 1 else "data"
+    table = load_price_table(sys.argv[2]) if len(sys.argv) > 2 else load_price_table()
+    results = requote_archive(BudgetStorage(directory), table)
+    changed = [r for r in results if r.difference]
+    delta = sum(r.difference for r in changed)
+    print(f"{len(results)} orçamento(s) reprecificado(s)")
+    print(f"{len(changed)} com total diferente; diferença somada: R$ {delta:.2f}")
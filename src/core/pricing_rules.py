@@ -0,0 +1,238 @@
+"""Regras de preço declaradas na chave ``"regras"`` de ``config/prices.json``."""
+import sys
+import timeit
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Any, Dict, FrozenSet, List, Mapping, Optional, Sequence, Tuple
+
+ANY = "*"
+_ONE = Decimal("1")
+_ZERO = Decimal("0")
+
+
+def rule_name_of(kind: str, fabric: Optional[str], visual_type: Optional[str], other_name: Optional[str]) -> Optional[str]:
+    """Valor comparado com o campo ``nome`` das regras, a partir dos campos do item"""
+    if kind in ("camiseta", "conjunto"):
+        return fabric
+    if kind == "comunicacao_visual":
+        return str(visual_type).lower() if visual_type else None
+    if kind == "outro":
+        return other_name
+    return None
+
+
+def rule_name(item) -> Optional[str]:
+    """Valor do item comparado com o campo ``nome`` das regras"""
+    return rule_name_of(item.product_type, item.fabric, item.visual_type, item.other_name)
+
+
+@dataclass(frozen=True)
+class Adjustment:
+    """Ajustes que valem para uma combinação (produto, nome, cliente)"""
+    multiplier: Decimal = _ONE
+    min_area: Decimal = _ZERO
+    # (quantidade mínima, desconto %) em ordem crescente de quantidade
+    breaks: Tuple[Tuple[int, Decimal], ...] = ()
+
+    @property
+    def identity(self) -> bool:
+        return self.multiplier == _ONE and not self.breaks
+
+    def discount_percent(self, quantity: int) -> Decimal:
+        for threshold, percent in reversed(self.breaks):
+            if quantity >= threshold:
+                return percent
+        return _ZERO
+
+    def factor(self, quantity: int) -> Decimal:
+        """Fator do preço unitário para a quantidade (multiplicador e faixa)"""
+        if not self.breaks:
+            return self.multiplier
+        return self.multiplier * (100 - self.discount_percent(quantity)) / 100
+
+
+IDENTITY = Adjustment()
+
+
+@dataclass(frozen=True)
+class Rule:
+    product: str
+    name: Optional[str]
+    client: Optional[str]
+    multiplier: Optional[Decimal]
+    min_area: Optional[Decimal]
+    breaks: Optional[Tuple[Tuple[int, Decimal], ...]]
+
+    @property
+    def specificity(self) -> int:
+        return (self.product != ANY) + (self.name is not None) + (self.client is not None)
+
+    def matches(self, name: Optional[str], client: str) -> bool:
+        return (self.name is None or self.name == name) and (self.client is None or self.client == client)
+
+    def to_data(self) -> Dict[str, Any]:
+        """Forma canônica da regra (entra na versão da tabela de preços)"""
+        data: Dict[str, Any] = {"produto": self.product}
+        if self.name is not None:
+            data["nome"] = self.name
+        if self.client is not None:
+            data["cliente"] = self.client
+        if self.multiplier is not None:
+            data["multiplicador"] = format(self.multiplier.normalize(), "f")
+        if self.min_area is not None:
+            data["area_minima_m2"] = format(self.min_area.normalize(), "f")
+        if self.breaks is not None:
+            data["faixas"] = [
+                {"a_partir_de": threshold, "desconto_percentual": format(percent.normalize(), "f")}
+                for threshold, percent in self.breaks
+            ]
+        return data
+
+
+def _parse_rule(raw: Mapping[str, Any]) -> Rule:
+    product = str(raw.get("produto", ANY)).strip().lower() or ANY
+    name = raw.get("nome")
+    client = raw.get("cliente")
+    multiplier = Decimal(str(raw["multiplicador"])) if "multiplicador" in raw else None
+    min_area = Decimal(str(raw["area_minima_m2"])) if "area_minima_m2" in raw else None
+    breaks = None
+    if "faixas" in raw:
+        parsed = sorted(
+            (int(b["a_partir_de"]), Decimal(str(b.get("desconto_percentual", 0)))) for b in raw["faixas"]
+        )
+        if any(not (_ZERO <= percent <= 100) for _, percent in parsed):
+            raise ValueError("desconto_percentual deve estar entre 0 e 100")
+        breaks = tuple(parsed)
+    if (multiplier is not None and multiplier < 0) or (min_area is not None and min_area < 0):
+        raise ValueError("multiplicador e area_minima_m2 não podem ser negativos")
+    if multiplier is None and min_area is None and breaks is None:
+        raise ValueError("regra sem ajuste (multiplicador, area_minima_m2 ou faixas)")
+    if name is not None:
+        name = str(name).strip()
+        # Tipos de comunicação visual são comparados em minúsculas (como em ``PriceTable.visual``)
+        if product == "comunicacao_visual":
+            name = name.lower()
+    return Rule(
+        product=product,
+        name=name,
+        client=None if client is None else str(client).strip().lower(),
+        multiplier=multiplier,
+        min_area=min_area,
+        breaks=breaks,
+    )
+
+
+class RulePlan:
+    """Regras compiladas: ajuste por (produto, nome, cliente), resolvido uma vez"""
+
+    __slots__ = ("rules", "_by_product", "_quantity_products", "_resolved")
+
+    def __init__(self, rules: Sequence[Rule] = ()) -> None:
+        self.rules: Tuple[Rule, ...] = tuple(rules)
+        # Regras por produto, com a posição na lista (desempate das faixas)
+        by_product: Dict[str, List[Tuple[int, Rule]]] = {}
+        for position, rule in enumerate(self.rules):
+            by_product.setdefault(rule.product, []).append((position, rule))
+        self._by_product = by_product
+        # Produtos cujo preço unitário depende da quantidade (faixas)
+        self._quantity_products: FrozenSet[str] = frozenset(r.product for r in self.rules if r.breaks)
+        self._resolved: Dict[Tuple[str, Optional[str], str], Adjustment] = {}
+
+    def __bool__(self) -> bool:
+        return bool(self.rules)
+
+    def __len__(self) -> int:
+        return len(self.rules)
+
+    def quantity_sensitive(self, product: str) -> bool:
+        return product in self._quantity_products or ANY in self._quantity_products
+
+    def adjustment(self, product: str, name: Optional[str], client: str) -> Adjustment:
+        key = (product, name, client)
+        adjustment = self._resolved.get(key)
+        if adjustment is None:
+            adjustment = self._resolve(product, name, client)
+            self._resolved[key] = adjustment
+        return adjustment
+
+    def _resolve(self, product: str, name: Optional[str], client: str) -> Adjustment:
+        matching = sorted(
+            (position, rule) for position, rule in self._by_product.get(ANY, []) + self._by_product.get(product, [])
+            if rule.matches(name, client)
+        )
+        if not matching:
+            return IDENTITY
+        multiplier = _ONE
+        min_area = _ZERO
+        breaks: Tuple[Tuple[int, Decimal], ...] = ()
+        breaks_rank = (-1, -1)
+        for position, rule in matching:
+            if rule.multiplier is not None:
+                multiplier *= rule.multiplier
+            if rule.min_area is not None:
+                min_area = max(min_area, rule.min_area)
+            if rule.breaks is not None:
+                rank = (rule.specificity, position)
+                if rank > breaks_rank:
+                    breaks, breaks_rank = rule.breaks, rank
+        return Adjustment(multiplier, min_area, breaks)
+
+    def to_data(self) -> List[Dict[str, Any]]:
+        return [rule.to_data() for rule in self.rules]
+
+
+EMPTY_PLAN = RulePlan()
+
+
+def compile_rules(raw_rules: Any) -> RulePlan:
+    """Compila a lista ``"regras"`` do ``prices.json``; regras inválidas são ignoradas"""
+    if not isinstance(raw_rules, list):
+        return EMPTY_PLAN
+    rules = []
+    for position, raw in enumerate(raw_rules, 1):
+        try:
+            rules.append(_parse_rule(raw))
+        except Exception as e:
+            print(f"Regra de preço {position} ignorada: {e}")
+    return RulePlan(rules) if rules else EMPTY_PLAN
+
+
+def benchmark(lines: int = 500, repeat: int = 5) -> Dict[str, float]:
+    """Tempo (s, melhor de ``repeat``) para cotar um orçamento de ``lines`` linhas
+    com regras, sem cache (``price_item``) e pelo ``PricingService``."""
+    from .price_table import compile_price_table
+    from .pricing_service import PricingService, price_item
+    from .simulator_models import Budget, ClientInfo, ProductItem
+
+    table = compile_price_table({
+        "outros": [{"nome": "Placa", "preco": 80, "por_m2": True}],
+        "regras": [
+            {"produto": "camiseta", "faixas": [{"a_partir_de": 50, "desconto_percentual": 5},
+                                               {"a_partir_de": 100, "desconto_percentual": 10}]},
+            {"produto": "comunicacao_visual", "area_minima_m2": 0.5},
+            {"produto": "outro", "nome": "Placa", "area_minima_m2": 1},
+            {"produto": "*", "cliente": "terceiro", "multiplicador": 0.9},
+        ],
+    })
+    samples = [
+        ProductItem("camiseta", fabric="dryfit", sleeve="curta", size="M", quantity=120),
+        ProductItem("conjunto", fabric="helanca_tactel", sleeve="longa", quantity=10),
+        ProductItem("comunicacao_visual", visual_type="lona", width_cm=40, height_cm=30),
+        ProductItem("outro", other_name="Placa", width_cm=200, height_cm=100),
+        ProductItem("short", quantity=15),
+    ]
+    items = [samples[i % len(samples)] for i in range(lines)]
+    budget = Budget(ClientInfo("", ""), items)
+    # Serviço fixo na tabela de teste (não consulta nenhuma ``PriceDatabase``)
+    service = PricingService(None, table)
+    cases = {
+        "regras (sem cache)": lambda: [price_item(table, item, "terceiro") for item in items],
+        "PricingService": lambda: service.quote_budget(budget, "terceiro"),
+    }
+    return {name: min(timeit.repeat(fn, number=1, repeat=repeat)) for name, fn in cases.items()}
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    for name, seconds in benchmark(count).items():
+        print(f"{name:24s} {seconds * 1000:8.3f} ms  ({seconds / count * 1e6:6.2f} µs/linha)")
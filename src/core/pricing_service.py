@@ -0,0 +1,192 @@
+"""Serviço único de preços usado pelo simulador, pelo PDF e pelo validador."""
+import threading
+from dataclasses import dataclass, field
+from decimal import Decimal
+from typing import Dict, List, Optional, Tuple
+
+from .price_table import PriceTable
+from .pricing_rules import rule_name
+from .simulator_models import Budget, ClientType, Discount, PriceDatabase, ProductItem
+
+_ZERO = Decimal("0")
+# Produtos com preço na tabela (os demais, como "criacao_arte", valem 0)
+PRICED_KINDS = ("camiseta", "conjunto", "short", "comunicacao_visual", "outro")
+
+
+def item_price_key(item: ProductItem, client_type: ClientType = "normal") -> Tuple:
+    """Campos do item que determinam o preço unitário (a quantidade não entra)"""
+    kind = item.product_type
+    if kind == "camiseta":
+        return kind, item.fabric, item.sleeve, item.size, client_type
+    if kind == "conjunto":
+        return kind, item.fabric, item.sleeve, client_type
+    if kind == "comunicacao_visual":
+        return kind, item.visual_type, item.width_cm, item.height_cm
+    if kind == "outro":
+        return kind, item.other_name, item.width_cm, item.height_cm
+    return (kind,)
+
+
+def billed_area(kind: str, width_cm: Optional[float], height_cm: Optional[float],
+                min_area: Decimal = _ZERO) -> Decimal:
+    """Área cobrada (m²) de um item por m², ao menos ``min_area``"""
+    area_m2 = (width_cm or 0) * (height_cm or 0) / 10000
+    # "Outros" por m² sem medidas valem o preço cheio (1 m²)
+    if kind == "outro" and area_m2 <= 0:
+        area_m2 = 1
+    area = Decimal(str(area_m2))
+    return area if area >= min_area else min_area
+
+
+def base_price(table: PriceTable, kind: str, fabric: Optional[str], sleeve: Optional[str], size: Optional[str],
+               visual_type: Optional[str], other_name: Optional[str],
+               client_type: ClientType = "normal") -> Tuple[Decimal, bool]:
+    """(preço base na tabela, cobrado por m²) de um item, antes das regras.
+
+    Sem linha própria para o tipo de cliente, camisetas e conjuntos usam o
+    preço do cliente normal (os multiplicadores das regras ajustam depois).
+    """
+    if kind == "camiseta":
+        price = table.camisetas.get((fabric, sleeve, size, client_type))
+        if price is None:
+            price = table.camisetas.get((fabric, sleeve, size, "normal"), _ZERO)
+        return price, False
+    if kind == "conjunto":
+        # O tipo de conjunto (ex.: "helanca_tactel") fica no campo ``fabric`` do item
+        price = table.conjuntos.get((fabric, sleeve, client_type))
+        if price is None:
+            price = table.conjuntos.get((fabric, sleeve, "normal"), _ZERO)
+        return price, False
+    if kind == "short":
+        return table.short, False  # Preço fixo base
+    if kind == "comunicacao_visual":
+        return table.visual.get(str(visual_type).lower(), _ZERO), True
+    if kind == "outro":
+        return table.others.get(other_name or "", (_ZERO, False))
+    return _ZERO, False
+
+
+def price_item(table: PriceTable, item: ProductItem, client_type: ClientType = "normal") -> Decimal:
+    """Preço unitário do item pela tabela e pelas regras (sem cache)"""
+    kind = item.product_type
+    if kind not in PRICED_KINDS:
+        return _ZERO
+    adjustment = table.rules.adjustment(kind, rule_name(item), client_type)
+    price, per_m2 = base_price(table, kind, item.fabric, item.sleeve, item.size, item.visual_type,
+                               item.other_name, client_type)
+    if per_m2:
+        price = price * billed_area(kind, item.width_cm, item.height_cm, adjustment.min_area)
+    if adjustment.identity:
+        return price
+    return price * adjustment.factor(item.quantity)
+
+
+def discount_amount(subtotal: Decimal, discount: Optional[Discount]) -> Decimal:
+    """Valor do desconto: percentual sobre o subtotal ou valor fixo"""
+    if discount is None:
+        return _ZERO
+    if discount.type == "percentage":
+        return subtotal * Decimal(str(discount.value)) / 100
+    return Decimal(str(discount.value))
+
+
+@dataclass
+class BudgetQuote:
+    """Preços de um orçamento: unitário por item e totais"""
+    unit_prices: List[Decimal] = field(default_factory=list)
+    subtotal: Decimal = _ZERO
+    art_creation_total: Decimal = _ZERO
+    discount: Decimal = _ZERO
+    total: Decimal = _ZERO
+
+    def line_total(self, index: int, item: ProductItem) -> Decimal:
+        return self.unit_prices[index] * item.quantity
+
+
+class PricingService:
+    """Preços de itens e orçamentos com cache por item, ligado a uma ``PriceDatabase``"""
+
+    # Tamanho máximo do cache; ao estourar, recomeça vazio
+    MAX_ENTRIES = 4096
+
+    def __init__(self, price_db: PriceDatabase, table: Optional[PriceTable] = None) -> None:
+        self.price_db = price_db
+        self._lock = threading.Lock()
+        # Com ``table``, o serviço fica fixo nessa versão (não acompanha o prices.json)
+        self._pinned = table
+        self._table: Optional[PriceTable] = table
+        self._cache: Dict[Tuple, Decimal] = {}
+        self._versions: Dict[str, "PricingService"] = {}
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def table(self) -> PriceTable:
+        """Tabela atual; descarta o cache se ``PriceDatabase`` trocou de tabela"""
+        if self._pinned is not None:
+            return self._pinned
+        table = self.price_db.table
+        if table is not self._table:
+            with self._lock:
+                if table is not self._table:
+                    self._cache = {}
+                    self._table = table
+        return table
+
+    def for_version(self, version: Optional[str]) -> "PricingService":
+        """Serviço com a tabela da versão gravada (memorizado por versão).
+
+        Sem versão, com a versão atual ou com uma versão desconhecida, retorna
+        este próprio serviço (preços atuais).
+        """
+        table = self.price_db.table_for(version)
+        if table is self.table:
+            return self
+        with self._lock:
+            service = self._versions.get(table.version)
+            if service is None:
+                service = PricingService(self.price_db, table)
+                self._versions[table.version] = service
+            return service
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cache = {}
+
+    def quote_item(self, item: ProductItem, client_type: ClientType = "normal") -> Decimal:
+        """Preço unitário do item (memorizado)"""
+        table = self.table
+        key = item_price_key(item, client_type)
+        if table.rules:
+            # Regras podem depender do tipo de cliente em qualquer produto e da quantidade (faixas)
+            key = key + (client_type, item.quantity if table.rules.quantity_sensitive(item.product_type) else None)
+        cache = self._cache
+        price = cache.get(key)
+        if price is not None:
+            self.hits += 1
+            return price
+        self.misses += 1
+        price = price_item(table, item, client_type)
+        with self._lock:
+            if self._table is table:
+                if len(self._cache) >= self.MAX_ENTRIES:
+                    self._cache = {}
+                self._cache[key] = price
+        return price
+
+    def quote_budget(self, budget: Budget, client_type: ClientType = "normal") -> BudgetQuote:
+        """Preços unitários e totais do orçamento (subtotal + arte - desconto)"""
+        quote = BudgetQuote()
+        subtotal = _ZERO
+        art_creation_total = _ZERO
+        for item in budget.items:
+            unit_price = self.quote_item(item, client_type)
+            quote.unit_prices.append(unit_price)
+            subtotal += unit_price * item.quantity
+            if item.art_creation_price:
+                art_creation_total += item.art_creation_price
+        quote.subtotal = subtotal
+        quote.art_creation_total = art_creation_total
+        quote.discount = discount_amount(subtotal, budget.discount)
+        quote.total = subtotal + art_creation_total - quote.discount
+        return quote
@@ -0,0 +1,81 @@
+"""Instâncias compartilhadas dos armazenamentos, uma por pasta de dados."""
+import os
+import threading
+from typing import Dict
+
+from .budget_storage import BudgetStorage
+from .client_metrics import ClientMetricsTracker
+from .clients import ClientStorage
+from .price_table import PRICES_FILE
+from .pricing_service import PricingService
+from .simulator_models import PriceDatabase
+
+_lock = threading.RLock()
+_budget_storages: Dict[str, BudgetStorage] = {}
+_client_storages: Dict[str, ClientStorage] = {}
+_client_metrics: Dict[str, ClientMetricsTracker] = {}
+_price_databases: Dict[str, PriceDatabase] = {}
+_pricing_services: Dict[str, PricingService] = {}
+
+
+def get_budget_storage(storage_dir: str = "data") -> BudgetStorage:
+    """Instância compartilhada de ``BudgetStorage`` para a pasta"""
+    key = os.path.abspath(storage_dir)
+    with _lock:
+        storage = _budget_storages.get(key)
+        if storage is None:
+            storage = BudgetStorage(storage_dir)
+            _budget_storages[key] = storage
+            _client_metrics[key] = ClientMetricsTracker(storage, get_client_storage(storage_dir))
+        return storage
+
+
+def get_client_storage(storage_dir: str = "data") -> ClientStorage:
+    """Instância compartilhada de ``ClientStorage`` para a pasta"""
+    key = os.path.abspath(storage_dir)
+    with _lock:
+        storage = _client_storages.get(key)
+        if storage is None:
+            storage = ClientStorage(storage_dir)
+            _client_storages[key] = storage
+        return storage
+
+
+def get_client_metrics(storage_dir: str = "data") -> ClientMetricsTracker:
+    """``ClientMetricsTracker`` ligado aos armazenamentos compartilhados da pasta"""
+    key = os.path.abspath(storage_dir)
+    with _lock:
+        get_budget_storage(storage_dir)
+        return _client_metrics[key]
+
+
+def get_price_database(config_path: str = PRICES_FILE) -> PriceDatabase:
+    """Instância compartilhada de ``PriceDatabase`` (uma tabela compilada por arquivo)"""
+    key = os.path.abspath(config_path)
+    with _lock:
+        database = _price_databases.get(key)
+        if database is None:
+            database = PriceDatabase(config_path)
+            _price_databases[key] = database
+        return database
+
+
+def get_pricing_service(config_path: str = PRICES_FILE) -> PricingService:
+    """``PricingService`` compartilhado (cache de preços único por arquivo de preços)"""
+    key = os.path.abspath(config_path)
+    with _lock:
+        service = _pricing_services.get(key)
+        if service is None:
+            service = PricingService(get_price_database(config_path))
+            _pricing_services[key] = service
+        return service
+
+
+def reset() -> None:
+    """Descarta as instâncias compartilhadas (a próxima chamada recarrega do disco)"""
+    with _lock:
+        _budget_storages.clear()
+        _client_storages.clear()
+        _client_metrics.clear()
+        _price_databases.clear()
+        _pricing_services.clear()
@@ -0,0 +1,178 @@
+from __future__ import annotations
+
+import heapq
+import unicodedata
+from bisect import bisect_left, insort
+from collections import defaultdict
+from typing import Dict, Hashable, Iterable, Iterator, List, Optional, Set, Tuple
+
+
+def fold_text(text: Optional[str]) -> str:
+    """Normaliza texto para busca: sem acentos, minúsculo e com espaços simples.
+
+    "Conceição  " -> "conceicao"
+    """
+    decomposed = unicodedata.normalize("NFKD", text or "")
+    stripped = "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return " ".join(stripped.casefold().split())
+
+
+def only_digits(text: Optional[str]) -> str:
+    """Mantém apenas os dígitos (ex.: telefones formatados)"""
+    return "".join(ch for ch in (text or "") if ch.isdigit())
+
+
+def trigrams(text: str) -> Set[str]:
+    """Trigramas de um texto já normalizado"""
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class TrigramIndex:
+    """Índice invertido de trigramas em memória, insensível a acento e caixa"""
+
+    def __init__(self, min_similarity: float = 0.4) -> None:
+        self.min_similarity = min_similarity
+        self._postings: Dict[str, Set[Hashable]] = defaultdict(set)
+        self._texts: Dict[Hashable, str] = {}
+
+    def __len__(self) -> int:
+        return len(self._texts)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._texts
+
+    def add(self, key: Hashable, text: Optional[str]) -> None:
+        """Indexa (ou reindexa) o texto de uma chave"""
+        folded = fold_text(text)
+        if self._texts.get(key) == folded:
+            return
+        self.remove(key)
+        self._texts[key] = folded
+        for tri in trigrams(f" {folded} "):
+            self._postings[tri].add(key)
+
+    def remove(self, key: Hashable) -> None:
+        """Remove uma chave do índice (ignora chaves inexistentes)"""
+        folded = self._texts.pop(key, None)
+        if folded is None:
+            return
+        for tri in trigrams(f" {folded} "):
+            keys = self._postings.get(tri)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._postings[tri]
+
+    def clear(self) -> None:
+        self._postings.clear()
+        self._texts.clear()
+
+    def _overlap_candidates(self, query: str, needed: int) -> Dict[Hashable, int]:
+        """Chaves com pelo menos ``needed`` trigramas da consulta, com a contagem.
+
+        Uma chave com ``needed`` dos ``n`` trigramas aparece em alguma das
+        ``n - needed + 1`` menores listas de ocorrência; só essas são
+        percorridas, e as demais servem apenas para completar a contagem.
+        """
+        postings = sorted((self._postings.get(tri, set()) for tri in trigrams(f" {query} ")), key=len)
+        seeds = postings[:len(postings) - needed + 1]
+        candidates = set().union(*seeds)
+        counts: Dict[Hashable, int] = dict.fromkeys(candidates, 0)
+        for keys in postings:
+            for key in candidates.intersection(keys):
+                counts[key] += 1
+        return {key: count for key, count in counts.items() if count >= needed}
+
+    def contains(self, query: Optional[str]) -> Set[Hashable]:
+        """Chaves cujo texto normalizado contém a consulta normalizada"""
+        q = fold_text(query)
+        if not q:
+            return set(self._texts)
+        inner = trigrams(q)
+        if not inner:
+            # Consultas de 1-2 caracteres não formam trigramas: varre os textos já normalizados
+            return {key for key, text in self._texts.items() if q in text}
+        # Interseção das listas de ocorrência, da menor para a maior
+        postings = sorted((self._postings.get(tri, set()) for tri in inner), key=len)
+        candidates = set(postings[0])
+        for keys in postings[1:]:
+            candidates &= keys
+            if not candidates:
+                break
+        return {key for key in candidates if q in self._texts[key]}
+
+    def search(self, query: Optional[str], limit: Optional[int] = None, fuzzy: bool = True) -> List[Tuple[Hashable, float]]:
+        """Busca ordenada por relevância, retornando pares (chave, pontuação).
+
+        Ordem: nome igual à consulta, começa com a consulta, contém a consulta
+        e, se ``fuzzy``, correspondências aproximadas pela fração de trigramas
+        em comum (a partir de ``min_similarity``). As aproximadas só são
+        calculadas quando os trechos exatos não completam ``limit``.
+        """
+        q = fold_text(query)
+        if not q:
+            return []
+        scored: Dict[Hashable, float] = {}
+        for key in self.contains(q):
+            text = self._texts[key]
+            if text == q:
+                scored[key] = 3.0
+            elif text.startswith(q) or f" {q}" in text:
+                scored[key] = 2.0
+            else:
+                scored[key] = 1.0 + len(q) / max(len(text), 1) * 0.5
+        if fuzzy and (limit is None or len(scored) < limit):
+            # Aproximados pontuam abaixo de qualquer trecho exato: só entram se faltarem resultados
+            total = len(trigrams(f" {q} "))
+            needed = next((n for n in range(1, total + 1) if n / total >= self.min_similarity), None)
+            if needed is not None:
+                for key, count in self._overlap_candidates(q, needed).items():
+                    if key not in scored:
+                        scored[key] = count / total * 0.9
+        order = lambda kv: (-kv[1], str(kv[0]))
+        if limit is not None:
+            return heapq.nsmallest(limit, scored.items(), key=order)
+        return sorted(scored.items(), key=order)
+
+
+class SortedIndex:
+    """Índice ordenado de pares (valor, chave) mantido com ``bisect``"""
+
+    def __init__(self) -> None:
+        self._entries: List[Tuple[str, Hashable]] = []
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def build(self, pairs: Iterable[Tuple[str, Hashable]]) -> None:
+        """Reconstrói o índice de uma vez (uma única ordenação)"""
+        self._entries = sorted((value or "", key) for value, key in pairs)
+
+    def clear(self) -> None:
+        self._entries = []
+
+    def add(self, value: Optional[str], key: Hashable) -> None:
+        insort(self._entries, (value or "", key))
+
+    def remove(self, value: Optional[str], key: Hashable) -> None:
+        entry = (value or "", key)
+        i = bisect_left(self._entries, entry)
+        if i < len(self._entries) and self._entries[i] == entry:
+            del self._entries[i]
+
+    def _bounds(self, low: Optional[str], high: Optional[str]) -> Tuple[int, int]:
+        start = bisect_left(self._entries, (low,)) if low else 0
+        # Limite superior inclusivo: qualquer valor igual a ``high`` é menor que high + "\x00"
+        end = bisect_left(self._entries, (high + "\x00",)) if high else len(self._entries)
+        return start, end
+
+    def range(self, low: Optional[str] = None, high: Optional[str] = None) -> List[Hashable]:
+        """Chaves com ``low <= valor <= high`` (limites opcionais), em ordem crescente"""
+        start, end = self._bounds(low, high)
+        return [key for _, key in self._entries[start:end]]
+
+    def iter_desc(self, low: Optional[str] = None, high: Optional[str] = None) -> Iterator[Hashable]:
+        """Chaves do maior para o menor valor, dentro dos limites opcionais"""
+        start, end = self._bounds(low, high)
+        for i in range(end - 1, start - 1, -1):
+            yield self._entries[i][1]
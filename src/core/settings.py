@@ -0,0 +1,24 @@
+import os
+from typing import Any, Dict, Optional
+
+from .file_store import read_json
+
+SETTINGS_FILE = os.path.join("config", "settings.json")
+
+# Formatos aceitos para o snapshot de orçamentos ("armazenamento.formato_orcamentos")
+BUDGET_FORMATS = ("json", "binario")
+
+
+def load_settings(path: str = SETTINGS_FILE) -> Dict[str, Any]:
+    """Lê ``config/settings.json`` (dicionário vazio se ausente ou inválido)"""
+    settings = read_json(path, {})
+    return settings if isinstance(settings, dict) else {}
+
+
+def budget_storage_format(settings: Optional[Dict[str, Any]] = None) -> str:
+    """Formato configurado para o snapshot de orçamentos (padrão: "json")"""
+    if settings is None:
+        settings = load_settings()
+    storage = settings.get("armazenamento") or {}
+    fmt = str(storage.get("formato_orcamentos", "json")).lower()
+    return fmt if fmt in BUDGET_FORMATS else "json"
@@ -1,6 +1,12 @@
 from dataclasses import dataclass, field
-from typing import Dict, List, Optional, Literal
+from typing import List, Mapping, Optional, Literal
 from decimal import Decimal
+import threading
+import time
+
+from .file_store import file_signature
+from .price_snapshots import SNAPSHOTS_DIR, PriceSnapshotStore
+from .price_table import PRICES_FILE, PriceTable, load_price_table
 
 # Tipos de produtos
 ProductType = Literal["camiseta", "conjunto", "short", "comunicacao_visual", "criacao_arte"]
@@ -65,151 +71,91 @@ class Budget:
     subtotal: Decimal = Decimal('0')
     total: Decimal = Decimal('0')
     created_date: str = ""
+    # Versão da tabela de preços da cotação (ver ``price_snapshots``) e tipo de cliente
+    price_version: Optional[str] = None
+    client_type: ClientType = "normal"
 
 class PriceDatabase:
-    """Base de dados de preços"""
-    
-    def __init__(self):
-        self.camiseta_prices = self._load_camiseta_prices()
-        self.conjunto_prices = self._load_conjunto_prices()
-        self.visual_prices = self._load_visual_prices()
-        self.other_products = self._load_other_products()
-    
-    def _load_camiseta_prices(self) -> Dict[tuple, Decimal]:
-        """Carrega preços das camisetas baseado na tabela fornecida"""
-        prices = {}
-        
-        # DRYFIT - MANGA CURTA
-        prices[("dryfit", "curta", "PP", "normal")] = Decimal('40.00')
-        prices[("dryfit", "curta", "P", "normal")] = Decimal('40.00')
-        prices[("dryfit", "curta", "M", "normal")] = Decimal('40.00')
-        prices[("dryfit", "curta", "G", "normal")] = Decimal('40.00')
-        prices[("dryfit", "curta", "GG", "normal")] = Decimal('45.00')
-        prices[("dryfit", "curta", "XG", "normal")] = Decimal('45.00')
-        prices[("dryfit", "curta", "XGG", "normal")] = Decimal('45.00')
-        prices[("dryfit", "curta", "XG3", "normal")] = Decimal('45.00')
-        
-        # DRYFIT - MANGA LONGA
-        prices[("dryfit", "longa", "PP", "normal")] = Decimal('45.00')
-        prices[("dryfit", "longa", "P", "normal")] = Decimal('45.00')
-        prices[("dryfit", "longa", "M", "normal")] = Decimal('45.00')
-        prices[("dryfit", "longa", "G", "normal")] = Decimal('45.00')
-        prices[("dryfit", "longa", "GG", "normal")] = Decimal('50.00')
-        prices[("dryfit", "longa", "XG", "normal")] = Decimal('53.00')
-        prices[("dryfit", "longa", "XGG", "normal")] = Decimal('53.00')
-        prices[("dryfit", "longa", "XG3", "normal")] = Decimal('53.00')
-        
-        # HELANCA - MANGA CURTA
-        prices[("helanca", "curta", "PP", "normal")] = Decimal('35.00')
-        prices[("helanca", "curta", "P", "normal")] = Decimal('35.00')
-        prices[("helanca", "curta", "M", "normal")] = Decimal('35.00')
-        prices[("helanca", "curta", "G", "normal")] = Decimal('35.00')
-        prices[("helanca", "curta", "GG", "normal")] = Decimal('40.00')
-        prices[("helanca", "curta", "XG", "normal")] = Decimal('40.00')
-        prices[("helanca", "curta", "XGG", "normal")] = Decimal('40.00')
-        prices[("helanca", "curta", "XG3", "normal")] = Decimal('40.00')
-        
-        # HELANCA - MANGA LONGA
-        prices[("helanca", "longa", "PP", "normal")] = Decimal('40.00')
-        prices[("helanca", "longa", "P", "normal")] = Decimal('40.00')
-        prices[("helanca", "longa", "M", "normal")] = Decimal('40.00')
-        prices[("helanca", "longa", "G", "normal")] = Decimal('40.00')
-        prices[("helanca", "longa", "GG", "normal")] = Decimal('45.00')
-        prices[("helanca", "longa", "XG", "normal")] = Decimal('48.00')
-        prices[("helanca", "longa", "XGG", "normal")] = Decimal('48.00')
-        prices[("helanca", "longa", "XG3", "normal")] = Decimal('48.00')
-        
-        return prices
-    
-    def _load_conjunto_prices(self) -> Dict[tuple, Decimal]:
-        """Carrega preços dos conjuntos baseado na tabela anexada"""
-        prices = {}
-        
-        # Conjuntos Helanca + Tactel
-        prices[("helanca_tactel", "curta", "normal")] = Decimal('58.00')
-        prices[("helanca_tactel", "longa", "normal")] = Decimal('63.00')
-        prices[("helanca_tactel", "curta", "terceiro")] = Decimal('49.00')
-        prices[("helanca_tactel", "longa", "terceiro")] = Decimal('54.00')
-        
-        # Conjuntos Todo Helanca
-        prices[("todo_helanca", "curta", "normal")] = Decimal('68.00')
-        prices[("todo_helanca", "longa", "normal")] = Decimal('70.00')
-        prices[("todo_helanca", "curta", "terceiro")] = Decimal('59.00')
-        prices[("todo_helanca", "longa", "terceiro")] = Decimal('62.00')
-        
-        # Conjuntos Dryfit + Helanca
-        prices[("dryfit_helanca", "curta", "normal")] = Decimal('73.00')
-        prices[("dryfit_helanca", "longa", "normal")] = Decimal('75.00')
-        prices[("dryfit_helanca", "curta", "terceiro")] = Decimal('64.00')
-        prices[("dryfit_helanca", "longa", "terceiro")] = Decimal('67.00')
-        
-        return prices
-    
-    def _load_visual_prices(self) -> Dict[str, Decimal]:
-        """Carrega preços da comunicação visual, mesclando com config/prices.json se existir."""
-        base = {
-            "lona": Decimal('60.00'),
-            "adesivo": Decimal('50.00'),
-            "adesivo_perfurado": Decimal('70.00'),
-            "banner": Decimal('50.00')
-        }
-        import os, json
-        cfg = os.path.join("config", "prices.json")
-        if os.path.exists(cfg):
-            try:
-                with open(cfg, "r", encoding="utf-8") as f:
-                    data = json.load(f)
-                    for v in data.get("visual", []):
-                        name = str(v.get("nome", "")).strip()
-                        price = Decimal(str(v.get("preco_m2", 0)))
-                        if name:
-                            base[name.lower()] = price
-            except Exception:
-                pass
-        return base
-
-    def _load_other_products(self) -> Dict[str, tuple[Decimal, bool]]:
-        """Carrega produtos 'outros' do config: nome -> (preço, por_m2)."""
-        out: Dict[str, tuple[Decimal, bool]] = {}
-        import os, json
-        cfg = os.path.join("config", "prices.json")
-        if os.path.exists(cfg):
-            try:
-                with open(cfg, "r", encoding="utf-8") as f:
-                    data = json.load(f)
-                    for o in data.get("outros", []):
-                        name = str(o.get("nome", "")).strip()
-                        price = Decimal(str(o.get("preco", 0)))
-                        per_m2 = bool(o.get("por_m2", False))
-                        if name:
-                            out[name] = (price, per_m2)
-            except Exception:
-                return {}
-        return out
-    
+    """Base de dados de preços: ``PriceTable`` do ``prices.json``, trocada quando o arquivo muda"""
+
+    # Intervalo mínimo (s) entre verificações da data de modificação do arquivo
+    CHECK_INTERVAL = 1.0
+
+    def __init__(self, config_path: str = PRICES_FILE, snapshot_dir: str = SNAPSHOTS_DIR):
+        self.config_path = config_path
+        self.snapshots = PriceSnapshotStore(snapshot_dir)
+        self._reload_lock = threading.Lock()
+        self._table = load_price_table(config_path)
+        self._checked_at = time.monotonic()
+
+    @property
+    def table(self) -> PriceTable:
+        """Tabela de preços atual (recompilada se ``prices.json`` mudou)"""
+        now = time.monotonic()
+        if now - self._checked_at >= self.CHECK_INTERVAL:
+            self._checked_at = now
+            if file_signature(self.config_path) != self._table.signature:
+                self.reload()
+        return self._table
+
+    def reload(self) -> PriceTable:
+        """Recompila a tabela se o arquivo mudou e a coloca no lugar da atual"""
+        with self._reload_lock:
+            if file_signature(self.config_path) != self._table.signature:
+                self._table = load_price_table(self.config_path)
+            self._checked_at = time.monotonic()
+            return self._table
+
+    def snapshot(self, table: Optional[PriceTable] = None) -> str:
+        """Grava a tabela (a atual, por padrão) entre as versões e retorna a versão"""
+        return self.snapshots.save(table or self.table)
+
+    def table_for(self, version: Optional[str]) -> PriceTable:
+        """Tabela da versão gravada; sem versão (orçamentos antigos) ou não encontrada, a atual"""
+        table = self.table
+        if not version or version == table.version:
+            return table
+        return self.snapshots.load(version) or table
+
+    @property
+    def camiseta_prices(self) -> Mapping[tuple, Decimal]:
+        return self.table.camisetas
+
+    @property
+    def conjunto_prices(self) -> Mapping[tuple, Decimal]:
+        return self.table.conjuntos
+
+    @property
+    def visual_prices(self) -> Mapping[str, Decimal]:
+        return self.table.visual
+
+    @property
+    def other_products(self) -> Mapping[str, tuple[Decimal, bool]]:
+        return self.table.others
+
     def get_camiseta_price(self, fabric: FabricType, sleeve: SleeveType, size: SizeType, client_type: ClientType = "normal") -> Decimal:
         """Retorna preço da camiseta"""
         key = (fabric, sleeve, size, client_type)
-        return self.camiseta_prices.get(key, Decimal('0'))
+        return self.table.camisetas.get(key, Decimal('0'))
     
     def get_conjunto_price(self, conjunto_type: str, sleeve: SleeveType, client_type: ClientType) -> Decimal:
         """Retorna preço do conjunto"""
         key = (conjunto_type, sleeve, client_type)
-        return self.conjunto_prices.get(key, Decimal('0'))
+        return self.table.conjuntos.get(key, Decimal('0'))
     
     def get_visual_price(self, visual_type: str) -> Decimal:
         """Retorna preço por m² da comunicação visual"""
-        return self.visual_prices.get(str(visual_type).lower(), Decimal('0'))
+        return self.table.visual.get(str(visual_type).lower(), Decimal('0'))
     
     def get_short_price(self, client_type: ClientType = "normal") -> Decimal:
         """Retorna preço base do short"""
-        return Decimal('25.00')  # Preço fixo base
+        return self.table.short  # Preço fixo base
 
     def get_visual_names(self) -> List[str]:
-        return list(self.visual_prices.keys())
+        return list(self.table.visual.keys())
 
     def get_other_products(self) -> List[tuple[str, Decimal, bool]]:
-        return [(name, price, per_m2) for name, (price, per_m2) in self.other_products.items()]
+        return [(name, price, per_m2) for name, (price, per_m2) in self.table.others.items()]
 
     def get_other_info(self, name: str) -> tuple[Decimal, bool]:
-        return self.other_products.get(name, (Decimal('0'), False))
+        return self.table.others.get(name, (Decimal('0'), False))
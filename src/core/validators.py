@@ -1,7 +1,8 @@
-from typing import List, Tuple
+from typing import List, Optional, Tuple
 from decimal import Decimal
 
-from .simulator_models import ProductItem, Budget
+from .pricing_service import PricingService
+from .simulator_models import ClientType, ProductItem, Budget
 
 
 class BudgetValidator:
@@ -12,11 +13,13 @@ class BudgetValidator:
     MIN_QUANTITY_SHORT = 1
     MIN_QUANTITY_VISUAL = 1
     
-    def __init__(self):
+    def __init__(self, pricing: Optional[PricingService] = None):
         self.errors: List[str] = []
         self.warnings: List[str] = []
+        # Com o serviço de preços, confere o subtotal contra os preços atuais
+        self.pricing = pricing
     
-    def validate_budget(self, budget: Budget) -> Tuple[bool, List[str], List[str]]:
+    def validate_budget(self, budget: Budget, client_type: ClientType = "normal") -> Tuple[bool, List[str], List[str]]:
         """Valida orçamento completo e retorna (válido, erros, avisos)"""
         self.errors.clear()
         self.warnings.clear()
@@ -29,6 +32,7 @@ class BudgetValidator:
         
         # Validar totais
         self._validate_totals(budget)
+        self._validate_prices(budget, client_type)
         
         return len(self.errors) == 0, self.errors.copy(), self.warnings.copy()
     
@@ -130,9 +134,19 @@ class BudgetValidator:
             elif budget.discount.type == "fixed" and budget.discount.value > budget.subtotal:
                 self.warnings.append("Desconto em valor fixo é maior que o subtotal.")
     
+    def _validate_prices(self, budget: Budget, client_type: ClientType):
+        """Confere o subtotal com os preços do serviço (reaproveita o cache da edição)"""
+        if self.pricing is None or not budget.items:
+            return
+        expected = self.pricing.quote_budget(budget, client_type).subtotal
+        if abs(expected - budget.subtotal) >= Decimal("0.01"):
+            self.warnings.append(
+                f"Subtotal (R$ {budget.subtotal:.2f}) difere da tabela de preços atual (R$ {expected:.2f})."
+            )
+    
     def get_validation_summary(self, budget: Budget) -> str:
         """Retorna resumo das validações"""
-        is_valid, errors, warnings = self.validate_budget(budget)
+        is_valid, errors, warnings = self.validate_budget(budget, budget.client_type)
         
         summary = []
         if errors:
@@ -1,5 +1,6 @@
 from dataclasses import dataclass
 from decimal import Decimal
+from typing import List, Optional
 from reportlab.pdfgen import canvas
 from reportlab.lib.utils import ImageReader
 from svglib.svglib import svg2rlg
@@ -7,7 +8,9 @@ from reportlab.graphics import renderPDF
 from datetime import date
 
 from ..core.utils import cm
-from ..core.simulator_models import Budget, ProductItem
+from ..core.pricing_service import PricingService
+from ..core.registry import get_pricing_service
+from ..core.simulator_models import Budget, ClientType, ProductItem
 
 
 class BudgetPDF:
@@ -15,8 +18,10 @@ class BudgetPDF:
     A4_HEIGHT_CM = 29.7
     LOGO_OFFSET_CM = 1.0
 
-    def __init__(self, logos_dir: str = "public") -> None:
+    def __init__(self, logos_dir: str = "public", pricing: Optional[PricingService] = None) -> None:
         self.path_manauara_logo = f"{logos_dir}/manauara_design.svg"
+        # Preços vêm do serviço compartilhado (mesmo cache do simulador)
+        self.pricing = pricing or get_pricing_service()
 
     def _draw_svg(self, c: canvas.Canvas, path: str, x: float, y: float, w_cm: float, h_cm: float) -> None:
         try:
@@ -62,7 +67,9 @@ class BudgetPDF:
             client_y -= cm(0.5)
             self._draw_text(c, f"Email: {budget.client.email}", x, client_y, "Helvetica", 12)
 
-    def _draw_products_table(self, c: canvas.Canvas, x: float, y: float, budget: Budget) -> None:
+    def _draw_products_table(self, c: canvas.Canvas, x: float, y: float, budget: Budget,
+                             client_type: ClientType = "normal",
+                             unit_prices: Optional[List[Decimal]] = None) -> None:
         self._draw_text(c, "PRODUTOS", x, y, "Helvetica-Bold", 14)
         
         # Cabeçalho da tabela
@@ -93,7 +100,10 @@ class BudgetPDF:
             c.drawString(x + cm(10), current_y, str(item.quantity))
             
             # Preço unitário
-            unit_price = self._calculate_unit_price(item)
+            if unit_prices is not None:
+                unit_price = unit_prices[i - 1]
+            else:
+                unit_price = self.pricing.quote_item(item, client_type)
             c.drawString(x + cm(12), current_y, f"R$ {unit_price:.2f}")
             
             # Total do item
@@ -123,41 +133,6 @@ class BudgetPDF:
             return f"Criação de Arte - R$ {item.art_creation_price:.2f}"
         return "Produto"
 
-    def _calculate_unit_price(self, item: ProductItem) -> Decimal:
-        """Calcula preço unitário do item"""
-        # Esta é uma versão simplificada - em produção, usaria a PriceDatabase
-        if item.product_type == "camiseta":
-            if item.fabric == "dryfit":
-                if item.sleeve == "curta":
-                    return Decimal('40.00') if item.size in ['PP', 'P', 'M', 'G'] else Decimal('45.00')
-                else:  # longa
-                    if item.size in ['PP', 'P', 'M', 'G']:
-                        return Decimal('45.00')
-                    elif item.size == 'GG':
-                        return Decimal('50.00')
-                    else:
-                        return Decimal('53.00')
-            else:  # helanca
-                if item.sleeve == "curta":
-                    return Decimal('35.00') if item.size in ['PP', 'P', 'M', 'G'] else Decimal('40.00')
-                else:  # longa
-                    if item.size in ['PP', 'P', 'M', 'G']:
-                        return Decimal('40.00')
-                    elif item.size == 'GG':
-                        return Decimal('45.00')
-                    else:
-                        return Decimal('48.00')
-        elif item.product_type == "short":
-            return Decimal('25.00')
-        elif item.product_type == "comunicacao_visual":
-            area = (item.width_cm or 0) * (item.height_cm or 0) / 10000
-            price_per_m2 = Decimal('60.00') if item.visual_type == 'lona' else Decimal('50.00')
-            return price_per_m2 * Decimal(str(area))
-        elif item.product_type == "criacao_arte":
-            return item.art_creation_price or Decimal('0')
-        
-        return Decimal('0')
-
     def _draw_totals(self, c: canvas.Canvas, x: float, y: float, budget: Budget) -> None:
         # Linha separadora
         c.line(x, y, x + cm(18), y)
@@ -199,8 +174,9 @@ class BudgetPDF:
         c.setFont("Helvetica", 8)
         c.drawCentredString(x + cm(10), y, footer_text)
 
-    def generate(self, budget: Budget, output_path: str) -> None:
-        """Gera PDF do orçamento"""
+    def generate(self, budget: Budget, output_path: str, client_type: ClientType = "normal",
+                 unit_prices: Optional[List[Decimal]] = None) -> None:
+        """Gera PDF do orçamento (preços unitários pelo tipo de cliente, ou ``unit_prices`` por item)"""
         c = canvas.Canvas(output_path, pagesize=(cm(self.A4_WIDTH_CM), cm(self.A4_HEIGHT_CM)))
         c.setAuthor("Manauara Design")
         
@@ -217,7 +193,7 @@ class BudgetPDF:
         
         # Tabela de produtos
         products_y = client_y - cm(3)
-        self._draw_products_table(c, left_x, products_y, budget)
+        self._draw_products_table(c, left_x, products_y, budget, client_type, unit_prices)
         
         # Totais
         totals_y = products_y - cm(4)
@@ -4,7 +4,9 @@ import json
 import os
 from typing import Dict, List
 
-from ..core.simulator_models import PriceDatabase
+from ..core.registry import get_price_database
+from ..core.file_store import atomic_write_json, file_lock, read_json
+from ..core.settings import load_settings
 from .theme import ThemeManager
 
 
@@ -13,7 +15,7 @@ class AdminWindow(QtWidgets.QMainWindow):
         super().__init__()
         self.setWindowTitle("Administração - Manauara Design")
         self.resize(1000, 700)
-        self.price_db = PriceDatabase()
+        self.price_db = get_price_database()
         self._init_ui()
         self._init_menu()
         self._load_prices()
@@ -375,32 +377,12 @@ _Manauara Design_"""
 
     def _populate_prices_table(self):
         """Preenche tabela de preços"""
-        # Dados de exemplo - em produção, carregaria do arquivo de configuração
+        # Camisetas da tabela compilada (padrões + config/prices.json), cliente normal
+        camisetas = self.price_db.reload().camisetas
         prices_data = [
-            ("Dryfit", "Curta", "PP", "40.00"),
-            ("Dryfit", "Curta", "P", "40.00"),
-            ("Dryfit", "Curta", "M", "40.00"),
-            ("Dryfit", "Curta", "G", "40.00"),
-            ("Dryfit", "Curta", "GG", "45.00"),
-            ("Dryfit", "Curta", "XG", "45.00"),
-            ("Dryfit", "Longa", "PP", "45.00"),
-            ("Dryfit", "Longa", "P", "45.00"),
-            ("Dryfit", "Longa", "M", "45.00"),
-            ("Dryfit", "Longa", "G", "45.00"),
-            ("Dryfit", "Longa", "GG", "50.00"),
-            ("Dryfit", "Longa", "XG", "53.00"),
-            ("Helanca", "Curta", "PP", "35.00"),
-            ("Helanca", "Curta", "P", "35.00"),
-            ("Helanca", "Curta", "M", "35.00"),
-            ("Helanca", "Curta", "G", "35.00"),
-            ("Helanca", "Curta", "GG", "40.00"),
-            ("Helanca", "Curta", "XG", "40.00"),
-            ("Helanca", "Longa", "PP", "40.00"),
-            ("Helanca", "Longa", "P", "40.00"),
-            ("Helanca", "Longa", "M", "40.00"),
-            ("Helanca", "Longa", "G", "40.00"),
-            ("Helanca", "Longa", "GG", "45.00"),
-            ("Helanca", "Longa", "XG", "48.00"),
+            (fabric.capitalize(), sleeve.capitalize(), size, f"{price:.2f}")
+            for (fabric, sleeve, size, client_type), price in camisetas.items()
+            if client_type == "normal"
         ]
         
         self.prices_table.setRowCount(len(prices_data))
@@ -522,30 +504,38 @@ _Manauara Design_"""
                 "por_m2": (m2_item.text().strip().lower() == "sim") if m2_item else False,
             })
 
-        # Salvar arquivo
-        os.makedirs("config", exist_ok=True)
-        with open("config/prices.json", "w", encoding="utf-8") as f:
-            json.dump(config, f, ensure_ascii=False, indent=2)
+        # Salvar arquivo (troca atômica, sob trava para sessões simultâneas)
+        path = os.path.join("config", "prices.json")
+        with file_lock(path):
+            # Conjuntos e regras declaradas não são editados aqui: mantém os do arquivo
+            current = read_json(path, {})
+            if isinstance(current, dict):
+                for key in ("conjuntos", "regras"):
+                    if key in current:
+                        config[key] = current[key]
+            atomic_write_json(path, config, indent=2)
+        # Janelas abertas passam a usar a nova tabela sem esperar a próxima verificação
+        self.price_db.reload()
 
     def _save_settings(self):
-        """Salva configurações"""
-        config = {
-            "quantidades_minimas": {
-                "camiseta": self.min_quantity_camiseta.value(),
-                "conjunto": self.min_quantity_conjunto.value(),
-                "short": self.min_quantity_short.value()
-            },
-            "whatsapp": {
-                "mensagem": self.whatsapp_message.toPlainText()
-            },
-            "pdf": {
-                "rodape": self.pdf_footer.text()
-            }
-        }
-        
-        os.makedirs("config", exist_ok=True)
-        with open("config/settings.json", "w", encoding="utf-8") as f:
-            json.dump(config, f, ensure_ascii=False, indent=2)
+        """Salva configurações (chaves não editadas aqui, como "armazenamento", são mantidas)"""
+        path = os.path.join("config", "settings.json")
+        with file_lock(path):
+            config = load_settings(path)
+            config.update({
+                "quantidades_minimas": {
+                    "camiseta": self.min_quantity_camiseta.value(),
+                    "conjunto": self.min_quantity_conjunto.value(),
+                    "short": self.min_quantity_short.value()
+                },
+                "whatsapp": {
+                    "mensagem": self.whatsapp_message.toPlainText()
+                },
+                "pdf": {
+                    "rodape": self.pdf_footer.text()
+                }
+            })
+            atomic_write_json(path, config, indent=2)
 
     def _reload_data(self):
         """Recarrega dados"""
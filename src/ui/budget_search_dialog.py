@@ -1,19 +1,29 @@
 from PyQt6 import QtWidgets, QtGui, QtCore
 from datetime import date, datetime
-from typing import List, Dict, Optional
+from typing import List, Optional
 
-from ..core.budget_storage import BudgetStorage
+from ..core.budget_storage import BudgetSummary
+from ..core.registry import get_budget_storage
 
 
 class BudgetSearchDialog(QtWidgets.QDialog):
+    # Quantidade de linhas carregadas por página
+    PAGE_SIZE = 50
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self.setWindowTitle("Buscar Orçamentos")
         self.resize(800, 600)
-        self.storage = BudgetStorage()
+        self.storage = get_budget_storage()
         self.selected_budget = None
+        # Filtros da consulta exibida e deslocamento da próxima página
+        self._query = ("", "", "")
+        self._offset = 0
         self._init_ui()
         self._load_recent_budgets()
+        # Orçamentos salvos/excluídos em outras janelas atualizam a consulta exibida
+        self.storage.subscribe(self._on_budgets_changed)
+        self.finished.connect(lambda _result: self.storage.unsubscribe(self._on_budgets_changed))
 
     def _init_ui(self):
         layout = QtWidgets.QVBoxLayout(self)
@@ -77,9 +87,13 @@ class BudgetSearchDialog(QtWidgets.QDialog):
         self.delete_btn = QtWidgets.QPushButton("Excluir Selecionado")
         self.delete_btn.clicked.connect(self._delete_selected)
         self.delete_btn.setEnabled(False)
+        self.more_btn = QtWidgets.QPushButton("Carregar mais")
+        self.more_btn.clicked.connect(self._load_next_page)
+        self.more_btn.setEnabled(False)
         action_buttons.addWidget(self.load_btn)
         action_buttons.addWidget(self.delete_btn)
         action_buttons.addStretch(1)
+        action_buttons.addWidget(self.more_btn)
         results_layout.addLayout(action_buttons)
         
         layout.addWidget(results_group)
@@ -98,8 +112,7 @@ class BudgetSearchDialog(QtWidgets.QDialog):
 
     def _load_recent_budgets(self):
         """Carrega orçamentos recentes"""
-        recent = self.storage.get_recent_budgets(20)
-        self._populate_table(recent)
+        self._run_query("", "", "")
 
     def _search_budgets(self):
         """Executa busca com filtros"""
@@ -107,8 +120,30 @@ class BudgetSearchDialog(QtWidgets.QDialog):
         date_from = self.date_from.date().toString("yyyy-MM-dd") if self.date_from.date().isValid() else ""
         date_to = self.date_to.date().toString("yyyy-MM-dd") if self.date_to.date().isValid() else ""
         
-        results = self.storage.search_budgets(client_name, date_from, date_to)
-        self._populate_table(results)
+        self._run_query(client_name, date_from, date_to)
+
+    def _run_query(self, client_name: str, date_from: str, date_to: str):
+        """Inicia uma nova consulta exibindo apenas a primeira página"""
+        self._query = (client_name, date_from, date_to)
+        self._offset = 0
+        self.results_table.setRowCount(0)
+        self._load_next_page()
+
+    def _load_next_page(self):
+        """Acrescenta a próxima página de resultados resumidos à tabela"""
+        page = self.storage.search_summaries(*self._query, limit=self.PAGE_SIZE, offset=self._offset)
+        self._offset += len(page)
+        self._populate_table(page)
+        self.more_btn.setEnabled(len(page) == self.PAGE_SIZE)
+
+    def _on_budgets_changed(self, event: str, budget_id):
+        """Refaz a consulta atual mantendo as páginas já exibidas"""
+        shown = max(self._offset, self.PAGE_SIZE)
+        page = self.storage.search_summaries(*self._query, limit=shown, offset=0)
+        self._offset = len(page)
+        self.results_table.setRowCount(0)
+        self._populate_table(page)
+        self.more_btn.setEnabled(len(page) == shown)
 
     def _clear_filters(self):
         """Limpa filtros e carrega orçamentos recentes"""
@@ -117,29 +152,27 @@ class BudgetSearchDialog(QtWidgets.QDialog):
         self.date_to.setDate(QtCore.QDate.currentDate())
         self._load_recent_budgets()
 
-    def _populate_table(self, budgets: List[Dict]):
-        """Preenche tabela com resultados"""
-        self.results_table.setRowCount(len(budgets))
+    def _populate_table(self, budgets: List[BudgetSummary]):
+        """Acrescenta linhas resumidas à tabela (itens não são materializados)"""
+        first_row = self.results_table.rowCount()
+        self.results_table.setRowCount(first_row + len(budgets))
         
-        for row, budget in enumerate(budgets):
+        for row, budget in enumerate(budgets, first_row):
             # ID
-            self.results_table.setItem(row, 0, QtWidgets.QTableWidgetItem(budget["id"]))
+            self.results_table.setItem(row, 0, QtWidgets.QTableWidgetItem(budget.id))
             
             # Cliente
-            client_name = budget["client"]["name"]
-            self.results_table.setItem(row, 1, QtWidgets.QTableWidgetItem(client_name))
+            self.results_table.setItem(row, 1, QtWidgets.QTableWidgetItem(budget.client_name))
             
             # Data
-            created_date = budget["created_date"]
-            self.results_table.setItem(row, 2, QtWidgets.QTableWidgetItem(created_date))
+            self.results_table.setItem(row, 2, QtWidgets.QTableWidgetItem(budget.created_date))
             
             # Total
-            total = f"R$ {budget['total']:.2f}"
+            total = f"R$ {budget.total:.2f}"
             self.results_table.setItem(row, 3, QtWidgets.QTableWidgetItem(total))
             
             # Itens
-            items_count = len(budget["items"])
-            self.results_table.setItem(row, 4, QtWidgets.QTableWidgetItem(str(items_count)))
+            self.results_table.setItem(row, 4, QtWidgets.QTableWidgetItem(str(budget.items_count)))
             
             # Ações
             actions_widget = QtWidgets.QWidget()
@@ -147,13 +180,14 @@ class BudgetSearchDialog(QtWidgets.QDialog):
             actions_layout.setContentsMargins(2, 2, 2, 2)
             
             view_btn = QtWidgets.QPushButton("Ver")
-            view_btn.clicked.connect(lambda checked, bid=budget["id"]: self._view_budget(bid))
+            view_btn.clicked.connect(lambda checked, bid=budget.id: self._view_budget(bid))
             actions_layout.addWidget(view_btn)
             
             self.results_table.setCellWidget(row, 5, actions_widget)
         
-        # Ajustar largura das colunas
-        self.results_table.resizeColumnsToContents()
+        # Ajustar largura das colunas apenas na primeira página
+        if first_row == 0:
+            self.results_table.resizeColumnsToContents()
 
     def _view_budget(self, budget_id: str):
         """Visualiza detalhes de um orçamento"""
@@ -197,7 +231,6 @@ class BudgetSearchDialog(QtWidgets.QDialog):
             if reply == QtWidgets.QMessageBox.StandardButton.Yes:
                 if self.storage.delete_budget(budget_id):
                     QtWidgets.QMessageBox.information(self, "Sucesso", "Orçamento excluído com sucesso.")
-                    self._load_recent_budgets()
                 else:
                     QtWidgets.QMessageBox.warning(self, "Erro", "Erro ao excluir orçamento.")
 
@@ -1,17 +1,27 @@
 from PyQt6 import QtWidgets, QtCore
 
-from ..core.clients import ClientStorage, Client
+from ..core.clients import Client
+from ..core.registry import get_client_storage
+from .clients_model import ClientsFilterProxy, ClientsTableModel
 
 
 class ClientsDialog(QtWidgets.QDialog):
+    # Espera (ms) após a última tecla antes de refiltrar
+    SEARCH_DELAY_MS = 150
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self.setWindowTitle("Clientes")
         self.resize(520, 420)
-        self.storage = ClientStorage()
+        self.storage = get_client_storage()
         self.selected_client: Client | None = None
         self._init_ui()
-        self._load()
+        self.storage.subscribe(self._on_clients_changed)
+        self.finished.connect(self._on_finished)
+
+    def _on_finished(self, _result):
+        self.storage.unsubscribe(self._on_clients_changed)
+        self.model.detach()
 
     def _init_ui(self):
         layout = QtWidgets.QVBoxLayout(self)
@@ -25,10 +35,29 @@ class ClientsDialog(QtWidgets.QDialog):
         search_layout.addWidget(btn_search)
         layout.addLayout(search_layout)
 
-        self.table = QtWidgets.QTableWidget()
-        self.table.setColumnCount(4)
-        self.table.setHorizontalHeaderLabels(["Nome", "Telefone", "Email", "Total Gasto (R$)"])
+        # Filtra enquanto digita, depois de uma pausa curta
+        self._search_timer = QtCore.QTimer(self)
+        self._search_timer.setSingleShot(True)
+        self._search_timer.setInterval(self.SEARCH_DELAY_MS)
+        self._search_timer.timeout.connect(self._on_search)
+        self.search_input.textChanged.connect(self._search_timer.start)
+        self.search_input.returnPressed.connect(self._on_search)
+
+        self.model = ClientsTableModel(self.storage, self)
+        self.proxy = ClientsFilterProxy(self.storage, self)
+        self.proxy.setSourceModel(self.model)
+
+        self.table = QtWidgets.QTableView()
+        self.table.setModel(self.proxy)
+        self.table.setSelectionBehavior(QtWidgets.QAbstractItemView.SelectionBehavior.SelectRows)
+        self.table.setSelectionMode(QtWidgets.QAbstractItemView.SelectionMode.SingleSelection)
+        self.table.setEditTriggers(QtWidgets.QAbstractItemView.EditTrigger.NoEditTriggers)
+        # Linhas de altura fixa: a view só consulta o modelo para as linhas visíveis
+        self.table.verticalHeader().setSectionResizeMode(QtWidgets.QHeaderView.ResizeMode.Fixed)
+        self.table.verticalHeader().setVisible(False)
         self.table.horizontalHeader().setStretchLastSection(True)
+        self.table.resizeColumnsToContents()
+        self.table.doubleClicked.connect(lambda _index: self._on_select())
         layout.addWidget(self.table)
 
         btns = QtWidgets.QHBoxLayout()
@@ -50,34 +79,24 @@ class ClientsDialog(QtWidgets.QDialog):
         btns.addWidget(self.btn_select)
         layout.addLayout(btns)
 
-        self.table.itemSelectionChanged.connect(self._toggle_actions)
+        self.table.selectionModel().selectionChanged.connect(self._toggle_actions)
+        self.proxy.modelReset.connect(self._toggle_actions)
+        self.proxy.layoutChanged.connect(self._toggle_actions)
 
-    def _toggle_actions(self):
-        has = len(self.table.selectedItems()) > 0
+    def _toggle_actions(self, *_args):
+        has = self.table.selectionModel().hasSelection()
         self.btn_edit.setEnabled(has)
         self.btn_remove.setEnabled(has)
         self.btn_select.setEnabled(has)
 
-    def _load(self):
-        clients = self.storage.list_clients()
-        self._fill(clients)
-
-    def _fill(self, clients: list[Client]):
-        self.table.setRowCount(len(clients))
-        for r, c in enumerate(clients):
-            self.table.setItem(r, 0, QtWidgets.QTableWidgetItem(c.name))
-            self.table.setItem(r, 1, QtWidgets.QTableWidgetItem(c.phone))
-            self.table.setItem(r, 2, QtWidgets.QTableWidgetItem(c.email or ""))
-            self.table.setItem(r, 3, QtWidgets.QTableWidgetItem(f"{c.total_spent:.2f}"))
-        self.table.resizeColumnsToContents()
-
     def _on_search(self):
-        term = self.search_input.text().strip()
-        if term:
-            clients = self.storage.find_by_name_or_phone(term)
-        else:
-            clients = self.storage.list_clients()
-        self._fill(clients)
+        self._search_timer.stop()
+        self.proxy.set_term(self.search_input.text())
+
+    def _on_clients_changed(self, event: str, client_id):
+        # O modelo já atualizou as linhas; só o filtro digitado precisa ser refeito
+        if self.proxy.term:
+            self.proxy.refresh()
 
     def _on_add(self):
         name, ok = QtWidgets.QInputDialog.getText(self, "Novo Cliente", "Nome:")
@@ -90,18 +109,13 @@ class ClientsDialog(QtWidgets.QDialog):
         if not ok:
             email = ""
         self.storage.create_client(name=name.strip(), phone=phone.strip(), email=email.strip() or None)
-        self._load()
 
     def _get_selected_client(self) -> Client | None:
-        row = self.table.currentRow()
-        if row < 0:
+        rows = self.table.selectionModel().selectedRows()
+        if not rows:
             return None
-        name = self.table.item(row, 0).text()
-        phone = self.table.item(row, 1).text()
-        email = self.table.item(row, 2).text().strip() or None
-        # resolve por busca
-        matches = self.storage.find_by_name_or_phone(phone or name)
-        return matches[0] if matches else None
+        source = self.proxy.mapToSource(rows[0])
+        return self.storage.find_by_id(self.model.client_id(source.row()))
 
     def _on_edit(self):
         c = self._get_selected_client()
@@ -120,14 +134,12 @@ class ClientsDialog(QtWidgets.QDialog):
         c.phone = phone.strip()
         c.email = email.strip() or None
         self.storage.update_client(c)
-        self._load()
 
     def _on_remove(self):
         c = self._get_selected_client()
         if not c:
             return
         self.storage.delete_client(c.id)
-        self._load()
 
     def _on_select(self):
         c = self._get_selected_client()
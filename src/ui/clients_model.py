@@ -0,0 +1,137 @@
+from PyQt6 import QtCore
+
+from ..core.clients import ClientStorage
+
+ClientIdRole = QtCore.Qt.ItemDataRole.UserRole + 1
+
+
+class ClientsTableModel(QtCore.QAbstractTableModel):
+    """Tabela de clientes lida diretamente do ``ClientStorage``.
+
+    Guarda só a lista de IDs; nome, telefone etc. são lidos do registro em
+    memória quando a view pede uma célula visível, sem criar objetos
+    ``Client`` nem itens por célula. Alterações chegam pelos eventos do
+    armazenamento e viram inserções/remoções pontuais de linhas.
+    """
+
+    HEADERS = ["Nome", "Telefone", "Email", "Total Gasto (R$)"]
+
+    def __init__(self, storage: ClientStorage, parent=None):
+        super().__init__(parent)
+        self.storage = storage
+        self._ids = storage.ids()
+        self._rows = {cid: row for row, cid in enumerate(self._ids)}
+        storage.subscribe(self._on_clients_changed)
+
+    def detach(self):
+        self.storage.unsubscribe(self._on_clients_changed)
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        return 0 if parent.isValid() else len(self._ids)
+
+    def columnCount(self, parent=QtCore.QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def headerData(self, section, orientation, role=QtCore.Qt.ItemDataRole.DisplayRole):
+        if role == QtCore.Qt.ItemDataRole.DisplayRole and orientation == QtCore.Qt.Orientation.Horizontal:
+            return self.HEADERS[section]
+        return None
+
+    def client_id(self, row: int) -> str:
+        return self._ids[row]
+
+    def data(self, index, role=QtCore.Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        client_id = self._ids[index.row()]
+        if role == ClientIdRole:
+            return client_id
+        column = index.column()
+        if role == QtCore.Qt.ItemDataRole.TextAlignmentRole and column == 3:
+            return int(QtCore.Qt.AlignmentFlag.AlignRight | QtCore.Qt.AlignmentFlag.AlignVCenter)
+        if role != QtCore.Qt.ItemDataRole.DisplayRole:
+            return None
+        record = self.storage.record(client_id)
+        if record is None:
+            return None
+        if column == 0:
+            return record.get("name")
+        if column == 1:
+            return record.get("phone")
+        if column == 2:
+            return record.get("email") or ""
+        return f"{float(record.get('total_spent', 0.0)):.2f}"
+
+    def _on_clients_changed(self, event: str, client_id):
+        if event == "created" and client_id not in self._rows:
+            row = len(self._ids)
+            self.beginInsertRows(QtCore.QModelIndex(), row, row)
+            self._ids.append(client_id)
+            self._rows[client_id] = row
+            self.endInsertRows()
+        elif event == "deleted" and client_id in self._rows:
+            row = self._rows.pop(client_id)
+            self.beginRemoveRows(QtCore.QModelIndex(), row, row)
+            del self._ids[row]
+            for shifted in self._ids[row:]:
+                self._rows[shifted] -= 1
+            self.endRemoveRows()
+        elif event in ("updated", "metrics") and client_id in self._rows:
+            row = self._rows[client_id]
+            self.dataChanged.emit(self.index(row, 0), self.index(row, len(self.HEADERS) - 1))
+        else:
+            # "reloaded" (outro processo) ou evento fora de ordem: relê a lista
+            self.beginResetModel()
+            self._ids = self.storage.ids()
+            self._rows = {cid: row for row, cid in enumerate(self._ids)}
+            self.endResetModel()
+
+
+class ClientsFilterProxy(QtCore.QSortFilterProxyModel):
+    """Filtro da tabela de clientes pela busca do ``ClientStorage``.
+
+    O termo é resolvido uma vez pelos índices de nome/telefone do
+    armazenamento; a proxy só consulta o conjunto de IDs aceitos e ordena
+    pela relevância devolvida. As linhas do modelo de origem não mudam.
+    """
+
+    # Máximo de resultados aproximados quando o termo não casa com nenhum nome
+    FUZZY_LIMIT = 200
+
+    def __init__(self, storage: ClientStorage, parent=None):
+        super().__init__(parent)
+        self.storage = storage
+        self.term = ""
+        self._rank = None
+
+    def set_term(self, term: str):
+        term = term.strip()
+        if term == self.term:
+            return
+        self.term = term
+        self.refresh()
+
+    def refresh(self):
+        """Refaz a busca do termo atual (ex.: depois de alterações nos clientes)"""
+        if self.term:
+            # A cada tecla: só trechos exatos; aproximações (erros de digitação) quando nada casar
+            ids = self.storage.search_ids(self.term, limit=None, fuzzy=False)
+            if not ids:
+                ids = self.storage.search_ids(self.term, limit=self.FUZZY_LIMIT)
+            self._rank = {cid: pos for pos, cid in enumerate(ids)}
+        else:
+            self._rank = None
+        self.invalidateFilter()
+        # Com termo, ordena pela relevância; sem termo, volta à ordem de cadastro
+        self.sort(0 if self.term else -1)
+
+    def filterAcceptsRow(self, source_row, source_parent):
+        if self._rank is None:
+            return True
+        return self.sourceModel().client_id(source_row) in self._rank
+
+    def lessThan(self, left, right):
+        if self._rank is None:
+            return left.row() < right.row()
+        model = self.sourceModel()
+        return self._rank.get(model.client_id(left.row()), 0) < self._rank.get(model.client_id(right.row()), 0)
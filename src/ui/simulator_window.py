@@ -5,13 +5,14 @@ import os
 
 from ..core.simulator_models import (
     ProductType, FabricType, SleeveType, SizeType, VisualType, ClientType,
-    ProductItem, ClientInfo, Discount, Budget, PriceDatabase
+    ProductItem, ClientInfo, Discount, Budget
 )
-from ..core.budget_storage import BudgetStorage
+from ..core.registry import get_budget_storage, get_client_storage, get_price_database, get_pricing_service
 from ..core.validators import BudgetValidator
+from ..core.budget_totals import BudgetTotals
 from .budget_search_dialog import BudgetSearchDialog
 from .theme import ThemeManager
-from ..core.clients import ClientStorage, Client
+from ..core.clients import Client
 from ..core.discounts import DiscountSuggester
 from .clients_dialog import ClientsDialog
 
@@ -21,10 +22,13 @@ class SimulatorWindow(QtWidgets.QMainWindow):
         super().__init__()
         self.setWindowTitle("Simulador de Orçamentos - Manauara Design")
         self.resize(1000, 700)
-        self.price_db = PriceDatabase()
-        self.storage = BudgetStorage()
-        self.validator = BudgetValidator()
-        self.client_storage = ClientStorage()
+        self.price_db = get_price_database()
+        self.pricing = get_pricing_service()
+        self.storage = get_budget_storage()
+        self.validator = BudgetValidator(self.pricing)
+        # Subtotais mantidos a cada inclusão/edição/remoção de item
+        self.totals = BudgetTotals(self.pricing)
+        self.client_storage = get_client_storage()
         self.current_client_id: str | None = None
         self._suggested_percent: int | None = None
         self.budget = Budget(
@@ -33,6 +37,8 @@ class SimulatorWindow(QtWidgets.QMainWindow):
         )
         self._init_ui()
         self._init_menu()
+        # Métricas de clientes alteradas em outras janelas mudam a sugestão de desconto
+        self.client_storage.subscribe(self._on_clients_changed)
 
     def _init_ui(self):
         container = QtWidgets.QWidget()
@@ -100,6 +106,7 @@ class SimulatorWindow(QtWidgets.QMainWindow):
         client_layout.addWidget(QtWidgets.QLabel("Tipo:"), 2, 0)
         self.client_type = QtWidgets.QComboBox()
         self.client_type.addItems(["Cliente Normal", "Terceirizado"])
+        self.client_type.currentIndexChanged.connect(self._on_client_type_changed)
         client_layout.addWidget(self.client_type, 2, 1)
 
         layout.addWidget(client_group)
@@ -267,8 +274,9 @@ class SimulatorWindow(QtWidgets.QMainWindow):
             product = dialog.get_product()
             if product:
                 self.budget.items.append(product)
-                self._update_products_list()
+                self.totals.add(product)
                 self._calculate_totals()
+                self._update_products_list()
 
     def _update_products_list(self):
         """Atualiza lista de produtos"""
@@ -293,28 +301,16 @@ class SimulatorWindow(QtWidgets.QMainWindow):
         return f"Produto - Qtd: {item.quantity}"
 
     def _calculate_totals(self):
-        """Calcula totais do orçamento"""
-        subtotal = Decimal('0')
-        art_creation_total = Decimal('0')
-        
-        for item in self.budget.items:
-            item_price = self._calculate_item_price(item)
-            subtotal += item_price * item.quantity
-            
-            if item.art_creation_price:
-                art_creation_total += item.art_creation_price
-        
+        """Atualiza os totais a partir dos subtotais mantidos (sem reprecificar os itens)"""
+        # Tabela de preços recarregada (ex.: edição no Admin): reprecifica tudo
+        self.totals.refresh(self.budget.items)
+        discount = self._current_discount()
+        subtotal = self.totals.subtotal
+        art_creation_total = self.totals.art_creation_total
+        discount_amount = self.totals.discount(discount)
+
         self.budget.subtotal = subtotal
         self.budget.art_creation_total = art_creation_total
-        
-        # Aplicar desconto
-        discount_amount = Decimal('0')
-        if self.discount_type.currentText() != "Sem desconto":
-            if self.discount_type.currentText() == "Percentual (%)":
-                discount_amount = subtotal * Decimal(str(self.discount_value.value())) / 100
-            else:  # Valor fixo
-                discount_amount = Decimal(str(self.discount_value.value()))
-        
         self.budget.total = subtotal + art_creation_total - discount_amount
         
         # Atualizar labels
@@ -324,31 +320,27 @@ class SimulatorWindow(QtWidgets.QMainWindow):
         self.total_label.setText(f"Total: R$ {self.budget.total:.2f}")
         self._update_actions_state()
 
-    def _calculate_item_price(self, item: ProductItem) -> Decimal:
-        """Calcula preço de um item"""
-        client_type = "terceiro" if self.client_type.currentText() == "Terceirizado" else "normal"
-        
-        if item.product_type == "camiseta":
-            return self.price_db.get_camiseta_price(
-                item.fabric, item.sleeve, item.size, client_type
-            )
-        elif item.product_type == "conjunto":
-            conjunto_type = f"{item.fabric}_tactel"  # Simplificado
-            return self.price_db.get_conjunto_price(conjunto_type, item.sleeve, client_type)
-        elif item.product_type == "short":
-            return self.price_db.get_short_price(client_type)
-        elif item.product_type == "comunicacao_visual":
-            area_m2 = (item.width_cm or 0) * (item.height_cm or 0) / 10000
-            return self.price_db.get_visual_price(item.visual_type) * Decimal(str(area_m2))
-        elif item.product_type == "outro":
-            # Busca preço dos 'outros' (pode ser por m²)
-            price, per_m2 = self.price_db.get_other_info(item.other_name or "")
-            if per_m2:
-                area_m2 = (item.width_cm or 0) * (item.height_cm or 0) / 10000
-                return price * Decimal(str(area_m2 if area_m2 > 0 else 1))
-            return price
-        
-        return Decimal('0')
+    def _current_discount(self) -> Discount | None:
+        """Desconto informado nos campos da tela"""
+        if self.discount_type.currentText() == "Sem desconto":
+            return None
+        kind = "percentage" if self.discount_type.currentText() == "Percentual (%)" else "fixed"
+        return Discount(type=kind, value=Decimal(str(self.discount_value.value())))
+
+    def _on_client_type_changed(self):
+        """Tipo de cliente muda todos os preços: reprecificação completa"""
+        self._reprice()
+        self._calculate_totals()
+        self._update_discount_suggestion()
+
+    def _reprice(self, pricing=None):
+        """Reprecifica o orçamento (com ``pricing``, troca a versão da tabela de preços)"""
+        self.totals.reprice(self.budget.items, self._client_type_key(), pricing)
+        # Validação e PDF usam a mesma versão de preços dos totais
+        self.validator.pricing = self.totals.pricing
+
+    def _client_type_key(self) -> ClientType:
+        return "terceiro" if self.client_type.currentText() == "Terceirizado" else "normal"
 
     def _on_discount_type_changed(self):
         """Callback quando tipo de desconto muda"""
@@ -379,6 +371,7 @@ class SimulatorWindow(QtWidgets.QMainWindow):
         self.discount_value.setValue(0)
         self.current_client_id = None
         self._suggested_percent = None
+        self._reprice(self.pricing)
         self._calculate_totals()
         self._update_actions_state()
         # limpa sugestão visual
@@ -394,7 +387,7 @@ class SimulatorWindow(QtWidgets.QMainWindow):
         self.budget.client.email = self.client_email.text().strip() or None
         
         # Validar orçamento
-        is_valid, errors, warnings = self.validator.validate_budget(self.budget)
+        is_valid, errors, warnings = self.validator.validate_budget(self.budget, self._client_type_key())
         
         if not is_valid:
             error_msg = "❌ ERROS ENCONTRADOS:\n\n" + "\n".join(f"• {error}" for error in errors)
@@ -437,8 +430,9 @@ class SimulatorWindow(QtWidgets.QMainWindow):
         
         try:
             from ..pdf.budget_generator import BudgetPDF
-            pdf = BudgetPDF()
-            pdf.generate(self.budget, path)
+            # Mesmo serviço de preços: o PDF reaproveita os preços já calculados na edição
+            pdf = BudgetPDF(pricing=self.totals.pricing)
+            pdf.generate(self.budget, path, self._client_type_key(), self.totals.line_prices(self.budget.items))
             QtWidgets.QMessageBox.information(self, "Sucesso", "Orçamento gerado com sucesso.")
         except Exception as e:
             QtWidgets.QMessageBox.critical(self, "Erro", f"Erro ao gerar PDF: {str(e)}")
@@ -505,11 +499,23 @@ _Manauara Design_"""
         self.client_name.setText(budget.client.name)
         self.client_phone.setText(budget.client.phone)
         self.client_email.setText(budget.client.email or "")
+        # Sem sinal: trocar o tipo de cliente reprecificaria os itens carregados
+        self.client_type.blockSignals(True)
+        self.client_type.setCurrentIndex(1 if budget.client_type == "terceiro" else 0)
+        self.client_type.blockSignals(False)
         
-        # Carregar produtos
+        # Totais gravados nas linhas carregadas (cotadas pela versão em que o orçamento
+        # foi salvo só se forem editadas); itens novos usam a tabela atual
         self.budget = budget
-        self._update_products_list()
+        self.totals.load(budget.items, budget.subtotal, budget.art_creation_total, budget.client_type,
+                         self.pricing.for_version(budget.price_version))
+        if budget.discount:
+            self.discount_type.setCurrentText(
+                "Percentual (%)" if budget.discount.type == "percentage" else "Valor fixo (R$)"
+            )
+            self.discount_value.setValue(float(budget.discount.value))
         self._calculate_totals()
+        self._update_products_list()
         
         QtWidgets.QMessageBox.information(self, "Sucesso", "Orçamento carregado com sucesso!")
     
@@ -521,7 +527,7 @@ _Manauara Design_"""
         self.budget.client.email = self.client_email.text().strip() or None
         
         # Validar antes de salvar
-        is_valid, errors, warnings = self.validator.validate_budget(self.budget)
+        is_valid, errors, warnings = self.validator.validate_budget(self.budget, self._client_type_key())
         
         if not is_valid:
             error_msg = "❌ ERROS ENCONTRADOS:\n\n" + "\n".join(f"• {error}" for error in errors)
@@ -529,9 +535,14 @@ _Manauara Design_"""
             return
         
         try:
-            budget_id = self.storage.save_budget(self.budget)
-            # registra métricas no cliente
-            self._upsert_client_metrics(float(self.budget.total))
+            # cadastro do cliente e métricas do orçamento numa única gravação de clients.json
+            with self.client_storage.batch():
+                # cadastra o cliente antes: as métricas são somadas ao gravar o orçamento
+                self._upsert_client_from_fields()
+                # Guarda a versão da tabela usada nos totais (gravada uma vez por conteúdo)
+                self.budget.client_type = self._client_type_key()
+                self.budget.price_version = self.price_db.snapshot(self.totals.pricing.table)
+                budget_id = self.storage.save_budget(self.budget)
             QtWidgets.QMessageBox.information(
                 self, "Sucesso", 
                 f"Orçamento salvo com sucesso!\nID: {budget_id}"
@@ -619,18 +630,20 @@ _Manauara Design_"""
 
         if dlg.exec() == QtWidgets.QDialog.DialogCode.Accepted:
             # Substitui pelos novos dados
-            self.budget.items[current_row] = dlg.get_product()
-            self._update_products_list()
+            new_item = dlg.get_product()
+            self.totals.replace(current_row, current_item, new_item)
+            self.budget.items[current_row] = new_item
             self._calculate_totals()
+            self._update_products_list()
 
     def _remove_selected_product(self):
         """Remove produto selecionado da lista"""
         current_row = self.products_list.currentRow()
         if current_row >= 0 and current_row < len(self.budget.items):
+            self.totals.remove(current_row, self.budget.items[current_row])
             del self.budget.items[current_row]
-            self._update_products_list()
             self._calculate_totals()
-            self._update_actions_state()
+            self._update_products_list()
 
     def _update_actions_state(self):
         """Habilita/desabilita ações conforme estado atual do formulário."""
@@ -640,18 +653,24 @@ _Manauara Design_"""
         self.save_budget_btn.setEnabled(can_save)
         self.generate_pdf_btn.setEnabled(can_save)
 
-    def _upsert_client_metrics(self, total: float):
+    def _upsert_client_from_fields(self):
         name = self.client_name.text().strip()
         phone = self.client_phone.text().strip()
         email = self.client_email.text().strip() or None
         if not name or not phone:
             return
+        # busca e cadastro/atualização numa única gravação de clients.json
+        with self.client_storage.batch():
+            self._upsert_client(name, phone, email)
+
+    def _upsert_client(self, name: str, phone: str, email: str | None):
         # tenta encontrar existente
         client = None
         if self.current_client_id:
             client = self.client_storage.find_by_id(self.current_client_id)
         if client is None:
-            matches = self.client_storage.find_by_name_or_phone(phone) or self.client_storage.find_by_name_or_phone(name)
+            # só correspondências exatas: busca por trecho criava cadastros trocados
+            matches = self.client_storage.find_by_phone(phone) or self.client_storage.find_by_name(name)
             client = matches[0] if matches else None
         if client is None:
             client = self.client_storage.create_client(name=name, phone=phone, email=email)
@@ -670,14 +689,16 @@ _Manauara Design_"""
                 changed = True
             if changed:
                 self.client_storage.update_client(client)
-        # registra métricas
-        self.client_storage.record_budget_metrics(client.id, total)
 
     def _on_client_fields_changed(self):
         # sempre que campos mudarem, limpar client_id e recalcular sugestão
         self.current_client_id = None
         self._update_discount_suggestion()
 
+    def _on_clients_changed(self, event: str, client_id):
+        if client_id is None or client_id == self.current_client_id or event == "created":
+            self._update_discount_suggestion()
+
     def _open_clients_dialog(self):
         dlg = ClientsDialog(self)
         if dlg.exec() == QtWidgets.QDialog.DialogCode.Accepted:
@@ -699,13 +720,8 @@ _Manauara Design_"""
 
     def _update_discount_suggestion(self):
         # coleta dados atuais
-        total_current = float(self.budget.subtotal + self.budget.art_creation_total)
-        items_count = 0
-        for it in self.budget.items:
-            try:
-                items_count += int(it.quantity)
-            except Exception:
-                pass
+        total_current = float(self.totals.subtotal + self.totals.art_creation_total)
+        items_count = self.totals.quantity
         # resolve cliente
         client_total_spent = 0.0
         client_budgets_count = 0
@@ -713,9 +729,12 @@ _Manauara Design_"""
         if self.current_client_id:
             client = self.client_storage.find_by_id(self.current_client_id)
         if client is None:
-            # tenta por telefone/nome
-            term = self.client_phone.text().strip() or self.client_name.text().strip()
-            matches = self.client_storage.find_by_name_or_phone(term) if term else []
+            # tenta por telefone (busca exata O(1)) e depois por telefone/nome
+            phone = self.client_phone.text().strip()
+            term = phone or self.client_name.text().strip()
+            matches = self.client_storage.find_by_phone(phone) if phone else []
+            if not matches and term:
+                matches = self.client_storage.find_by_name_or_phone(term)
             client = matches[0] if matches else None
         if client is not None:
             client_total_spent = float(client.total_spent)
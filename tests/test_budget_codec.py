@@ -0,0 +1,40 @@
+import json
+
+from src.core.budget_codec import SnapshotColumns, decode_snapshot, encode_snapshot
+from src.core.budget_storage import dump_snapshot
+
+
+def make_records():
+    item = {"product_type": "comunicacao_visual", "fabric": None, "sleeve": None, "size": None,
+            "visual_type": "lona", "other_name": None, "quantity": 3, "width_cm": 33.3, "height_cm": 10.1,
+            "art_creation_price": 10.005}
+    return [
+        {"id": "ORC_1", "client": {"name": "João da Silva", "phone": "(92) 9 1234-5678", "email": None},
+         "items": [item, dict(item, product_type="outro", visual_type=None, other_name="Placa",
+                              width_cm=None, height_cm=None, art_creation_price=None)],
+         "discount": {"type": "percentage", "value": 12.345, "description": "fidelidade"},
+         "art_creation_total": 10.005, "subtotal": 123.456, "total": 118.2447, "created_date": "2025-10-16",
+         "saved_date": "2025-10-16T17:23:03.660798", "price_version": "0123456789abcdef", "client_type": "terceiro"},
+        {"id": "ORC_2", "client": {"name": "Ana", "phone": None, "email": "ana@example.com"},
+         "items": [], "discount": None, "art_creation_total": 0.0, "subtotal": 0.1 + 0.2, "total": 760.0,
+         "created_date": "2025-10-17", "saved_date": "2025-10-17T08:00:00", "price_version": None,
+         "client_type": None},
+    ]
+
+
+def test_json_to_binary_to_json_is_lossless():
+    records = json.loads(dump_snapshot(make_records()))
+
+    decoded = decode_snapshot(encode_snapshot(records))
+
+    assert decoded == records
+    assert dump_snapshot(decoded) == dump_snapshot(records)
+
+
+def test_records_decodes_ranges():
+    records = make_records()
+    columns = SnapshotColumns(encode_snapshot(records))
+
+    assert len(columns) == 2
+    assert columns.records(1) == records[1:]
+    assert columns.records(0, 1) == records[:1]
@@ -0,0 +1,83 @@
+import sqlite3
+
+from src.core.budget_sqlite import SqliteBudgetStorage, migrate_json_to_sqlite
+from src.core.budget_storage import BudgetStorage
+from src.core.simulator_models import Budget, ClientInfo, ProductItem
+
+
+def make_budget():
+    budget = Budget(ClientInfo("João da Silva", "(92) 91234-5678"), [
+        ProductItem("outro", other_name="Placa", width_cm=200, height_cm=100, quantity=2),
+        ProductItem("camiseta", fabric="dryfit", sleeve="curta", size="M", quantity=10),
+    ])
+    budget.total = 300.0
+    budget.client_type = "terceiro"
+    budget.price_version = "abc123"
+    return budget
+
+
+def test_save_load_keeps_item_fields(tmp_path):
+    storage = SqliteBudgetStorage(str(tmp_path))
+    budget_id = storage.save_budget(make_budget())
+    loaded = storage.load_budget(budget_id)
+    storage.close()
+
+    assert [item.other_name for item in loaded.items] == ["Placa", None]
+    assert loaded.items[0].width_cm == 200
+    assert loaded.items[1].fabric == "dryfit"
+    assert loaded.client.name == "João da Silva"
+    assert loaded.client_type == "terceiro"
+    assert loaded.price_version == "abc123"
+
+
+def test_old_database_gains_new_columns(tmp_path):
+    conn = sqlite3.connect(str(tmp_path / "budgets.sqlite3"))
+    conn.execute(
+        "CREATE TABLE budgets (id TEXT PRIMARY KEY, client_name TEXT NOT NULL, client_name_norm TEXT NOT NULL, "
+        "client_phone TEXT, client_email TEXT, discount_type TEXT, discount_value REAL, discount_description TEXT, "
+        "art_creation_total REAL NOT NULL DEFAULT 0, subtotal REAL NOT NULL DEFAULT 0, "
+        "total REAL NOT NULL DEFAULT 0, created_date TEXT NOT NULL, saved_date TEXT NOT NULL)"
+    )
+    conn.execute(
+        "CREATE TABLE budget_items (budget_id TEXT NOT NULL, position INTEGER NOT NULL, "
+        "product_type TEXT NOT NULL, fabric TEXT, sleeve TEXT, size TEXT, visual_type TEXT, "
+        "quantity INTEGER NOT NULL, width_cm REAL, height_cm REAL, art_creation_price REAL, "
+        "PRIMARY KEY (budget_id, position))"
+    )
+    conn.commit()
+    conn.close()
+
+    storage = SqliteBudgetStorage(str(tmp_path))
+    budget_id = storage.save_budget(make_budget())
+    loaded = storage.load_budget(budget_id)
+    storage.close()
+    assert loaded.items[0].other_name == "Placa"
+    assert loaded.client_type == "terceiro"
+
+
+def test_migrate_json_keeps_all_fields(tmp_path):
+    source = BudgetStorage(str(tmp_path))
+    budget_id = source.save_budget(make_budget())
+
+    assert migrate_json_to_sqlite(str(tmp_path)) == 1
+    storage = SqliteBudgetStorage(str(tmp_path))
+    loaded = storage.load_budget(budget_id)
+    storage.close()
+    assert loaded.items[0].other_name == "Placa"
+    assert (loaded.client_type, loaded.price_version) == ("terceiro", "abc123")
+
+
+def test_name_search_matches_json_storage(tmp_path):
+    json_storage = BudgetStorage(str(tmp_path / "json"))
+    sqlite_storage = SqliteBudgetStorage(str(tmp_path / "sqlite"))
+    for name in ("João da Silva", "Maria Silveira", "Ana 100% Algodão", "Loja_Centro"):
+        budget = make_budget()
+        budget.client = ClientInfo(name, "")
+        json_storage.save_budget(budget)
+        sqlite_storage.save_budget(budget)
+
+    for term in ("ilva", "SILV", "joao da", "100%", "_", "algodao", "x"):
+        expected = sorted(b["client"]["name"] for b in json_storage.search_budgets(client_name=term))
+        found = sorted(b["client"]["name"] for b in sqlite_storage.search_budgets(client_name=term))
+        assert found == expected, term
+    sqlite_storage.close()
@@ -0,0 +1,136 @@
+import multiprocessing
+import os
+
+from src.core.budget_storage import BudgetStorage, budget_to_dict, dump_snapshot
+from src.core.simulator_models import Budget, ClientInfo
+
+
+def make_budget(name="Ana", created="2015-01-10T10:00:00", total=10.0):
+    budget = Budget(ClientInfo(name, ""), [], created_date=created)
+    budget.total = total
+    return budget
+
+
+def save_many(storage_dir, count):
+    storage = BudgetStorage(storage_dir, compact_threshold=10)
+    for i in range(count):
+        storage.save_budget(make_budget(f"Cliente {os.getpid()}", f"2015-{1 + i % 12:02d}-01T00:00:00"))
+    if storage._compaction_thread is not None:
+        storage._compaction_thread.join()
+
+
+def test_journal_is_replayed_on_open(tmp_path):
+    storage = BudgetStorage(str(tmp_path))
+    kept = storage.save_budget(make_budget("Ana"))
+    removed = storage.save_budget(make_budget("Bia"))
+    storage.delete_budget(removed)
+
+    reopened = BudgetStorage(str(tmp_path))
+    assert [b["id"] for b in reopened.search_budgets()] == [kept]
+    assert reopened.load_budget(removed) is None
+
+
+def test_truncated_journal_line_is_ignored(tmp_path):
+    storage = BudgetStorage(str(tmp_path))
+    kept = storage.save_budget(make_budget())
+    with open(storage.journal_file, "ab") as f:
+        f.write(b'{"op": "save", "budget": {"id"')
+
+    reopened = BudgetStorage(str(tmp_path))
+    added = reopened.save_budget(make_budget("Bia"))
+    assert {b["id"] for b in BudgetStorage(str(tmp_path)).search_budgets()} == {kept, added}
+
+
+def test_compaction_writes_partitions_and_keeps_data(tmp_path):
+    storage = BudgetStorage(str(tmp_path))
+    ids = [storage.save_budget(make_budget(created=f"2015-{m:02d}-05T00:00:00")) for m in (1, 2, 2, 3)]
+    storage.delete_budget(ids[0])
+    storage.compact()
+
+    assert os.path.getsize(storage.journal_file) == 0
+    assert sorted(os.listdir(storage.partitions_dir)) == ["2015-02.json", "2015-03.json", "manifest.json"]
+    reopened = BudgetStorage(str(tmp_path))
+    assert {b["id"] for b in reopened.search_budgets()} == set(ids[1:])
+
+
+def test_date_range_search_follows_saves_and_deletes(tmp_path):
+    storage = BudgetStorage(str(tmp_path))
+    ids = {day: storage.save_budget(make_budget(created=f"2015-01-{day:02d}")) for day in (5, 10, 20)}
+    storage.delete_budget(ids[10])
+    late = storage.save_budget(make_budget("Bia", created="2015-01-15"))
+
+    found = storage.search_budgets(date_from="2015-01-05", date_to="2015-01-15")
+    assert [b["id"] for b in found] == [late, ids[5]]
+    assert storage.search_budgets("bia", date_to="2015-01-15")[0]["id"] == late
+
+
+def test_budget_cache_hits_evicts_and_returns_copies(tmp_path, monkeypatch):
+    monkeypatch.setattr(BudgetStorage, "CACHE_SIZE", 2)
+    storage = BudgetStorage(str(tmp_path))
+    ids = [storage.save_budget(make_budget(f"Cliente {i}")) for i in range(3)]
+
+    storage.load_budget(ids[0]).client.name = "Alterado"
+    assert storage.load_budget(ids[0]).client.name == "Cliente 0"
+    storage.load_budget(ids[1])
+    storage.load_budget(ids[2])
+    assert storage.load_budget(ids[1]) is not None
+    assert storage.cache_stats() == {"hits": 2, "misses": 3, "size": 2, "capacity": 2}
+    storage.load_budget(ids[0])
+    assert storage.cache_stats()["misses"] == 4
+
+
+def test_budget_cache_is_invalidated_on_overwrite(tmp_path):
+    storage = BudgetStorage(str(tmp_path))
+    other = BudgetStorage(str(tmp_path))
+    budget_id = storage.save_budget(make_budget("Ana"))
+    assert storage.load_budget(budget_id).client.name == "Ana"
+
+    storage.reassign_client([budget_id], {"name": "Ana Souza", "phone": "", "email": None})
+    assert storage.load_budget(budget_id).client.name == "Ana Souza"
+
+    # Alteração feita por outra instância chega pelo journal
+    assert other.load_budget(budget_id).client.name == "Ana Souza"
+    other.reassign_client([budget_id], {"name": "Bia", "phone": "", "email": None})
+    other.delete_budget(other.save_budget(make_budget("Carla")))
+    assert storage.load_budget(budget_id).client.name == "Bia"
+
+
+def test_legacy_snapshot_is_kept_as_backup(tmp_path):
+    budget_id = BudgetStorage(str(tmp_path)).save_budget(make_budget())
+    legacy = tmp_path / "budgets.json"
+    legacy.write_bytes(dump_snapshot([budget_to_dict(make_budget("Bia"), "ORC_ANTIGO")]))
+
+    storage = BudgetStorage(str(tmp_path))
+    storage.compact()
+
+    assert not legacy.exists()
+    assert (tmp_path / "budgets.json.bak").exists()
+    assert {b["id"] for b in BudgetStorage(str(tmp_path)).search_budgets()} == {budget_id, "ORC_ANTIGO"}
+
+
+def test_cold_partitions_are_read_on_demand(tmp_path, monkeypatch):
+    monkeypatch.setattr(BudgetStorage, "EAGER_RECORDS", 2)
+    storage = BudgetStorage(str(tmp_path))
+    ids = {m: storage.save_budget(make_budget(created=f"2015-{m:02d}-05T00:00:00")) for m in range(1, 7)}
+    storage.compact()
+
+    reopened = BudgetStorage(str(tmp_path))
+    assert reopened._cold
+    assert reopened.search_budgets(limit=0) == []
+    assert [b["id"] for b in reopened.search_budgets(date_from="2015-02-01", date_to="2015-02-28")] == [ids[2]]
+    assert reopened.load_budget(ids[1]) is not None
+    assert reopened.latest_saved(lambda b: b["id"] == ids[1])["id"] == ids[1]
+
+
+def test_saves_from_several_processes_are_all_kept(tmp_path):
+    workers = [multiprocessing.Process(target=save_many, args=(str(tmp_path), 25)) for _ in range(4)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+        assert worker.exitcode == 0
+
+    storage = BudgetStorage(str(tmp_path))
+    assert len(storage.search_budgets()) == 100
+    storage.compact()
+    assert len(BudgetStorage(str(tmp_path)).search_budgets()) == 100
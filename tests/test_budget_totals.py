@@ -0,0 +1,82 @@
+import json
+from decimal import Decimal
+
+from src.core.budget_totals import BudgetTotals
+from src.core.price_table import compile_price_table
+from src.core.pricing_service import PricingService
+from src.core.simulator_models import Budget, ClientInfo, Discount, PriceDatabase, ProductItem
+
+OLD = compile_price_table({"outros": [{"nome": "Placa", "preco": 80}]})
+NEW = compile_price_table({"outros": [{"nome": "Placa", "preco": 100}]})
+RULES = compile_price_table({
+    "outros": [{"nome": "Placa", "preco": 100}],
+    "regras": [{"produto": "*", "cliente": "terceiro", "multiplicador": 0.9}],
+})
+
+
+def placa(quantity):
+    return ProductItem("outro", other_name="Placa", quantity=quantity)
+
+
+def test_add_replace_remove_match_a_full_quote():
+    service = PricingService(None, NEW)
+    items = [placa(2), ProductItem("short", quantity=3, art_creation_price=Decimal("35.50"))]
+    totals = BudgetTotals(service)
+    for item in items:
+        totals.add(item)
+    totals.replace(0, items[0], placa(4))
+    items[0] = placa(4)
+    totals.add(placa(1))
+    items.append(placa(1))
+    totals.remove(1, items.pop(1))
+
+    discount = Discount("fixed", Decimal("10"))
+    expected = service.quote_budget(Budget(ClientInfo("", ""), items, discount=discount))
+    assert totals.unit_prices == expected.unit_prices
+    assert (totals.subtotal, totals.art_creation_total, totals.quantity) == (Decimal("500"), Decimal("0"), 5)
+    assert totals.total(discount) == expected.total
+    # Uma cotação por chave de preço: as alterações não reprecificam as outras linhas
+    assert service.misses == 2
+
+
+def test_reprice_on_client_type_change():
+    totals = BudgetTotals(PricingService(None, RULES))
+    items = [placa(2)]
+    totals.reprice(items)
+    assert totals.subtotal == Decimal("200")
+
+    totals.reprice(items, "terceiro")
+    assert (totals.client_type, totals.subtotal) == ("terceiro", Decimal("180.0"))
+
+
+def test_refresh_reprices_only_after_the_table_changes(tmp_path):
+    prices = tmp_path / "prices.json"
+    prices.write_text(json.dumps({"outros": [{"nome": "Placa", "preco": 80}]}), encoding="utf-8")
+    database = PriceDatabase(str(prices), str(tmp_path / "snapshots"))
+    totals = BudgetTotals(PricingService(database))
+    items = [placa(2)]
+    totals.reprice(items)
+    assert not totals.refresh(items)
+
+    prices.write_text(json.dumps({"outros": [{"nome": "Placa", "preco": 100}]}), encoding="utf-8")
+    database.reload()
+
+    assert totals.refresh(items)
+    assert totals.subtotal == Decimal("200")
+
+
+def test_loaded_budget_keeps_stored_totals_and_prices_new_items_with_current_table():
+    current = PricingService(None, NEW)
+    stored = PricingService(None, OLD)
+    items = [placa(2), placa(1)]
+    totals = BudgetTotals(current)
+
+    totals.load(items, Decimal("240.00"), Decimal("0"), "normal", stored)
+    assert (totals.subtotal, totals.quantity) == (Decimal("240.00"), 3)
+    assert stored.misses == current.misses == 0
+
+    totals.add(placa(1))
+    totals.remove(0, items[0])
+    assert totals.subtotal == Decimal("180.00")
+    assert totals.unit_prices == [None, Decimal("100")]
+    assert totals.line_prices([items[1], placa(1)]) == [Decimal("80"), Decimal("100")]
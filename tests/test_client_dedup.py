@@ -0,0 +1,70 @@
+from src.core.budget_storage import BudgetStorage
+from src.core.client_dedup import ClientDeduplicator, blocking_keys, find_duplicates, phonetic_key
+from src.core.client_metrics import ClientMetricsTracker
+from src.core.clients import Client, ClientStorage
+from src.core.simulator_models import Budget, ClientInfo
+
+
+def make_client(client_id, name, phone="", email=None, budgets_count=0):
+    return Client(client_id, name, phone, email, created_at=f"2015-01-01T00:00:0{client_id[-1]}",
+                  budgets_count=budgets_count)
+
+
+def make_budget(name, phone, total):
+    budget = Budget(ClientInfo(name, phone), [])
+    budget.total = total
+    return budget
+
+
+def test_phonetic_and_blocking_keys():
+    assert phonetic_key("Thiago de Souza") == phonetic_key("TIAGO SOUSA") == "tiago sousa"
+    assert phonetic_key("Ana Paula Silva") == phonetic_key("Ana Silva")
+    assert phonetic_key("Ana Silva") != phonetic_key("Ana Santos")
+
+    keys = blocking_keys(make_client("CLI_1", "Thiago Souza", "+55 (92) 9 1234-5678", "T@Example.com"))
+    assert keys == ["tel:92912345678", "nome:tiago sousa:12345678", "nome:tiago sousa:t@example.com"]
+    assert blocking_keys(make_client("CLI_2", "Ana", "123")) == []
+
+
+def test_find_duplicates_groups_transitive_pairs():
+    clients = [
+        make_client("CLI_1", "Thiago Souza", "92912345678"),
+        # Mesmo telefone sem DDD, nome com outra grafia
+        make_client("CLI_2", "Tiago Sousa", "9 1234-5678", "tiago@example.com", budgets_count=3),
+        # Liga-se ao grupo só pelo email do CLI_2
+        make_client("CLI_3", "Thiago Souza", "", "TIAGO@example.com"),
+        # Mesmo telefone, outra pessoa
+        make_client("CLI_4", "Maria Lima", "92912345678"),
+        make_client("CLI_5", "Thiago Souza", "11999990000"),
+    ]
+
+    proposals = find_duplicates(clients)
+
+    assert len(proposals) == 1
+    assert (proposals[0].keep_id, proposals[0].merge_ids) == ("CLI_2", ["CLI_1", "CLI_3"])
+    assert len(proposals[0].reasons) == 2
+
+
+def test_merge_sums_metrics_and_moves_budgets(tmp_path):
+    budgets = BudgetStorage(str(tmp_path))
+    clients = ClientStorage(str(tmp_path))
+    tracker = ClientMetricsTracker(budgets, clients)
+    keep = clients.create_client("Ana Souza", "92912345678")
+    duplicate = clients.create_client("Ana Sousa", "912345678", "ana@example.com")
+    budgets.save_budget(make_budget("Ana Souza", "92912345678", 100.0))
+    budgets.save_budget(make_budget("Ana Souza", "92912345678", 20.0))
+    moved = budgets.save_budget(make_budget("Ana Sousa", "912345678", 50.5))
+
+    dedup = ClientDeduplicator(clients, budgets)
+    proposals = dedup.find()
+    assert [(p.keep_id, p.merge_ids) for p in proposals] == [(keep.id, [duplicate.id])]
+    # Os orçamentos do cadastro mantido também ganham o email do duplicado
+    assert dedup.merge(proposals) == 3
+
+    assert clients.find_by_id(duplicate.id) is None
+    merged = clients.find_by_id(keep.id)
+    assert (merged.total_spent, merged.budgets_count, merged.email) == (170.5, 3, "ana@example.com")
+    client = BudgetStorage(str(tmp_path)).load_budget(moved).client
+    assert (client.name, client.phone) == ("Ana Souza", "92912345678")
+    assert tracker.rebuild() == 1
+    assert tracker.metrics_for(keep.id).budgets_count == 3
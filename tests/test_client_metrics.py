@@ -0,0 +1,89 @@
+import multiprocessing
+
+from src.core import clients as clients_module
+from src.core.budget_storage import BudgetStorage
+from src.core.client_metrics import ClientMetricsTracker
+from src.core.clients import ClientStorage
+from src.core.simulator_models import Budget, ClientInfo
+
+
+def make_budget(name, phone, total):
+    budget = Budget(ClientInfo(name, phone), [])
+    budget.total = total
+    return budget
+
+
+def save_many(storage_dir, count):
+    budgets = BudgetStorage(storage_dir)
+    tracker = ClientMetricsTracker(budgets, ClientStorage(storage_dir))
+    for _ in range(count):
+        budgets.save_budget(make_budget("Ana", "(92) 91234-5678", 10.0))
+    return tracker
+
+
+def open_storages(tmp_path):
+    budgets = BudgetStorage(str(tmp_path))
+    clients = ClientStorage(str(tmp_path))
+    return budgets, clients, ClientMetricsTracker(budgets, clients)
+
+
+def test_saves_and_deletes_adjust_metrics(tmp_path):
+    budgets, clients, tracker = open_storages(tmp_path)
+    ana = clients.create_client("Ana", "92912345678")
+    first = budgets.save_budget(make_budget("Ana", "+55 92 91234-5678", 100.0))
+    last = budgets.save_budget(make_budget("ANA", "92 91234-5678", 50.5))
+
+    metrics = tracker.metrics_for(ana.id)
+    assert (metrics.total_spent, metrics.budgets_count) == (150.5, 2)
+    assert metrics.last_purchase_at == budgets.search_budgets(limit=1)[0]["saved_date"]
+
+    first_saved = budgets.search_budgets()[1]["saved_date"]
+    budgets.delete_budget(last)
+    metrics = tracker.metrics_for(ana.id)
+    assert (metrics.total_spent, metrics.budgets_count, metrics.last_purchase_at) == (100.0, 1, first_saved)
+
+    budgets.delete_budget(first)
+    metrics = tracker.metrics_for(ana.id)
+    assert (metrics.total_spent, metrics.budgets_count, metrics.last_purchase_at) == (0.0, 0, None)
+
+
+def test_rebuild_matches_incremental_metrics(tmp_path):
+    budgets, clients, tracker = open_storages(tmp_path)
+    ana = clients.create_client("Ana", "92912345678")
+    bia = clients.create_client("Bia Souza", "")
+    budgets.save_budget(make_budget("Ana", "92912345678", 10.0))
+    # Telefone sem cadastro: vale o nome (mesma regra no evento e no rebuild)
+    budgets.save_budget(make_budget("bia souza", "11 99999-0000", 20.0))
+    budgets.save_budget(make_budget("Bia Souza", "", 5.0))
+    incremental = [tracker.metrics_for(ana.id), tracker.metrics_for(bia.id)]
+
+    assert tracker.rebuild() == 2
+    assert [tracker.metrics_for(ana.id), tracker.metrics_for(bia.id)] == incremental
+    assert incremental[1].budgets_count == 2
+
+
+def test_client_and_metrics_are_written_once_in_a_batch(tmp_path, monkeypatch):
+    budgets, clients, tracker = open_storages(tmp_path)
+    writes = []
+    original = clients_module.atomic_write_json
+    monkeypatch.setattr(clients_module, "atomic_write_json", lambda *a, **k: writes.append(a[0]) or original(*a, **k))
+
+    with clients.batch():
+        ana = clients.create_client("Ana", "92912345678")
+        budgets.save_budget(make_budget("Ana", "92912345678", 10.0))
+
+    assert len(writes) == 1
+    assert tracker.metrics_for(ana.id).budgets_count == 1
+
+
+def test_concurrent_sessions_do_not_lose_updates(tmp_path):
+    ana = ClientStorage(str(tmp_path)).create_client("Ana", "92912345678")
+    workers = [multiprocessing.Process(target=save_many, args=(str(tmp_path), 20)) for _ in range(4)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+        assert worker.exitcode == 0
+
+    client = ClientStorage(str(tmp_path)).find_by_id(ana.id)
+    assert (client.budgets_count, client.total_spent) == (80, 800.0)
@@ -0,0 +1,71 @@
+import json
+
+from src.core import clients as clients_module
+from src.core.clients import ClientStorage
+
+
+def count_writes(monkeypatch):
+    writes = []
+    original = clients_module.atomic_write_json
+    monkeypatch.setattr(clients_module, "atomic_write_json", lambda *a, **k: writes.append(a[0]) or original(*a, **k))
+    return writes
+
+
+def test_batch_writes_clients_file_once(tmp_path, monkeypatch):
+    storage = ClientStorage(str(tmp_path))
+    events = []
+    storage.subscribe(lambda event, key: events.append(event))
+    writes = count_writes(monkeypatch)
+
+    with storage.batch():
+        ana = storage.create_client("Ana", "92912345678")
+        storage.create_client("Bia", "")
+        storage.set_metrics(ana.id, 10.0, 1, None)
+        assert events == []
+
+    assert len(writes) == 1
+    assert events == ["created", "created", "metrics"]
+    assert [c.name for c in ClientStorage(str(tmp_path)).list_clients()] == ["Ana", "Bia"]
+
+
+def test_nested_batch_writes_at_outer_end(tmp_path, monkeypatch):
+    storage = ClientStorage(str(tmp_path))
+    writes = count_writes(monkeypatch)
+
+    with storage.batch():
+        with storage.batch():
+            storage.create_client("Ana", "")
+        assert writes == []
+        storage.create_client("Bia", "")
+
+    assert len(writes) == 1
+
+
+def test_update_keeps_metrics_from_other_session(tmp_path):
+    first = ClientStorage(str(tmp_path))
+    ana = first.create_client("Ana", "92912345678")
+    second = ClientStorage(str(tmp_path))
+
+    second.apply_budget_metrics("Ana", "92912345678", 150.0, "2025-10-16T10:00:00")
+    ana.name = "Ana Souza"
+    ana.phone = "92988887777"
+    first.update_client(ana)
+
+    saved = ClientStorage(str(tmp_path)).find_by_id(ana.id)
+    assert (saved.name, saved.phone) == ("Ana Souza", "92988887777")
+    assert (saved.total_spent, saved.budgets_count) == (150.0, 1)
+    assert saved.last_purchase_at == "2025-10-16T10:00:00"
+    assert [c.id for c in first.find_by_phone("92988887777")] == [ana.id]
+    assert first.find_by_phone("92912345678") == []
+
+
+def test_match_prefers_oldest_client_across_id_formats(tmp_path):
+    legacy = {"id": "CLI_20240105_093000_0", "name": "Ana", "phone": "(92) 9 1234-5678", "email": None,
+              "created_at": "2024-01-05T09:30:00", "total_spent": 0.0, "budgets_count": 0,
+              "last_purchase_at": None}
+    (tmp_path / "clients.json").write_text(json.dumps([legacy]), encoding="utf-8")
+    storage = ClientStorage(str(tmp_path))
+    storage.create_client("Ana", "92912345678")
+
+    assert storage.match_client_id("Ana", "92912345678") == legacy["id"]
+    assert storage.match_client_id("ana", None) == legacy["id"]
@@ -0,0 +1,64 @@
+import json
+
+from src.core.price_snapshots import PriceSnapshotStore
+from src.core.price_table import compile_price_table
+from src.core.simulator_models import PriceDatabase
+
+PRICES = {
+    "visual": [{"nome": "Lona", "preco_m2": 60}],
+    "outros": [{"nome": "Placa", "preco": 80, "por_m2": True}],
+    "regras": [{"produto": "*", "cliente": "terceiro", "multiplicador": 0.9}],
+}
+
+
+def test_version_is_content_hash():
+    table = compile_price_table(PRICES)
+    reordered = compile_price_table({
+        "regras": PRICES["regras"],
+        "outros": [{"por_m2": True, "preco": "80.00", "nome": "Placa"}],
+        "visual": PRICES["visual"],
+    })
+
+    assert table.version == reordered.version
+    assert compile_price_table({**PRICES, "outros": []}).version != table.version
+
+
+def test_snapshot_is_found_by_version(tmp_path):
+    table = compile_price_table(PRICES)
+    version = PriceSnapshotStore(str(tmp_path)).save(table)
+    assert PriceSnapshotStore(str(tmp_path)).save(table) == version
+    assert PriceSnapshotStore(str(tmp_path)).versions() == [version]
+
+    loaded = PriceSnapshotStore(str(tmp_path)).load(version)
+    assert loaded == table
+    assert loaded.version == version
+    assert loaded.rules.adjustment("camiseta", "dryfit", "terceiro").multiplier == table.rules.adjustment(
+        "camiseta", "dryfit", "terceiro").multiplier
+
+
+def test_tampered_snapshot_is_rejected(tmp_path):
+    store = PriceSnapshotStore(str(tmp_path))
+    version = store.save(compile_price_table(PRICES))
+    path = tmp_path / f"{version}.json"
+    data = json.loads(path.read_text(encoding="utf-8"))
+    data["table"]["short"] = "30"
+    path.write_text(json.dumps(data), encoding="utf-8")
+
+    assert PriceSnapshotStore(str(tmp_path)).load(version) is None
+    assert PriceSnapshotStore(str(tmp_path)).load("desconhecida") is None
+
+
+def test_database_returns_saved_table_after_prices_change(tmp_path):
+    prices = tmp_path / "prices.json"
+    prices.write_text(json.dumps(PRICES), encoding="utf-8")
+    database = PriceDatabase(str(prices), str(tmp_path / "snapshots"))
+    old = database.table
+    version = database.snapshot()
+
+    prices.write_text(json.dumps({**PRICES, "outros": []}), encoding="utf-8")
+    database.reload()
+
+    assert database.table.version != version
+    assert database.table_for(version) == old
+    assert database.table_for(None) is database.table
+    assert database.table_for("desconhecida") is database.table
@@ -0,0 +1,29 @@
+import os
+from decimal import Decimal
+
+from src.core.price_table import DEFAULT_CONJUNTO_PRICES, compile_price_table, load_price_table
+
+
+def test_conjuntos_come_from_file():
+    table = compile_price_table({"conjuntos": [
+        {"tipo": "Todo_Helanca", "manga": "curta", "preco": 61.5},
+        {"tipo": "todo_helanca", "manga": "curta", "cliente": "terceiro", "preco": 52},
+    ]})
+
+    assert dict(table.conjuntos) == {
+        ("todo_helanca", "curta", "normal"): Decimal("61.5"),
+        ("todo_helanca", "curta", "terceiro"): Decimal("52"),
+    }
+
+
+def test_conjuntos_fall_back_to_defaults():
+    table = compile_price_table({})
+
+    assert len(table.conjuntos) == len(DEFAULT_CONJUNTO_PRICES)
+    assert table.conjuntos[("helanca_tactel", "curta", "normal")] == Decimal("58.00")
+
+
+def test_shipped_prices_file_matches_defaults():
+    table = load_price_table(os.path.join(os.path.dirname(__file__), "..", "config", "prices.json"))
+
+    assert table.conjuntos == compile_price_table({}).conjuntos
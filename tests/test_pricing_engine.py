@@ -0,0 +1,80 @@
+import json
+import os
+from decimal import Decimal
+
+from src.core.budget_codec import to_cents
+from src.core.budget_storage import budget_to_dict, dict_to_budget
+from src.core.price_table import compile_price_table, load_price_table
+from src.core.pricing_engine import ItemBatch, PricingEngine, requote_budget_dicts
+from src.core.pricing_service import PricingService
+from src.core.simulator_models import Budget, ClientInfo, Discount, ProductItem
+
+ROOT = os.path.join(os.path.dirname(__file__), "..")
+
+RULES = [
+    {"produto": "camiseta", "faixas": [{"a_partir_de": 50, "desconto_percentual": 7.5}]},
+    {"produto": "comunicacao_visual", "nome": "lona", "area_minima_m2": 0.5},
+    {"produto": "*", "cliente": "terceiro", "multiplicador": 0.85},
+]
+
+
+def sample_budgets():
+    items = [
+        ProductItem("camiseta", fabric="dryfit", sleeve="curta", size="M", quantity=60),
+        ProductItem("camiseta", fabric="helanca", sleeve="longa", size="XG", quantity=3),
+        ProductItem("conjunto", fabric="todo_helanca", sleeve="curta", quantity=7),
+        ProductItem("short", quantity=11, art_creation_price=Decimal("35.50")),
+        ProductItem("comunicacao_visual", visual_type="adesivo", width_cm=11, height_cm=1, quantity=100),
+        ProductItem("comunicacao_visual", visual_type="Lona", width_cm=33.3, height_cm=10.1, quantity=3),
+        ProductItem("outro", other_name="Placa", width_cm=12.5, height_cm=7.3, quantity=9),
+        ProductItem("outro", other_name="Placa", quantity=1),
+        ProductItem("criacao_arte", quantity=1, art_creation_price=Decimal("80")),
+    ]
+    discounts = [None, Discount("percentage", Decimal("12.345")), Discount("fixed", Decimal("10.005"))]
+    budgets = []
+    for i in range(len(items) * 2):
+        budget = Budget(ClientInfo(f"Cliente {i}", ""), items[i % len(items):] + items[:i % 3],
+                        discount=discounts[i % len(discounts)])
+        budget.client_type = "terceiro" if i % 2 else "normal"
+        budgets.append(budget)
+    return budgets
+
+
+def assert_parity(table, budgets):
+    service = PricingService(None, table)
+    quote = PricingEngine(table).price(ItemBatch.from_budgets(budgets))
+    for i, budget in enumerate(budgets):
+        expected = service.quote_budget(budget, budget.client_type)
+        assert quote.subtotal_cents[i] == to_cents(expected.subtotal)
+        assert quote.discount_cents[i] == to_cents(expected.discount)
+        assert quote.total_cents[i] == to_cents(expected.total)
+        budget.subtotal, budget.total = expected.subtotal, expected.total
+    dicts = [budget_to_dict(budget, f"ORC_{i}") for i, budget in enumerate(budgets)]
+    assert [r.difference for r in requote_budget_dicts(dicts, table)] == [0] * len(budgets)
+
+
+def test_area_prices_are_rounded_per_line():
+    table = compile_price_table({})
+    budget = Budget(ClientInfo("", ""), [
+        ProductItem("comunicacao_visual", visual_type="adesivo", width_cm=11, height_cm=1, quantity=100),
+    ])
+    quote = PricingEngine(table).price(ItemBatch.from_budgets([budget]))
+
+    assert quote.unit_cents == [6]
+    assert quote.line_cents == [550]
+    assert quote.total_cents == [550]
+
+
+def test_matches_pricing_service_with_rules():
+    table = compile_price_table({
+        "outros": [{"nome": "Placa", "preco": 80, "por_m2": True}],
+        "regras": RULES,
+    })
+    assert_parity(table, sample_budgets())
+
+
+def test_matches_pricing_service_on_shipped_data():
+    table = load_price_table(os.path.join(ROOT, "config", "prices.json"))
+    with open(os.path.join(ROOT, "data", "budgets.json"), encoding="utf-8") as f:
+        budgets = [dict_to_budget(b) for b in json.load(f)]
+    assert_parity(table, budgets)
@@ -0,0 +1,70 @@
+from decimal import Decimal
+
+from src.core.price_table import compile_price_table
+from src.core.pricing_rules import IDENTITY, compile_rules
+from src.core.pricing_service import price_item
+from src.core.simulator_models import ProductItem
+
+
+def test_matching_rules_combine():
+    plan = compile_rules([
+        {"produto": "camiseta", "faixas": [{"a_partir_de": 50, "desconto_percentual": 5}]},
+        {"produto": "camiseta", "nome": "dryfit", "faixas": [{"a_partir_de": 10, "desconto_percentual": 20}]},
+        {"produto": "*", "cliente": "terceiro", "multiplicador": 0.9},
+        {"produto": "camiseta", "cliente": "terceiro", "multiplicador": 0.5},
+        {"produto": "comunicacao_visual", "area_minima_m2": 0.5},
+        {"produto": "comunicacao_visual", "nome": "Lona", "area_minima_m2": 1},
+    ])
+
+    dryfit = plan.adjustment("camiseta", "dryfit", "terceiro")
+    assert dryfit.multiplier == Decimal("0.45")
+    # Faixas: vale a regra mais específica
+    assert dryfit.factor(10) == Decimal("0.45") * 80 / 100
+    assert plan.adjustment("camiseta", "helanca", "normal").factor(60) == Decimal("0.95")
+    assert plan.adjustment("comunicacao_visual", "lona", "normal").min_area == Decimal("1")
+    assert plan.adjustment("comunicacao_visual", "banner", "normal").min_area == Decimal("0.5")
+    assert plan.adjustment("short", None, "normal") is IDENTITY
+
+
+def test_invalid_rules_are_skipped():
+    plan = compile_rules([
+        {"produto": "camiseta"},
+        {"produto": "camiseta", "multiplicador": -1},
+        {"produto": "camiseta", "faixas": [{"a_partir_de": 10, "desconto_percentual": 120}]},
+        {"produto": "short", "multiplicador": 2},
+    ])
+
+    assert len(plan) == 1
+    assert plan.adjustment("short", None, "normal").factor(1) == Decimal("2")
+    assert not compile_rules(None)
+
+
+def test_terceiro_without_rows_uses_normal_price_and_multiplier():
+    table = compile_price_table({"regras": [{"produto": "*", "cliente": "terceiro", "multiplicador": 0.9}]})
+    item = ProductItem("camiseta", fabric="dryfit", sleeve="curta", size="M", quantity=10)
+
+    assert price_item(table, item, "normal") == Decimal("40.00")
+    assert price_item(table, item, "terceiro") == Decimal("36.0000")
+
+
+def test_conjunto_type_comes_from_item():
+    table = compile_price_table({})
+    item = ProductItem("conjunto", fabric="dryfit_helanca", sleeve="longa")
+
+    assert price_item(table, item, "normal") == Decimal("75.00")
+    # Conjuntos têm linha própria para terceiros
+    assert price_item(table, item, "terceiro") == Decimal("67.00")
+
+
+def test_quantity_breaks_and_minimum_area():
+    table = compile_price_table({"regras": [
+        {"produto": "camiseta", "faixas": [{"a_partir_de": 50, "desconto_percentual": 10}]},
+        {"produto": "comunicacao_visual", "area_minima_m2": 0.5},
+    ]})
+    shirt = ProductItem("camiseta", fabric="helanca", sleeve="curta", size="P", quantity=49)
+    sticker = ProductItem("comunicacao_visual", visual_type="adesivo", width_cm=10, height_cm=10)
+
+    assert price_item(table, shirt) == Decimal("35.00")
+    shirt.quantity = 50
+    assert price_item(table, shirt) == Decimal("31.5")
+    assert price_item(table, sticker) == Decimal("25.00")
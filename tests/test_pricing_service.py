@@ -0,0 +1,60 @@
+import json
+from decimal import Decimal
+
+from src.core.pricing_service import PricingService
+from src.core.simulator_models import Budget, ClientInfo, Discount, PriceDatabase, ProductItem
+
+PRICES = {"outros": [{"nome": "Placa", "preco": 80}]}
+
+
+def open_service(tmp_path):
+    prices = tmp_path / "prices.json"
+    prices.write_text(json.dumps(PRICES), encoding="utf-8")
+    database = PriceDatabase(str(prices), str(tmp_path / "snapshots"))
+    return prices, database, PricingService(database)
+
+
+def placa(quantity=1):
+    return ProductItem("outro", other_name="Placa", quantity=quantity)
+
+
+def test_item_prices_are_memoized_by_price_fields(tmp_path):
+    _, _, service = open_service(tmp_path)
+
+    assert service.quote_item(placa(1)) == Decimal("80")
+    assert service.quote_item(placa(5), "terceiro") == Decimal("80")
+    assert (service.hits, service.misses) == (1, 1)
+
+    budget = Budget(ClientInfo("Ana", ""), [placa(2), placa(1)], discount=Discount("percentage", Decimal("10")))
+    quote = service.quote_budget(budget)
+    assert quote.unit_prices == [Decimal("80"), Decimal("80")]
+    assert (quote.subtotal, quote.discount, quote.total) == (Decimal("240"), Decimal("24"), Decimal("216"))
+    assert service.misses == 1
+
+
+def test_cache_is_dropped_when_the_table_changes(tmp_path):
+    prices, database, service = open_service(tmp_path)
+    service.quote_item(placa())
+
+    prices.write_text(json.dumps({"outros": [{"nome": "Placa", "preco": 100}]}), encoding="utf-8")
+    database.reload()
+
+    assert service.quote_item(placa()) == Decimal("100")
+    assert service.misses == 2
+
+
+def test_for_version_prices_with_the_saved_table(tmp_path):
+    prices, database, service = open_service(tmp_path)
+    version = database.snapshot()
+    assert service.for_version(version) is service
+    assert service.for_version(None) is service
+
+    prices.write_text(json.dumps({"outros": [{"nome": "Placa", "preco": 100}]}), encoding="utf-8")
+    database.reload()
+    old = service.for_version(version)
+
+    assert old is not service
+    assert service.for_version(version) is old
+    assert old.quote_item(placa()) == Decimal("80")
+    assert service.quote_item(placa()) == Decimal("100")
+    assert service.for_version("desconhecida") is service
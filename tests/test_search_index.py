@@ -0,0 +1,65 @@
+from src.core.search_index import SortedIndex, TrigramIndex, fold_text
+
+
+def make_index():
+    index = TrigramIndex()
+    index.add(1, "João da Silva")
+    index.add(2, "Conceição Souza")
+    index.add(3, "Silvana Lima")
+    index.add(4, "Ana")
+    return index
+
+
+def test_fold_text_ignores_accents_case_and_spaces():
+    assert fold_text("  CONCEIÇÃO   Souza ") == "conceicao souza"
+    assert fold_text(None) == ""
+
+
+def test_contains_matches_any_substring():
+    index = make_index()
+
+    assert index.contains("silv") == {1, 3}
+    assert index.contains("JOAO") == {1}
+    assert index.contains("ção") == {2}
+    # Consultas curtas não formam trigramas
+    assert index.contains("an") == {3, 4}
+    assert index.contains("") == {1, 2, 3, 4}
+    assert index.contains("xyz") == set()
+
+
+def test_add_reindexes_and_remove_forgets():
+    index = make_index()
+    index.add(1, "Maria Silva")
+    index.remove(3)
+    index.remove(99)
+
+    assert index.contains("joao") == set()
+    assert index.contains("silva") == {1}
+    assert 3 not in index
+    assert len(index) == 3
+
+
+def test_search_ranks_exact_prefix_then_fuzzy():
+    index = make_index()
+    index.add(5, "Silva")
+
+    ranked = [key for key, _ in index.search("silva")]
+    assert ranked[:3] == [5, 1, 3]
+    # Erro de digitação só aparece na busca aproximada
+    assert [key for key, _ in index.search("conseicao souza")] == [2]
+    assert index.search("conseicao souza", fuzzy=False) == []
+    assert [key for key, _ in index.search("silva", limit=1)] == [5]
+
+
+def test_sorted_index_ranges_are_inclusive():
+    index = SortedIndex()
+    index.build([("2015-03-01", "c"), ("2015-01-10", "a"), (None, "z"), ("2015-02-01", "b")])
+    index.add("2015-02-01", "b2")
+    index.remove("2015-03-01", "c")
+    index.remove("2015-03-01", "desconhecida")
+
+    assert len(index) == 4
+    assert index.range("2015-01-10", "2015-02-01") == ["a", "b", "b2"]
+    assert index.range(high="2015-01-31") == ["z", "a"]
+    assert index.range("2015-02") == ["b", "b2"]
+    assert list(index.iter_desc("2015-01-01")) == ["b2", "b", "a"]